@@ -1,2 +1,360 @@
 # halmos_adapter.py
-# Halmos 도구 연동 어댑터 
\ No newline at end of file
+# Halmos 도구 연동 어댑터: forge 산출물에서 check_/prove_ 속성 함수를 찾아 함수별로 병렬 심볼릭 검증하고 판정을 캐시
+
+import json
+import re
+from pathlib import Path
+from ..artifacts import get_artifact_index
+from ..cache import DiskCache, sha256_text
+from ..config import DOCKER_CONFIG, HALMOS_CONFIG, PROCESS_CONFIG
+from ..infrastructure.container_session import get_session, sessions_enabled
+from ..infrastructure.docker_manager import TIMEOUT_RETURNCODE, ensure_image, image_id, run_container
+from ..infrastructure.process_runner import get_runner
+
+# Halmos가 읽는 산출물 형식으로 미리 빌드 (함수별 Halmos 실행의 forge build가 캐시 적중으로 끝나도록)
+HALMOS_BUILD_COMMAND = ['forge', 'build', '--ast', '--extra-output', 'storageLayout', 'metadata']
+
+_ANSI = re.compile(r'\x1b\[[0-9;]*[A-Za-z]')
+# 결과 줄: "[PASS] check_foo(uint256) (paths: 2, time: 0.05s, bounds: [])"
+_RESULT_LINE = re.compile(r'^\[(PASS|FAIL|TIMEOUT|ERROR|SKIP|REVERT_ALL|STUCK)\]\s+(\S+?\(.*?\))(?:\s+\((.*)\))?\s*$')
+_STAT = re.compile(r'(paths|time):\s*([\d.]+)')
+# Halmos 결과 태그 -> 판정
+_VERDICTS = {
+    'PASS': 'pass',
+    'FAIL': 'counterexample',
+    'TIMEOUT': 'timeout',
+}
+# 다음 실행에서도 같은 결과가 나오는 판정만 캐시 (오류는 환경 문제일 수 있으므로 재시도)
+# timeout은 Halmos가 보고한 솔버 제한 시간 초과만 캐시하고, 전체 실행 시간 제한으로 중지한 경우는 다시 검증
+CACHED_VERDICTS = ('pass', 'counterexample', 'timeout')
+
+def halmos_out_dir():
+    """
+    Halmos 전용 산출물 디렉토리 (프로젝트 기준 상대 경로)
+    """
+    return f"{HALMOS_CONFIG['build_dir']}/out"
+
+def halmos_build_env():
+    """
+    Halmos 빌드를 전용 디렉토리로 보내는 명령어 접두어
+    Halmos 자체가 실행하는 forge build에도 적용되도록 플래그 대신 Foundry 환경 변수로 지정하여,
+    퍼저가 읽는 out/과 빌드 캐시 스탬프를 건드리지 않습니다.
+    """
+    return ['env', f"FOUNDRY_OUT={halmos_out_dir()}", f"FOUNDRY_CACHE_PATH={HALMOS_CONFIG['build_dir']}/cache"]
+
+def halmos_volumes(foundry_dir):
+    """
+    Halmos 컨테이너 마운트 목록을 반환합니다. (forge 캐시 경로가 호스트와 같도록 같은 절대 경로로 마운트)
+    """
+    project_path = str(Path(foundry_dir).absolute())
+    return [(project_path, project_path, 'rw')]
+
+def _run_halmos_container(foundry_dir, command, timeout=None, debug=False):
+    """
+    Foundry 프로젝트를 마운트한 Halmos 컨테이너에서 명령어를 실행합니다. (세션 재사용 또는 일회용 컨테이너)
+
+    Returns:
+        subprocess.CompletedProcess (제한 시간 초과 시 returncode 124)
+    """
+    workdir = str(Path(foundry_dir).absolute())
+    if sessions_enabled():
+        session = get_session('halmos', halmos_volumes(foundry_dir), workdir=workdir, debug=debug)
+        return session.exec(command, timeout=timeout)
+    return run_container(DOCKER_CONFIG['halmos']['tag'], command[1:], volumes=halmos_volumes(foundry_dir),
+                         workdir=workdir, entrypoint=command[0], timeout=timeout, debug=debug)
+
+def build_halmos_project(foundry_dir, debug=False):
+    """
+    Halmos 컨테이너 안에서 AST·스토리지 레이아웃을 포함해 프로젝트를 컴파일합니다.
+    """
+    command = halmos_build_env() + HALMOS_BUILD_COMMAND
+    if debug:
+        print(f"[디버그] Halmos 컴파일 명령어: {' '.join(command)}")
+    result = get_runner().call('compile', _run_halmos_container, foundry_dir, command, PROCESS_CONFIG['compile_timeout'],
+                               debug)
+    if result.returncode != 0:
+        if debug:
+            print("[디버그] 컴파일 오류:")
+            print(f"stdout: {result.stdout}")
+            print(f"stderr: {result.stderr}")
+        raise RuntimeError(f"컨트랙트 컴파일 실패: {result.stderr}")
+
+def _canonical_type(param):
+    abi_type = param['type']
+    if abi_type.startswith('tuple'):
+        inner = ','.join(_canonical_type(component) for component in param.get('components', []))
+        return f"({inner}){abi_type[len('tuple'):]}"
+    return abi_type
+
+def function_signature(item):
+    """
+    ABI 함수 항목의 시그니처를 만듭니다. (예: check_transfer(address,uint256))
+    """
+    return f"{item['name']}({','.join(_canonical_type(param) for param in item.get('inputs', []))})"
+
+def discover_properties(foundry_dir, prefixes=None, contract_names=None):
+    """
+    Halmos 전용 산출물 인덱스의 ABI에서 Halmos 속성 함수(check_/prove_)를 찾습니다. (lib/ 의존성은 제외)
+
+    Args:
+        contract_names: 지정하면 이 컨트랙트들의 속성 함수만 (빈 집합이면 없음)
+
+    Returns:
+        [{'contract', 'source', 'name', 'signature', 'bytecode_hash'}] (소스 경로, 컨트랙트, 시그니처 순)
+    """
+    prefixes = tuple(prefixes or HALMOS_CONFIG['prefixes'])
+    properties = []
+    for entry in get_artifact_index(foundry_dir, halmos_out_dir()).contracts(deployable=True):
+        if entry['source'].startswith('lib/') or (contract_names is not None and entry['name'] not in contract_names):
+            continue
+        signatures = sorted({
+            function_signature(item) for item in entry['abi']
+            if item.get('type') == 'function' and item.get('name', '').startswith(prefixes)
+        })
+        for signature in signatures:
+            properties.append({
+                'contract': entry['name'],
+                'source': entry['source'],
+                'name': signature.split('(', 1)[0],
+                'signature': signature,
+                'bytecode_hash': entry['bytecode_hash'],
+            })
+    return properties
+
+def halmos_options(solver_timeout=None, loop=None):
+    """
+    판정에 영향을 주는 Halmos 옵션 (캐시 키에 포함)
+    """
+    return {
+        'solver_timeout': solver_timeout or HALMOS_CONFIG['solver_timeout'],
+        'loop': loop or HALMOS_CONFIG['loop'],
+    }
+
+def build_halmos_args(foundry_dir, prop, options):
+    """
+    속성 함수 하나만 검증하는 Halmos 실행 인자를 만듭니다.
+    """
+    return halmos_build_env() + [
+        'halmos',
+        '--root', str(Path(foundry_dir).absolute()),
+        '--forge-build-out', halmos_out_dir(),
+        '--contract', prop['contract'],
+        '--match-test', f"^{re.escape(prop['name'])}\\(",
+        '--loop', str(options['loop']),
+        '--solver-timeout-assertion', str(int(options['solver_timeout'] * 1000)),
+    ]
+
+def parse_halmos_output(output, signature):
+    """
+    Halmos 출력에서 속성 함수 하나의 판정과 반례를 추출합니다.
+
+    Returns:
+        {'verdict', 'paths', 'time', 'counterexample'} (결과 줄이 없으면 None)
+    """
+    parsed = None
+    collecting = False
+    for raw_line in output.splitlines():
+        line = _ANSI.sub('', raw_line).rstrip()
+        match = _RESULT_LINE.match(line.strip())
+        if match:
+            collecting = False
+            if match.group(2) != signature:
+                if parsed is not None:
+                    # 다음 함수의 결과 (반례 줄이 섞이지 않도록 중단)
+                    break
+                continue
+            stats = dict(_STAT.findall(match.group(3) or ''))
+            parsed = {
+                'verdict': _VERDICTS.get(match.group(1), 'error'),
+                'paths': int(float(stats['paths'])) if 'paths' in stats else None,
+                'time': float(stats['time']) if 'time' in stats else None,
+                'counterexample': [],
+            }
+            continue
+        if parsed is None:
+            continue
+        if line.strip().startswith('Counterexample'):
+            collecting = True
+            value = line.split(':', 1)[1].strip() if ':' in line else ''
+            if value and value != '∅':
+                parsed['counterexample'].append(value)
+        elif collecting and line.startswith((' ', '\t')) and line.strip():
+            parsed['counterexample'].append(line.strip())
+        else:
+            collecting = False
+    return parsed
+
+def prove_property(foundry_dir, prop, options, timeout=None, debug=False):
+    """
+    속성 함수 하나를 Halmos로 검증합니다. 전체 실행 시간이 timeout을 넘으면 중지하고 timeout으로 판정합니다.
+
+    Returns:
+        판정 dict (속성 정보 + verdict, paths, time, counterexample, details)
+    """
+    timeout = timeout or HALMOS_CONFIG['timeout']
+    args = build_halmos_args(foundry_dir, prop, options)
+    if debug:
+        print(f"[디버그] Halmos 실행 명령어: {' '.join(args)}")
+    result = _run_halmos_container(foundry_dir, args, timeout, debug)
+    parsed = parse_halmos_output(result.stdout, prop['signature'])
+    killed = parsed is None and result.returncode == TIMEOUT_RETURNCODE
+    if parsed is None:
+        parsed = {'verdict': 'timeout' if killed else 'error', 'paths': None, 'time': None, 'counterexample': []}
+        if killed:
+            parsed['time'] = float(timeout)
+    details = '' if parsed['verdict'] != 'error' else (result.stderr or result.stdout).strip()[-2000:]
+    # killed: 전체 실행 시간 제한으로 중지 (제한 시간이 판정에 영향을 주므로 캐시하지 않음)
+    return dict(prop, details=details, cached=False, killed=killed, **parsed)
+
+def verdict_cache_key(prop, options, digest):
+    """
+    (속성 컨트랙트 바이트코드 해시, 함수 시그니처, Halmos 옵션, 이미지 digest) 조합의 캐시 키
+    """
+    return sha256_text('halmos', prop['bytecode_hash'], prop['contract'], prop['signature'],
+                       json.dumps(options, sort_keys=True), digest)
+
+def prove_halmos_properties(foundry_dir, properties, options=None, timeout=None, use_cache=None, debug=False):
+    """
+    속성 함수들을 실행기의 'prove' 자원 제한 아래에서 함수별로 병렬 검증합니다.
+    바이트코드와 옵션이 같은 함수는 캐시된 판정을 재사용하여 다시 증명하지 않습니다.
+
+    Returns:
+        (판정 목록(입력 순서), 통계 dict {'properties', 'cache_hits', 'proved'})
+    """
+    options = options or halmos_options()
+    if use_cache is None:
+        use_cache = HALMOS_CONFIG['cache']
+    verdicts = [None] * len(properties)
+    stats = {'properties': len(properties), 'cache_hits': 0, 'proved': 0}
+
+    cache = None
+    keys = {}
+    if use_cache:
+        cache = DiskCache('halmos', HALMOS_CONFIG['cache_max_bytes'])
+        digest = image_id(DOCKER_CONFIG['halmos']['tag'])
+        keys = {i: verdict_cache_key(prop, options, digest) for i, prop in enumerate(properties) if prop['bytecode_hash']}
+        cached = cache.get_many(keys.values())
+        for i, key in keys.items():
+            if key in cached:
+                verdicts[i] = dict(properties[i], cached=True, details='', **cached[key])
+                stats['cache_hits'] += 1
+
+    pending = [i for i, verdict in enumerate(verdicts) if verdict is None]
+    if pending:
+        runner = get_runner()
+        results = runner.gather(*(
+            runner.call_async('prove', prove_property, foundry_dir, properties[i], options, timeout, debug)
+            for i in pending
+        ))
+        fresh = {}
+        for i, result in zip(pending, results):
+            if isinstance(result, Exception):
+                result = dict(properties[i], verdict='error', paths=None, time=None, counterexample=[],
+                              details=str(result), cached=False, killed=False)
+            verdicts[i] = result
+            stats['proved'] += 1
+            if i in keys and result['verdict'] in CACHED_VERDICTS and not result.get('killed'):
+                fresh[keys[i]] = {field: result[field] for field in ('verdict', 'paths', 'time', 'counterexample')}
+        if cache is not None and fresh:
+            cache.put_many(fresh)
+
+    if cache is not None:
+        cache.close()
+    return verdicts, stats
+
+def halmos_bugs(verdicts):
+    """
+    반례가 발견된 판정을 버그 항목으로 변환합니다. (result.aggregator.halmos_finding 입력)
+    """
+    return [
+        {'contract': verdict['contract'], 'source': verdict['source'], 'name': verdict['name'],
+         'signature': verdict['signature'], 'counterexample': verdict['counterexample']}
+        for verdict in verdicts if verdict['verdict'] == 'counterexample'
+    ]
+
+def format_verdicts(verdicts, stats):
+    """
+    함수별 판정을 표 형태 문자열로 만듭니다.
+    """
+    labels = {'pass': 'PASS', 'counterexample': 'FAIL', 'timeout': 'TIMEOUT', 'error': 'ERROR'}
+    lines = [f"Halmos 속성 함수 {stats['properties']}개 검증 (캐시 적중 {stats['cache_hits']}개, 새로 검증 {stats['proved']}개)"]
+    for verdict in verdicts:
+        extra = []
+        if verdict['paths'] is not None:
+            extra.append(f"paths {verdict['paths']}")
+        if verdict['time'] is not None:
+            extra.append(f"{verdict['time']:.2f}초")
+        if verdict['cached']:
+            extra.append("캐시")
+        suffix = f" ({', '.join(extra)})" if extra else ""
+        lines.append(f"  [{labels[verdict['verdict']]}] {verdict['contract']}.{verdict['signature']}{suffix}")
+        for value in verdict['counterexample']:
+            lines.append(f"      반례: {value}")
+        if verdict['details']:
+            lines.append(f"      {verdict['details'].splitlines()[-1]}")
+    return '\n'.join(lines)
+
+def halmos_result(verdicts, stats):
+    """
+    판정 목록을 분석 결과 dict로 변환합니다. (다른 엔진과 같은 status/message/details 형식)
+    """
+    bugs = halmos_bugs(verdicts)
+    counts = {}
+    for verdict in verdicts:
+        counts[verdict['verdict']] = counts.get(verdict['verdict'], 0) + 1
+    if not verdicts:
+        return {
+            "status": "completed",
+            "message": "검증할 속성 함수(check_/prove_)가 없습니다.",
+            "details": "",
+            "contract_address": None
+        }
+    result = {
+        "status": "vulnerability_found" if bugs else "completed",
+        "message": "반례가 발견되었습니다!" if bugs else "분석이 완료되었습니다.",
+        "details": format_verdicts(verdicts, stats),
+        "contract_address": None,
+        "verdicts": counts,
+    }
+    if bugs:
+        result["bugs"] = bugs
+    return result
+
+def halmos_error(e):
+    return {
+        "status": "error",
+        "message": f"Halmos 실행 중 오류 발생: {str(e)}",
+        "details": str(e),
+        "contract_address": None
+    }
+
+def run_halmos(foundry_project_dir, contract_name=None, debug=False, use_cache=None, solver_timeout=None, timeout=None):
+    """
+    Halmos를 사용한 전체 분석 워크플로우
+
+    Args:
+        contract_name: 속성 함수를 찾을 컨트랙트 이름 또는 이름 목록 (None이면 lib/를 제외한 모든 컨트랙트)
+        use_cache: 함수별 판정 캐시 사용 여부 (None이면 설정값)
+        solver_timeout: 어설션 하나의 솔버 제한 시간(초)
+        timeout: 함수 하나의 전체 실행 제한 시간(초)
+    """
+    names = [contract_name] if isinstance(contract_name, str) else list(contract_name or [])
+    try:
+        # 1. Docker 이미지 준비
+        ensure_image('halmos', debug)
+
+        # 2. 컴파일 (AST 포함)
+        build_halmos_project(foundry_project_dir, debug)
+
+        # 3. 속성 함수 탐색 및 함수별 병렬 검증
+        properties = discover_properties(foundry_project_dir, contract_names=names or None)
+        if debug:
+            print(f"[디버그] Halmos 속성 함수 {len(properties)}개: {[prop['contract'] + '.' + prop['name'] for prop in properties]}")
+        verdicts, stats = prove_halmos_properties(foundry_project_dir, properties, halmos_options(solver_timeout),
+                                                  timeout, use_cache, debug)
+
+        # 4. 결과 반환
+        return halmos_result(verdicts, stats)
+
+    except Exception as e:
+        return halmos_error(e)
@@ -1,355 +1,69 @@
 # ityfuzz_adapter.py
 # ITYfuzz 도구 연동 어댑터 (블록체인 지원 추가)
 
-import subprocess
 import json
 import os
-import time
+import subprocess
 import tempfile
 import shutil
-import re
-import requests
+from contextlib import nullcontext
 from pathlib import Path
-from eth_utils import keccak
-import rlp
-from ..config import DOCKER_CONFIG, ITYFUZZ_CONFIG, ANVIL_ACCOUNTS
+from ..artifacts import get_artifact_index
+from ..config import DOCKER_CONFIG, ITYFUZZ_CONFIG, ANVIL_ACCOUNTS, CORPUS_CONFIG
+from .ityfuzz_campaign import create_campaign, format_campaign_summary, run_campaign
+from .ityfuzz_corpus import CorpusStore
+from .ityfuzz_output import CampaignMonitor
+from .ityfuzz_scheduler import BudgetScheduler, format_budget_report
+from ..infrastructure.anvil_manager import dump_chain_state, get_anvil_pool
+from ..infrastructure.build_cache import TOOLCHAIN_PROBE, ensure_build
+from ..infrastructure.contract_deployer import (
+    compile_project, deploy_contract, deploy_contracts, load_deployment_plan, probe_toolchain
+)
+from ..infrastructure.container_session import get_session, sessions_enabled
+from ..infrastructure.docker_manager import (
+    TIMEOUT_RETURNCODE, ContainerProcess, ensure_image, image_id, run_container
+)
+from ..infrastructure.process_runner import get_runner
 
-def build_docker_image():
-    """
-    ITYfuzz 도커 이미지가 없으면 자동으로 빌드합니다.
-    """
-    tag = DOCKER_CONFIG['ityfuzz']['tag']
-    dockerfile = DOCKER_CONFIG['ityfuzz']['dockerfile']
-    check_cmd = ['docker', 'images', '-q', tag]
-    result = subprocess.run(check_cmd, capture_output=True, text=True)
-    if not result.stdout.strip():
-        print(f"[정보] 도커 이미지({tag})가 없어 자동 빌드합니다...")
-        build_cmd = ['docker', 'build', '-f', dockerfile, '-t', tag, '.']
-        build_result = subprocess.run(build_cmd, capture_output=True, text=True)
-        if build_result.returncode != 0:
-            raise RuntimeError(f"도커 이미지 빌드 실패: {build_result.stderr}")
-        print(f"[성공] 도커 이미지({tag}) 빌드 완료.")
+# ITYfuzz 실행 모드별로 실제로 필요한 인프라
+# - setup: 퍼저가 컨테이너 안에서 직접 빌드하고 배포 스크립트(setUp)로 대상을 만들므로 체인/호스트 컴파일/배포가 필요 없음
+# - onchain: Anvil 체인에 배포된 주소를 대상으로 퍼징하므로 체인 시작, 호스트 컴파일, 배포, 설정 파일이 모두 필요
+# build는 컴파일할 위치이며, 빌드 캐시 키에 위치와 그 위치의 forge·solc 버전이 들어가 위치별로 따로 재사용됩니다.
+ITYFUZZ_RUN_MODES = {
+    'setup': {'chain': False, 'build': 'container', 'deploy': False, 'config': False},
+    'onchain': {'chain': True, 'build': 'host', 'deploy': True, 'config': True},
+}
 
-def start_anvil(debug=False):
-    """
-    Anvil 블록체인을 Docker 컨테이너로 시작합니다.
-    """
-    container_name = "chainhawk-anvil"
-    
-    # 기존 컨테이너 정리
-    stop_cmd = ['docker', 'stop', container_name]
-    subprocess.run(stop_cmd, capture_output=True)
-    
-    remove_cmd = ['docker', 'rm', container_name]
-    subprocess.run(remove_cmd, capture_output=True)
-    
-    # Anvil 컨테이너 시작
-    anvil_cmd = [
-        'docker', 'run', '-d',
-        '--name', container_name,
-        '--network', 'host',
-        DOCKER_CONFIG['anvil']['image'],
-        'anvil',
-        '--host', '0.0.0.0',
-        '--port', '8545',
-        '--chain-id', str(ITYFUZZ_CONFIG['chain_id']),
-        '--accounts', str(ITYFUZZ_CONFIG['accounts']),
-        '--balance', str(ITYFUZZ_CONFIG['balance']),
-        '--gas-limit', '30000000',
-        '--gas-price', '1',
-        '--mnemonic', ITYFUZZ_CONFIG['mnemonic']
-    ]
-    
-    if debug:
-        print(f"[디버그] Anvil 시작 명령어: {' '.join(anvil_cmd)}")
-    
-    result = subprocess.run(anvil_cmd, capture_output=True, text=True)
-    if result.returncode != 0:
-        if debug:
-            print(f"[디버그] Anvil 시작 오류: {result.stderr}")
-        raise RuntimeError(f"Anvil 시작 실패: {result.stderr}")
-    
-    # Anvil이 준비될 때까지 대기
-    print("[정보] Anvil 블록체인 시작 중...")
-    for i in range(30):
-        try:
-            test_cmd = [
-                'curl', '-s', '-X', 'POST',
-                '-H', 'Content-Type: application/json',
-                '--data', '{"jsonrpc":"2.0","method":"eth_blockNumber","params":[],"id":1}',
-                f'http://localhost:{ITYFUZZ_CONFIG["port"]}'
-            ]
-            test_result = subprocess.run(test_cmd, capture_output=True, text=True, timeout=5)
-            
-            if test_result.returncode == 0 and "result" in test_result.stdout:
-                print(f"[성공] Anvil이 포트 {ITYFUZZ_CONFIG['port']}에서 실행 중입니다.")
-                return True
-                
-        except subprocess.TimeoutExpired:
-            pass
-        except Exception as e:
-            if debug:
-                print(f"[디버그] 연결 테스트 오류: {e}")
-        
-        time.sleep(2)
-    
-    raise RuntimeError("Anvil 시작 타임아웃")
-
-def stop_anvil():
-    """
-    Anvil 컨테이너를 중지합니다.
+def plan_ityfuzz_run(mode=None):
     """
-    container_name = "chainhawk-anvil"
-    stop_cmd = ['docker', 'stop', container_name]
-    subprocess.run(stop_cmd, capture_output=True)
-    remove_cmd = ['docker', 'rm', container_name]
-    subprocess.run(remove_cmd, capture_output=True)
-    print("[정보] Anvil 블록체인이 중지되었습니다.")
+    ITYfuzz 실행 모드에 실제로 필요한 인프라 단계를 계산합니다.
 
-def calculate_contract_address(sender, nonce):
+    Returns:
+        {'mode', 'chain', 'build', 'deploy', 'config'} 실행 계획
     """
-    CREATE opcode 규칙을 사용하여 컨트랙트 주소를 계산합니다.
-    """
-    sender_bytes = bytes.fromhex(sender[2:])  # 0x 제거
-    encoded = rlp.encode([sender_bytes, nonce])
-    hash_result = keccak(encoded)
-    return '0x' + hash_result[-20:].hex()
-
-def deploy_contract(foundry_project_dir, contract_name=None, debug=False):
-    """
-    기존 Foundry 프로젝트 디렉토리를 사용하여 컨트랙트를 배포합니다.
-    
-    Args:
-        foundry_project_dir: Foundry 프로젝트 디렉토리 경로
-        contract_name: 배포할 컨트랙트 이름 (없으면 자동 감지)
-        debug: 디버그 모드
-    """
-    foundry_dir = Path(foundry_project_dir)
-    
-    if not foundry_dir.exists():
-        raise RuntimeError(f"Foundry 프로젝트 디렉토리가 존재하지 않습니다: {foundry_project_dir}")
-    
-    if not (foundry_dir / "foundry.toml").exists():
-        raise RuntimeError(f"유효한 Foundry 프로젝트가 아닙니다: {foundry_project_dir}")
-    
-    src_dir = foundry_dir / "src"
-    if not src_dir.exists():
-        raise RuntimeError(f"src 디렉토리가 없습니다: {src_dir}")
-    
-    try:
-        # 컨트랙트 이름이 지정되지 않으면 자동 감지
-        if not contract_name:
-            # src 디렉토리에서 첫 번째 .sol 파일 찾기
-            sol_files = list(src_dir.glob("*.sol"))
-            if not sol_files:
-                raise RuntimeError(f"src 디렉토리에 .sol 파일이 없습니다: {src_dir}")
-            
-            # 첫 번째 파일에서 컨트랙트 이름 추출
-            first_contract_file = sol_files[0]
-            with open(first_contract_file, 'r') as f:
-                content = f.read()
-                contract_matches = re.findall(r'contract\s+(\w+)', content)
-                if contract_matches:
-                    contract_name = contract_matches[0]
-                    contract_file_name = first_contract_file.name
-                else:
-                    raise RuntimeError(f"컨트랙트를 찾을 수 없습니다: {first_contract_file}")
-        else:
-            # 지정된 컨트랙트 이름으로 파일 찾기
-            contract_file_name = f"{contract_name}.sol"
-            contract_file_path = src_dir / contract_file_name
-            if not contract_file_path.exists():
-                raise RuntimeError(f"컨트랙트 파일을 찾을 수 없습니다: {contract_file_path}")
-        
-        if debug:
-            print(f"[디버그] 컨트랙트 이름: {contract_name}")
-            print(f"[디버그] 컨트랙트 파일: {contract_file_name}")
-            print(f"[디버그] Foundry 프로젝트: {foundry_dir}")
-        
-        # 컴파일
-        compile_cmd = ['forge', 'build']
-        
-        if debug:
-            print(f"[디버그] 컴파일 명령어: {' '.join(compile_cmd)}")
-        
-        compile_result = subprocess.run(
-            compile_cmd, 
-            cwd=foundry_dir,
-            capture_output=True, 
-            text=True
-        )
-        
-        if compile_result.returncode != 0:
-            if debug:
-                print(f"[디버그] 컴파일 오류:")
-                print(f"stdout: {compile_result.stdout}")
-                print(f"stderr: {compile_result.stderr}")
-            raise RuntimeError(f"컨트랙트 컴파일 실패: {compile_result.stderr}")
-        
-        if debug:
-            print(f"[디버그] 컴파일 성공!")
-        
-        # 배포 전에 논스 확인 및 컨트랙트 주소 미리 계산
-        deployer_address = ANVIL_ACCOUNTS[0]["address"]
-        deployer_key = ANVIL_ACCOUNTS[0]["private_key"]
-        
-        # 현재 논스 가져오기
-        nonce_payload = {
-            "jsonrpc": "2.0",
-            "method": "eth_getTransactionCount",
-            "params": [deployer_address, "latest"],
-            "id": 1
-        }
-        
-        try:
-            response = requests.post(
-                f'http://localhost:{ITYFUZZ_CONFIG["port"]}',
-                json=nonce_payload,
-                timeout=10
-            )
-            current_nonce = int(response.json()["result"], 16)
-            if debug:
-                print(f"[디버그] 현재 논스: {current_nonce}")
-        except Exception as e:
-            if debug:
-                print(f"[디버그] 논스 조회 실패: {e}")
-            current_nonce = 0
-        
-        # 컨트랙트 주소 미리 계산
-        expected_address = calculate_contract_address(deployer_address, current_nonce)
-        if debug:
-            print(f"[디버그] 예상 컨트랙트 주소: {expected_address}")
-        
-        # 배포
-        deploy_cmd = [
-            'forge', 'create',
-            f'src/{contract_file_name}:{contract_name}',
-            '--rpc-url', f'http://localhost:{ITYFUZZ_CONFIG["port"]}',
-            '--private-key', deployer_key,
-            '--json'
-        ]
-        
-        if debug:
-            print(f"[디버그] 배포 명령어: {' '.join(deploy_cmd)}")
-        
-        deploy_result = subprocess.run(
-            deploy_cmd,
-            cwd=foundry_dir,
-            capture_output=True,
-            text=True
-        )
-        
-        if deploy_result.returncode != 0:
-            if debug:
-                print(f"[디버그] 배포 오류:")
-                print(f"stdout: {deploy_result.stdout}")
-                print(f"stderr: {deploy_result.stderr}")
-            raise RuntimeError(f"컨트랙트 배포 실패: {deploy_result.stderr}")
-        
-        if debug:
-            print(f"[디버그] 배포 출력:")
-            print(deploy_result.stdout)
-        
-        # 배포 결과에서 컨트랙트 주소 추출
-        contract_address = None
-        
-        try:
-            deployment_info = json.loads(deploy_result.stdout)
-            
-            # 다양한 필드에서 컨트랙트 주소 찾기
-            possible_fields = ["deployedTo", "contractAddress", "address"]
-            for field in possible_fields:
-                if field in deployment_info and deployment_info[field]:
-                    contract_address = deployment_info[field]
-                    break
-            
-            # 트랜잭션 해시가 있으면 receipt에서 확인
-            tx_hash = None
-            if "transactionHash" in deployment_info:
-                tx_hash = deployment_info["transactionHash"]
-            elif "transaction" in deployment_info:
-                tx_info = deployment_info["transaction"]
-                if "hash" in tx_info:
-                    tx_hash = tx_info["hash"]
-            
-            if not contract_address and tx_hash:
-                if debug:
-                    print(f"[디버그] 트랜잭션 해시에서 주소 추출: {tx_hash}")
-                
-                # 잠시 대기 후 receipt 조회
-                time.sleep(2)
-                
-                receipt_payload = {
-                    "jsonrpc": "2.0",
-                    "method": "eth_getTransactionReceipt",
-                    "params": [tx_hash],
-                    "id": 1
-                }
-                
-                try:
-                    response = requests.post(
-                        f'http://localhost:{ITYFUZZ_CONFIG["port"]}',
-                        json=receipt_payload,
-                        timeout=10
-                    )
-                    receipt_data = response.json()
-                    
-                    if debug:
-                        print(f"[디버그] Receipt 데이터: {receipt_data}")
-                    
-                    if "result" in receipt_data and receipt_data["result"]:
-                        receipt = receipt_data["result"]
-                        if "contractAddress" in receipt and receipt["contractAddress"]:
-                            contract_address = receipt["contractAddress"]
-                            
-                except Exception as rpc_e:
-                    if debug:
-                        print(f"[디버그] Receipt RPC 오류: {rpc_e}")
-                        
-        except (json.JSONDecodeError, KeyError) as e:
-            if debug:
-                print(f"[디버그] JSON 파싱 오류: {e}")
-        
-        # 여전히 주소를 못 찾았으면 예상 주소 사용
-        if not contract_address:
-            contract_address = expected_address
-            if debug:
-                print(f"[디버그] 예상 주소 사용: {contract_address}")
-        
-        # 주소 유효성 검증
-        if not re.match(r'^0x[a-fA-F0-9]{40}$', contract_address):
-            raise RuntimeError(f"유효하지 않은 컨트랙트 주소: {contract_address}")
-        
-        print(f"[성공] {contract_name} 배포 완료: {contract_address}")
-        return contract_address
-        
-    except Exception as e:
-        raise e
+    mode = mode or ITYFUZZ_CONFIG['mode']
+    if mode not in ITYFUZZ_RUN_MODES:
+        raise RuntimeError(f"지원하지 않는 ITYfuzz 실행 모드입니다: {mode}")
+    return dict(ITYFUZZ_RUN_MODES[mode], mode=mode)
 
-def create_ityfuzz_config(contract_address, foundry_dir, contract_name):
+def create_ityfuzz_config(contract_address, foundry_dir, contract_name, rpc_url):
     """
     ITYfuzz를 위한 오프체인 설정 파일을 생성합니다. (ABI 포함 버전)
     """
-    # ABI 파일에서 ABI 정보 읽기
-    abi_file_path = Path(foundry_dir) / "out" / f"{contract_name}.sol" / f"{contract_name}.json"
-    abi_data = []
-    
-    if abi_file_path.exists():
-        try:
-            with open(abi_file_path, 'r') as f:
-                contract_json = json.load(f)
-                abi_data = contract_json.get("abi", [])
-        except Exception as e:
-            print(f"[경고] ABI 파일 읽기 실패: {e}")
+    # 산출물 인덱스에서 ABI 조회 (산출물 JSON을 다시 읽지 않음)
+    entry = get_artifact_index(foundry_dir).get(contract_name)
+    abi_data = entry['abi'] if entry else []
+    if entry is None:
+        print(f"[경고] 컴파일 산출물에서 ABI를 찾을 수 없습니다: {contract_name}")
     
     config = {
         "target": {
             "type": "onchain",
             "address": contract_address,
             "abi": abi_data,  # ABI 직접 포함
-            "abi_path": f"out/{contract_name}.sol/{contract_name}.json"
+            "abi_path": f"out/{entry['artifact'] if entry else f'{contract_name}.sol/{contract_name}.json'}"
         },
-        "rpc_url": f"http://localhost:{ITYFUZZ_CONFIG['port']}",
+        "rpc_url": rpc_url,
         "chain_id": ITYFUZZ_CONFIG['chain_id'],
         "deployer": ANVIL_ACCOUNTS[0]["address"],
         "deployer_private_key": ANVIL_ACCOUNTS[0]["private_key"],
@@ -367,6 +81,68 @@ def create_ityfuzz_config(contract_address, foundry_dir, contract_name):
     
     return config_path
 
+def ityfuzz_volumes(foundry_dir, results_dir):
+    """
+    ITYfuzz 컨테이너 마운트 목록을 반환합니다.
+    Foundry 프로젝트는 호스트와 같은 절대 경로로 마운트하여 forge 캐시(cache/)의 경로가 양쪽에서 그대로 유효하도록 합니다.
+    """
+    project_path = str(Path(foundry_dir).absolute())
+    return [
+        (project_path, project_path, 'rw'),
+        (str(Path(results_dir).absolute()), '/results', 'rw'),
+    ]
+
+def ityfuzz_session(foundry_dir, results_dir, debug=False):
+    """
+    Foundry 프로젝트와 결과 디렉토리(/results)를 마운트한 ITYfuzz 세션 컨테이너를 반환합니다.
+    """
+    return get_session('ityfuzz', ityfuzz_volumes(foundry_dir, results_dir),
+                       workdir=str(Path(foundry_dir).absolute()), network='host', debug=debug)
+
+def compile_in_container(foundry_dir, debug=False):
+    """
+    ITYfuzz 컨테이너 안에서 forge build로 Foundry 프로젝트를 컴파일합니다.
+    """
+    results_dir = Path("./ityfuzz_results")
+    results_dir.mkdir(exist_ok=True)
+    compile_cmd = ['forge', 'build']
+    if debug:
+        print(f"[디버그] 컨테이너 컴파일 명령어: {' '.join(compile_cmd)}")
+    
+    runner = get_runner()
+    if sessions_enabled():
+        result = runner.call('compile', ityfuzz_session(foundry_dir, results_dir, debug).exec, compile_cmd)
+    else:
+        result = runner.call('compile', run_container, DOCKER_CONFIG['ityfuzz']['tag'], compile_cmd,
+                             volumes=ityfuzz_volumes(foundry_dir, results_dir),
+                             workdir=str(Path(foundry_dir).absolute()), debug=debug)
+    
+    if result.returncode != 0:
+        if debug:
+            print(f"[디버그] 컴파일 오류:")
+            print(f"stdout: {result.stdout}")
+            print(f"stderr: {result.stderr}")
+        raise RuntimeError(f"컨트랙트 컴파일 실패: {result.stderr}")
+
+def probe_container_toolchain(foundry_dir, debug=False):
+    """
+    ITYfuzz 컨테이너의 forge 버전과 설치된 solc 목록을 빌드 캐시 키용 문자열로 반환합니다.
+    """
+    results_dir = Path("./ityfuzz_results")
+    results_dir.mkdir(exist_ok=True)
+    runner = get_runner()
+    if sessions_enabled():
+        result = runner.call('probe', ityfuzz_session(foundry_dir, results_dir, debug).exec, TOOLCHAIN_PROBE)
+    else:
+        result = runner.call('probe', run_container, DOCKER_CONFIG['ityfuzz']['tag'], TOOLCHAIN_PROBE,
+                             volumes=ityfuzz_volumes(foundry_dir, results_dir),
+                             workdir=str(Path(foundry_dir).absolute()), debug=debug)
+    if result.returncode != 0 or not result.stdout.strip():
+        raise RuntimeError(f"컨테이너 forge 버전 확인 실패: {result.stderr.strip()}")
+    if debug:
+        print(f"[디버그] 컨테이너 툴체인: {' / '.join(result.stdout.split())}")
+    return f"container:{image_id(DOCKER_CONFIG['ityfuzz']['tag'])}\n{result.stdout.strip()}"
+
 def debug_ityfuzz_container(foundry_dir, debug=False):
     """
     ITYfuzz 컨테이너 내부 상태를 디버깅합니다.
@@ -376,21 +152,14 @@ def debug_ityfuzz_container(foundry_dir, debug=False):
     results_dir = Path("./ityfuzz_results")
     results_dir.mkdir(exist_ok=True)
     
-    # 컨테이너 내부 파일 시스템 확인
-    debug_cmd = [
-        'docker', 'run', '--rm',
-        '--network', 'host',
-        '-v', f'{foundry_abs_path}:/project',
-        '-v', f'{results_dir.absolute()}:/results',
-        '-w', '/project',
-        tag,
-        'sh', '-c', 'ls -la /project && echo "=== Script directory ===" && ls -la /project/script/ && echo "=== Config file ===" && cat /project/ityfuzz_config.json && echo "=== Out directory ===" && ls -la /project/out/ReentrancyVuln.sol/'
-    ]
-    
-    if debug:
-        print(f"[디버그] 컨테이너 내부 확인 명령어: {' '.join(debug_cmd)}")
-    
-    result = subprocess.run(debug_cmd, capture_output=True, text=True)
+    # 컨테이너 내부 파일 시스템 확인 (작업 디렉토리 = 프로젝트)
+    inspect_args = ['sh', '-c', 'ls -la . && echo "=== Script directory ===" && ls -la script/ && echo "=== Config file ===" && cat ityfuzz_config.json && echo "=== Out directory ===" && ls -la out/ReentrancyVuln.sol/']
+
+    if sessions_enabled():
+        result = ityfuzz_session(foundry_dir, results_dir, debug).exec(inspect_args)
+    else:
+        result = run_container(tag, inspect_args, volumes=ityfuzz_volumes(foundry_dir, results_dir),
+                               workdir=str(foundry_abs_path), network='host', debug=debug)
     
     if debug:
         print(f"[디버그] 컨테이너 내부 상태:")
@@ -399,136 +168,354 @@ def debug_ityfuzz_container(foundry_dir, debug=False):
     
     return result.stdout, result.stderr
 
-def run_ityfuzz_fuzzing(contract_address, foundry_dir, contract_name, debug=False):
+def build_ityfuzz_args(plan, contract_address=None, rpc_url=None, work_dir=None, seed=None):
     """
-    배포된 컨트랙트에 대해 ITYfuzz 퍼징을 실행합니다.
+    실행 계획에 맞는 ITYfuzz 실행 인자를 만듭니다.
+
+    Args:
+        work_dir: 컨테이너 안의 작업 디렉토리 (코퍼스/버그 보고서 출력 위치)
+        seed: 난수 시드
+    """
+    options = []
+    if work_dir:
+        options += ['--work-dir', work_dir]
+    if seed is not None:
+        options += ['--seed', str(seed)]
+    if plan['mode'] == 'onchain':
+        # Anvil 체인에 배포된 주소를 대상으로 퍼징
+        return [
+            'ityfuzz', 'evm',
+            '--target', contract_address,
+            '--chain-type', 'local',
+            '--onchain-url', rpc_url,
+            '--onchain-chain-id', str(ITYFUZZ_CONFIG['chain_id']),
+        ] + options
+    # 배포 스크립트의 setUp으로 대상을 만들고, 빌드는 컨테이너 안에서 직접 수행 (빌드 명령은 마지막 인자)
+    return [
+        'ityfuzz', 'evm',
+        '--target', f'script/Deploy.s.sol:DeployScript',
+        '--deployment-script', f'script/Deploy.s.sol:DeployScript',
+        '--target-type', 'setup',
+    ] + options + [
+        'forge', 'build'
+    ]
+
+def corpus_target(foundry_dir, contract_name):
+    """
+    코퍼스 저장소 키로 쓸 대상 컨트랙트의 인덱스 항목을 찾습니다. (런타임 바이트코드가 없으면 None)
+    """
+    index = get_artifact_index(foundry_dir)
+    entry = index.get(contract_name) or index.default_contract()
+    return entry if entry and entry['bytecode_hash'] else None
+
+def run_ityfuzz_fuzzing(contract_address, foundry_dir, contract_name, debug=False, plan=None, rpc_url=None, workers=None,
+                        use_corpus=None, stop_on_first=False, timeout=None, corpus_store=None):
+    """
+    ITYfuzz 퍼징을 실행합니다. (setup 모드는 배포 스크립트 대상, onchain 모드는 배포된 컨트랙트 대상)
+    workers개의 인스턴스를 워커별 시드와 작업 디렉토리(ityfuzz_results/<캠페인>/worker-i)로 병렬 실행하고,
+    코디네이터가 주기적으로 코퍼스를 병합하며 발견된 버그의 중복을 제거합니다.
+    use_corpus가 켜져 있으면 대상 바이트코드(또는 ABI)가 같은 이전 캠페인의 코퍼스로 시작하고, 끝나면 코퍼스를 저장합니다.
+    corpus_store를 지정하면 use_corpus와 관계없이 그 저장소를 사용합니다. (예산 스케줄러의 실행 전용 저장소)
+    퍼저 출력은 줄 단위로 파싱하여 진행 상황(실행 속도, 커버리지, objective)을 모으고, 전체 로그는 워커별 fuzz.log에 남깁니다.
+    stop_on_first가 켜져 있으면 첫 번째 취약점이 확인되는 즉시 모든 워커를 중지합니다.
+    timeout은 퍼징 시간(초)이며, 지정하지 않으면 설정값(ITYFUZZ_CONFIG['timeout'])을 사용합니다.
+
+    Returns:
+        (요약 stdout, stderr, 캠페인 요약 dict)
     """
     tag = DOCKER_CONFIG['ityfuzz']['tag']
+    timeout = timeout or ITYFUZZ_CONFIG['timeout']
+    plan = plan or plan_ityfuzz_run()
+    workers = workers or ITYFUZZ_CONFIG['workers']
+    use_corpus = CORPUS_CONFIG['enabled'] if use_corpus is None else use_corpus
     
     # 결과 디렉토리 생성
     results_dir = Path("./ityfuzz_results")
     results_dir.mkdir(exist_ok=True)
+    campaign_dir, fuzz_workers = create_campaign(results_dir, workers, ITYFUZZ_CONFIG['seed'])
     
     if debug:
         print(f"[디버그] 컨트랙트 이름: {contract_name}")
-    
-    # 배포 스크립트 생성
-    config_path = create_ityfuzz_config(contract_address, foundry_dir, contract_name)
+        print(f"[디버그] 캠페인 디렉토리: {campaign_dir} (워커 {len(fuzz_workers)}개)")
+    
+    # 온체인 모드에서만 설정 파일 생성
+    config_path = None
+    if plan['config']:
+        config_path = create_ityfuzz_config(contract_address, foundry_dir, contract_name, rpc_url)
+    
+    # 저장된 코퍼스로 시작 (런타임 바이트코드 해시 일치 또는 ABI 해시 일치)
+    if corpus_store is None and use_corpus:
+        corpus_store = CorpusStore()
+    target = corpus_target(foundry_dir, contract_name) if corpus_store else None
+    if target is None:
+        corpus_store = None
+    if corpus_store:
+        seeded, match = corpus_store.seed(target['bytecode_hash'], target['abi_hash'], fuzz_workers)
+        if seeded:
+            kind = '바이트코드 일치' if match == 'exact' else 'ABI 일치'
+            print(f"[정보] 저장된 코퍼스 {seeded}개로 시작합니다. ({target['name']}, {kind})")
     
     foundry_abs_path = Path(foundry_dir).absolute()
-    
-    # ITYfuzz 실행 명령어
-    ityfuzz_cmd = [
-        'docker', 'run', '--rm',
-        '-v', f'{foundry_abs_path}:/project',
-        '-v', f'{results_dir.absolute()}:/results',
-        '-w', '/project',
-        tag, 'ityfuzz', 'evm',
-        '--target', f'script/Deploy.s.sol:DeployScript',
-        '--deployment-script', f'script/Deploy.s.sol:DeployScript',
-        '--target-type', 'setup',
-        'forge', 'build'
-    ]
-    
-    if debug:
-        print(f"[디버그] ITYfuzz 실행 명령어: {' '.join(ityfuzz_cmd)}")
-    
-    try:
-        # 실시간 출력을 위해 capture_output=False로 설정
-        result = subprocess.run(
-            ityfuzz_cmd,
-            capture_output=False,  # 실시간 출력을 위해 False로 설정
-            text=True,
-            timeout=300
-        )
-        stdout = ""
-        stderr = ""
-    except subprocess.TimeoutExpired:
+    # 워커가 하나면 출력을 실시간으로 표시하고, 여러 개면 합계 진행 상황만 주기적으로 표시 (전체 출력은 항상 fuzz.log에 저장)
+    stream_output = len(fuzz_workers) == 1
+    monitor = CampaignMonitor(stop_on_first)
+    
+    def run_worker(worker, worker_timeout):
+        # 퍼저 워커는 실행기의 'fuzz' 자원 제한 아래에서 실행 (다른 대상/엔진의 퍼저와 코어를 나눠 씀)
+        return get_runner().call('fuzz', fuzz_worker, worker, worker_timeout)
+    
+    def fuzz_worker(worker, worker_timeout):
+        # ITYfuzz 실행 인자
+        ityfuzz_args = build_ityfuzz_args(plan, contract_address, rpc_url, worker.container_work_dir, worker.seed)
+        if sessions_enabled():
+            # 세션 컨테이너 내부의 timeout으로 감싸 제한 시간 초과 시 퍼저 프로세스도 함께 종료
+            process = ityfuzz_session(foundry_dir, results_dir, debug).spawn(ityfuzz_args, timeout=worker_timeout)
+        else:
+            process = ContainerProcess(tag, ityfuzz_args, volumes=ityfuzz_volumes(foundry_dir, results_dir),
+                                       workdir=str(foundry_abs_path), network='host' if plan['chain'] else None,
+                                       timeout=worker_timeout, debug=debug)
+        monitor.attach(process)
+        parser = monitor.parser(worker.index)
+        try:
+            with open(worker.log_path, 'a', encoding='utf-8') as log:
+                for line in process.lines():
+                    log.write(line + '\n')
+                    if stream_output:
+                        print(line)
+                    monitor.update(worker.index, parser.feed(line))
+                    if not stream_output:
+                        monitor.maybe_report()
+            returncode = process.wait()
+        finally:
+            monitor.detach(process)
+        if returncode == TIMEOUT_RETURNCODE and debug:
+            print(f"[디버그] ITYfuzz 워커 {worker.index} 제한 시간 종료 ({worker_timeout:.0f}초)")
+        return subprocess.CompletedProcess(ityfuzz_args, returncode, '', '')
+    
+    summary = run_campaign(run_worker, fuzz_workers, timeout, debug=debug, monitor=monitor)
+    
+    if corpus_store:
+        saved = corpus_store.save(target['bytecode_hash'], target['abi_hash'], target['name'], fuzz_workers)
         if debug:
-            print("[디버그] ITYfuzz 실행 타임아웃 (300초)")
-        stdout = "ITYfuzz가 300초간 실행되었습니다 (타임아웃)"
-        stderr = ""
+            print(f"[디버그] 코퍼스 저장: {saved}개 ({target['name']})")
+    
+    summary['first_bug'] = monitor.first_bug
+    stdout = format_campaign_summary(campaign_dir, fuzz_workers, summary)
+    if summary['timed_out']:
+        stdout = f"ITYfuzz가 {timeout:.0f}초간 실행되었습니다 (타임아웃)\n" + stdout
+    stderr = ""
     
     # 임시 파일 정리
     try:
-        if config_path.exists():
+        if config_path and config_path.exists():
             config_path.unlink()
     except Exception as e:
         if debug:
             print(f"[디버그] 파일 정리 중 오류: {e}")
     
-    return stdout, stderr
+    return stdout, stderr, summary
+
+def build_ityfuzz_project(foundry_project_dir, plan, use_cache=None, debug=False):
+    """
+    실행 모드에 맞는 위치에서 프로젝트를 컴파일합니다.
+    빌드 캐시에 적중하면 생략하며, 산출물은 호스트 배포와 컨테이너 퍼저가 함께 사용합니다.
+    """
+    if plan['build'] == 'host':
+        builder, toolchain = compile_project, probe_toolchain
+    else:
+        builder, toolchain = compile_in_container, probe_container_toolchain
+    return ensure_build(foundry_project_dir, lambda project_dir: builder(project_dir, debug),
+                        lambda project_dir: toolchain(project_dir, debug), use_cache, debug)
+
+def deploy_ityfuzz_targets(foundry_project_dir, plan, anvil, contract_name=None, deploy_plan=None, budget=None,
+                           dump_state=None, debug=False):
+    """
+    퍼징 대상을 배포하고 {이름: 주소} 목록을 만듭니다. (setup 모드는 배포 스크립트가 대상이므로 주소 없이 하나)
+
+    Returns:
+        (대상 {이름: 주소}, 주 대상 이름, 주 대상 주소)
+    """
+    names = [contract_name] if isinstance(contract_name, str) else list(contract_name or [])
+    contract_name = names[0] if names else None
+    rpc_url = anvil.rpc_url if anvil else None
+    
+    contract_address = None
+    deployments = dict(anvil.deployments) if anvil else {}
+    if plan['deploy'] and deployments and all(name in deployments for name in names):
+        # 불러온 체인 상태에 이미 배포되어 있으면 재배포 생략
+        if not contract_name:
+            contract_name = next(iter(deployments))
+        contract_address = deployments[contract_name]
+        print(f"[정보] 저장된 체인 상태의 배포 주소를 사용합니다: {contract_name} ({contract_address})")
+    elif plan['deploy'] and deploy_plan:
+        deployments.update(deploy_contracts(foundry_project_dir, rpc_url, load_deployment_plan(deploy_plan), debug))
+        if contract_name not in deployments:
+            contract_name = next(iter(deployments))
+        contract_address = deployments[contract_name]
+    elif plan['deploy'] and len(names) > 1:
+        deployments.update(deploy_contracts(foundry_project_dir, rpc_url,
+                                            [name for name in names if name not in deployments], debug))
+        contract_address = deployments[contract_name]
+    elif plan['deploy']:
+        contract_address = deploy_contract(foundry_project_dir, rpc_url, contract_name, debug, compile=False)
+    
+    # 실제 컨트랙트 이름 확인 (None이면 자동 감지된 이름 찾기)
+    if not contract_name and plan['config']:
+        entry = get_artifact_index(foundry_project_dir).default_contract()
+        if entry:
+            contract_name = entry['name']
+    contract_name = contract_name or "Contract"
+    
+    if debug:
+        print(f"[디버그] 사용할 컨트랙트 이름: {contract_name}")
+    
+    # 퍼징 대상 {이름: 주소} (setup 모드는 배포 스크립트가 대상이므로 하나)
+    if not plan['deploy']:
+        targets = {contract_name: None}
+    elif len(names) > 1:
+        targets = {name: deployments[name] for name in names}
+    elif budget and not names and len(deployments) > 1:
+        targets = dict(deployments)
+    else:
+        targets = {contract_name: contract_address}
+    
+    if dump_state and anvil:
+        dump_chain_state(anvil, dump_state, {**deployments, **targets})
+    return targets, contract_name, contract_address
+
+def fuzz_ityfuzz_targets(foundry_project_dir, plan, targets, contract_name, rpc_url=None, debug=False, workers=None,
+                         use_cache=None, stop_on_first=False, budget=None):
+    """
+    대상들을 퍼징합니다. (예산이 있으면 스케줄러가 대상별 시간을 배분, 없으면 주 대상 하나를 설정 시간 동안)
+
+    Returns:
+        (stdout, stderr, 요약 dict)
+    """
+    corpus_store = None
+    if budget and not (CORPUS_CONFIG['enabled'] if use_cache is None else use_cache):
+        # 스케줄러는 구간마다 ITYfuzz를 다시 시작하므로 구간 사이의 진행은 코퍼스로만 이어짐:
+        # 코퍼스 캐시가 꺼져 있으면 이전 캠페인 코퍼스는 쓰지 않고 이번 실행 전용 저장소로 구간을 잇습니다.
+        scratch = tempfile.mkdtemp(prefix='chainhawk-corpus-')
+        corpus_store = CorpusStore(root=scratch)
+        print("[정보] 코퍼스 캐시가 꺼져 있어 --budget 구간 사이의 코퍼스를 이번 실행 전용 저장소로 이어갑니다.")
+    
+    def fuzz_target(name, seconds):
+        return run_ityfuzz_fuzzing(targets[name], foundry_project_dir, name, debug, plan, rpc_url, workers,
+                                   use_corpus=use_cache, stop_on_first=stop_on_first, timeout=seconds,
+                                   corpus_store=corpus_store)
+    
+    if not budget:
+        stdout, stderr, summary = fuzz_target(contract_name, None)
+        if not summary['bugs'] and summary['first_bug']:
+            # 버그 보고서 파일이 없어도 출력 스트림에서 확인된 objective는 결과로 남김
+            first_bug = summary['first_bug']
+            summary['bugs'] = [{'fingerprint': None, 'title': first_bug['line'], 'worker': first_bug['worker'],
+                                'path': None, 'count': 1}]
+        summary['bugs'] = [dict(bug, target=contract_name) for bug in summary['bugs']]
+        return stdout, stderr, summary
+    scheduler = BudgetScheduler(list(targets), budget)
+    try:
+        report = scheduler.run(fuzz_target, debug)
+    finally:
+        if corpus_store is not None:
+            shutil.rmtree(corpus_store.root, ignore_errors=True)
+    sections = [format_budget_report(report)]
+    sections += [f"[{target.name}]\n{target.details}" for target in scheduler.targets if target.details]
+    summary = {'bugs': scheduler.bugs(), 'first_bug': None, 'progress': None, 'budget': report}
+    return '\n\n'.join(sections), "", summary
 
-def run_ityfuzz(foundry_project_dir, contract_name=None, debug=False):
+def ityfuzz_result(stdout, stderr, summary, contract_address=None):
+    """
+    퍼징 결과를 분석 결과 dict로 변환합니다. (버그 보고서 또는 출력 스트림에서 확인된 objective 기준)
+    """
+    if summary['bugs'] or summary['first_bug']:
+        return {
+            "status": "vulnerability_found",
+            "message": "취약점이 발견되었습니다!",
+            "details": stdout,
+            "contract_address": contract_address,
+            "progress": summary['progress'],
+            "budget": summary.get('budget'),
+            "bugs": summary['bugs']
+        }
+    elif stdout:
+        return {
+            "status": "completed",
+            "message": "분석이 완료되었습니다.",
+            "details": stdout,
+            "contract_address": contract_address,
+            "progress": summary['progress'],
+            "budget": summary.get('budget')
+        }
+    elif stderr and "panicked" not in stderr and stderr.strip():
+        return {
+            "status": "completed",
+            "message": "분석이 완료되었습니다.",
+            "details": stderr,
+            "contract_address": contract_address
+        }
+    else:
+        return {
+            "status": "completed",
+            "message": "분석이 완료되었습니다. 특별한 이슈가 발견되지 않았습니다.",
+            "details": "",
+            "contract_address": contract_address
+        }
+
+def ityfuzz_error(e):
+    return {
+        "status": "error",
+        "message": f"ITYfuzz 실행 중 오류 발생: {str(e)}",
+        "details": str(e),
+        "contract_address": None
+    }
+
+def run_ityfuzz(foundry_project_dir, contract_name=None, debug=False, mode=None,
+                reuse_chain=None, load_state=None, dump_state=None, use_cache=None, deploy_plan=None, workers=None,
+                stop_on_first=False, budget=None):
     """
     ITYfuzz를 사용한 전체 분석 워크플로우
+    실행 모드에 필요한 인프라만 준비합니다. (setup 모드는 Anvil/호스트 컴파일/배포 생략)
+
+    Args:
+        contract_name: 대상 컨트랙트 이름 또는 이름 목록 (onchain 모드에서 여러 대상을 한 체인에 배포하여 퍼징)
+        reuse_chain: 체인을 실행 간에 유지하고 스냅샷으로 되돌려 재사용 (stop-chain으로 중지)
+        load_state: 배포가 끝난 체인 상태 파일 (지정하면 재배포 없이 복원)
+        dump_state: 배포 후 체인 상태를 저장할 파일
+        use_cache: 컴파일 산출물 캐시와 코퍼스 저장소 사용 여부 (None이면 설정값)
+        deploy_plan: 여러 컨트랙트를 의존 순서대로 일괄 배포할 배포 계획 파일 (퍼징 대상은 contract_name 또는 첫 항목)
+        workers: 병렬로 실행할 ITYfuzz 인스턴스 수 (None이면 설정값)
+        stop_on_first: 첫 번째 취약점이 확인되면 남은 퍼징 시간을 쓰지 않고 즉시 중지
+        budget: 전체 퍼징 시간 예산(초), 지정하면 대상들의 커버리지 증가에 따라 시간을 배분
+                (대상 이름을 주지 않으면 배포 계획/체인 상태의 모든 컨트랙트가 대상)
     """
+    plan = plan_ityfuzz_run(mode)
+    if debug:
+        print(f"[디버그] ITYfuzz 실행 계획: {plan}")
+    
     try:
         # 1. Docker 이미지 준비
-        build_docker_image()
-        
-        # 2. Anvil 블록체인 시작
-        start_anvil(debug)
+        ensure_image('ityfuzz', debug)
         
-        # 3. 컨트랙트 배포
-        contract_address = deploy_contract(foundry_project_dir, contract_name, debug)
+        # 2. 컴파일 (빌드 캐시에 적중하면 생략)
+        build_ityfuzz_project(foundry_project_dir, plan, use_cache, debug)
         
-        # 4. 실제 컨트랙트 이름 확인 (None이면 자동 감지된 이름 찾기)
-        if not contract_name:
-            foundry_dir = Path(foundry_project_dir)
-            src_dir = foundry_dir / "src"
-            sol_files = list(src_dir.glob("*.sol"))
-            if sol_files:
-                with open(sol_files[0], 'r') as f:
-                    content = f.read()
-                    contract_matches = re.findall(r'contract\s+(\w+)', content)
-                    if contract_matches:
-                        contract_name = contract_matches[0]
-        
-        if debug:
-            print(f"[디버그] 사용할 컨트랙트 이름: {contract_name}")
-        
-        # 5. ITYfuzz 퍼징 실행
-        stdout, stderr = run_ityfuzz_fuzzing(contract_address, foundry_project_dir, contract_name or "Contract", debug)
+        # 3. Anvil 블록체인 임대 (풀에서 고유 이름/포트의 인스턴스를 받아 작업이 끝나면 반납) 및 컨트랙트 배포
+        pool = get_anvil_pool(debug, reuse=reuse_chain, load_state=load_state) if plan['chain'] else None
+        lease = pool.lease() if pool else nullcontext()
+        with lease as anvil:
+            targets, contract_name, contract_address = deploy_ityfuzz_targets(
+                foundry_project_dir, plan, anvil, contract_name, deploy_plan, budget, dump_state, debug
+            )
+            
+            # 4. ITYfuzz 퍼징 실행
+            stdout, stderr, summary = fuzz_ityfuzz_targets(
+                foundry_project_dir, plan, targets, contract_name, anvil.rpc_url if anvil else None, debug, workers,
+                use_cache, stop_on_first, budget
+            )
         
-        # 6. 결과 파싱 및 반환
-        if stdout and ("vulnerability" in stdout.lower() or "bug" in stdout.lower() or "violation" in stdout.lower() or "exploit" in stdout.lower()):
-            return {
-                "status": "vulnerability_found",
-                "message": "취약점이 발견되었습니다!",
-                "details": stdout,
-                "contract_address": contract_address
-            }
-        elif stdout:
-            return {
-                "status": "completed",
-                "message": "분석이 완료되었습니다.",
-                "details": stdout,
-                "contract_address": contract_address
-            }
-        elif stderr and "panicked" not in stderr and stderr.strip():
-            return {
-                "status": "completed",
-                "message": "분석이 완료되었습니다.",
-                "details": stderr,
-                "contract_address": contract_address
-            }
-        else:
-            return {
-                "status": "completed",
-                "message": "분석이 완료되었습니다. 특별한 이슈가 발견되지 않았습니다.",
-                "details": "",
-                "contract_address": contract_address
-            }
+        # 5. 결과 반환
+        return ityfuzz_result(stdout, stderr, summary, contract_address)
     
     except Exception as e:
-        return {
-            "status": "error",
-            "message": f"ITYfuzz 실행 중 오류 발생: {str(e)}",
-            "details": str(e),
-            "contract_address": None
-        }
-    
-    finally:
-        # 7. 인프라 정리
-        stop_anvil()
\ No newline at end of file
+        return ityfuzz_error(e)
@@ -0,0 +1,216 @@
+# ityfuzz_campaign.py
+# ITYfuzz 병렬 캠페인: 워커별 시드/출력 디렉토리, 코퍼스 병합 및 버그 중복 제거 코디네이터
+
+import random
+import re
+import shutil
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, wait
+from pathlib import Path
+from ..cache import sha256_bytes, sha256_text
+from ..config import ITYFUZZ_CONFIG
+from .ityfuzz_output import format_progress
+from ..infrastructure.docker_manager import TIMEOUT_RETURNCODE
+
+# 버그 지문 계산 시 지우는 실행마다 달라지는 값 (주소, 해시, 숫자)
+_VOLATILE = re.compile(r'0x[0-9a-fA-F]+|\d+')
+# 워커 코퍼스 디렉토리에 직접 넣은 항목의 파일 이름 접두사 (저장소 시드, 다른 워커에서 병합)
+# 그 밖의 파일은 ITYfuzz가 새 커버리지를 낸 입력으로 판단해 코퍼스에 추가한 항목
+SEED_PREFIX = 'seed-'
+MERGED_PREFIX = 'merged-'
+
+class FuzzWorker:
+    """
+    캠페인의 ITYfuzz 인스턴스 하나 (고유 시드와 작업 디렉토리)
+    """
+
+    def __init__(self, index, seed, work_dir, container_work_dir):
+        self.index = index
+        self.seed = seed
+        self.work_dir = Path(work_dir)
+        self.container_work_dir = container_work_dir
+        self.returncode = None
+
+    @property
+    def corpus_dir(self):
+        return self.work_dir / ITYFUZZ_CONFIG['corpus_dir']
+
+    @property
+    def solutions_dir(self):
+        return self.work_dir / ITYFUZZ_CONFIG['solutions_dir']
+
+    @property
+    def log_path(self):
+        return self.work_dir / 'fuzz.log'
+
+    def __repr__(self):
+        return f'FuzzWorker({self.index}, seed={self.seed})'
+
+def create_campaign(results_dir, workers, seed=None, container_results_dir='/results'):
+    """
+    ityfuzz_results/<캠페인 ID>/worker-<i> 디렉토리와 워커 목록을 만듭니다.
+
+    Returns:
+        (캠페인 디렉토리, [FuzzWorker])
+    """
+    campaign_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:6]}"
+    campaign_dir = Path(results_dir) / campaign_id
+    base_seed = random.randrange(1 << 32) if seed is None else seed
+    fuzz_workers = []
+    for index in range(max(1, workers)):
+        work_dir = campaign_dir / f'worker-{index}'
+        work_dir.mkdir(parents=True, exist_ok=True)
+        fuzz_workers.append(FuzzWorker(index, base_seed + index, work_dir,
+                                       f'{container_results_dir}/{campaign_id}/worker-{index}'))
+    return campaign_dir, fuzz_workers
+
+def corpus_entries(corpus_dir, fuzzer_only=False):
+    """
+    코퍼스 디렉토리의 {내용 해시: 파일 경로}를 반환합니다. (숨김/임시 파일 제외)
+    fuzzer_only이면 ITYfuzz가 직접 추가한 항목만 반환합니다. (시드·병합으로 넣은 파일 제외)
+    """
+    entries = {}
+    if not corpus_dir.is_dir():
+        return entries
+    for path in corpus_dir.iterdir():
+        if fuzzer_only and path.name.startswith((SEED_PREFIX, MERGED_PREFIX)):
+            continue
+        if path.is_file() and not path.name.startswith('.'):
+            try:
+                entries[sha256_bytes(path.read_bytes())] = path
+            except OSError:
+                pass
+    return entries
+
+def merge_corpora(fuzz_workers):
+    """
+    워커들이 찾은 코퍼스 항목을 내용 해시 기준으로 합쳐, 각 워커에 없는 항목을 복사합니다.
+    실행 중인 퍼저가 쓰다 만 파일을 읽지 않도록 숨김 이름으로 복사한 뒤 이름을 바꿉니다.
+
+    Returns:
+        다른 워커로 공유된 항목 수
+    """
+    per_worker = [corpus_entries(worker.corpus_dir) for worker in fuzz_workers]
+    union = {}
+    for entries in per_worker:
+        for digest, path in entries.items():
+            union.setdefault(digest, path)
+    shared = 0
+    for worker, entries in zip(fuzz_workers, per_worker):
+        missing = [digest for digest in union if digest not in entries]
+        if not missing:
+            continue
+        worker.corpus_dir.mkdir(parents=True, exist_ok=True)
+        for digest in missing:
+            target = worker.corpus_dir / f'{MERGED_PREFIX}{digest[:16]}'
+            staging = worker.corpus_dir / f'.{target.name}.tmp'
+            shutil.copyfile(union[digest], staging)
+            staging.replace(target)
+            shared += 1
+    return shared
+
+def bug_fingerprint(text):
+    """
+    버그 보고서에서 주소·숫자처럼 실행마다 달라지는 값을 지운 뒤 지문을 계산합니다.
+    """
+    lines = [_VOLATILE.sub('#', line.strip()).lower() for line in text.splitlines() if line.strip()]
+    return sha256_text(*lines)
+
+def collect_bugs(fuzz_workers):
+    """
+    모든 워커의 버그 보고서를 모아 지문 기준으로 중복을 제거합니다.
+
+    Returns:
+        [{'fingerprint', 'title', 'worker', 'path', 'count'}] (워커 순서)
+    """
+    bugs = {}
+    for worker in fuzz_workers:
+        if not worker.solutions_dir.is_dir():
+            continue
+        for path in sorted(worker.solutions_dir.rglob('*')):
+            if not path.is_file():
+                continue
+            try:
+                text = path.read_text(encoding='utf-8', errors='replace')
+            except OSError:
+                continue
+            fingerprint = bug_fingerprint(text)
+            if fingerprint in bugs:
+                bugs[fingerprint]['count'] += 1
+                continue
+            title = next((line.strip() for line in text.splitlines() if line.strip()), path.name)
+            bugs[fingerprint] = {
+                'fingerprint': fingerprint,
+                'title': title,
+                'worker': worker.index,
+                'path': str(path),
+                'count': 1,
+            }
+    return list(bugs.values())
+
+def run_campaign(run_worker, fuzz_workers, timeout, sync_interval=None, debug=False, monitor=None):
+    """
+    워커들을 병렬로 실행하는 코디네이터
+    모든 워커를 캠페인 전체 시간 동안 한 번만 실행하고 (재시작하면 퍼저의 메모리 상태와 setup 모드의 빌드·setUp을
+    매번 다시 치르게 됨), 실행 중에 sync_interval초마다 워커 코퍼스 디렉토리 사이로 새 항목을 복사합니다.
+
+    Args:
+        run_worker: (워커, 제한 시간) -> subprocess.CompletedProcess
+        timeout: 캠페인 전체 시간(초)
+        sync_interval: 코퍼스 병합 주기(초), 워커가 하나면 병합하지 않음
+        monitor: 진행 상황 모니터 (CampaignMonitor, 중지 요청 시 워커 프로세스를 중지)
+
+    Returns:
+        {'syncs', 'shared', 'bugs', 'timed_out', 'stopped_early', 'progress'}
+    """
+    sync_interval = sync_interval or ITYFUZZ_CONFIG['sync_interval']
+    shared = 0
+    syncs = 0
+
+    with ThreadPoolExecutor(max_workers=len(fuzz_workers)) as executor:
+        futures = [executor.submit(run_worker, worker, timeout) for worker in fuzz_workers]
+        if debug:
+            print(f"[디버그] 캠페인 시작 ({timeout:.0f}초, 워커 {len(fuzz_workers)}개, 코퍼스 병합 주기 {sync_interval}초)")
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, timeout=sync_interval if len(fuzz_workers) > 1 else None)
+            if pending and len(fuzz_workers) > 1:
+                merged = merge_corpora(fuzz_workers)
+                shared += merged
+                syncs += 1
+                if debug:
+                    print(f"[디버그] 코퍼스 병합: {merged}개 항목 공유")
+        results = [future.result() for future in futures]
+
+    for worker, result in zip(fuzz_workers, results):
+        worker.returncode = result.returncode
+    stopped_early = monitor is not None and monitor.stop_event.is_set()
+    return {
+        'syncs': syncs,
+        'shared': shared,
+        'bugs': collect_bugs(fuzz_workers),
+        'timed_out': not stopped_early and any(result.returncode == TIMEOUT_RETURNCODE for result in results),
+        'stopped_early': stopped_early,
+        'progress': monitor.snapshot() if monitor is not None else None,
+    }
+
+def format_campaign_summary(campaign_dir, fuzz_workers, summary):
+    """
+    캠페인 결과 요약 문자열을 만듭니다.
+    """
+    lines = [
+        f"ITYfuzz 캠페인: 워커 {len(fuzz_workers)}개, 코퍼스 병합 {summary['syncs']}회, 공유된 코퍼스 {summary['shared']}개",
+        f"결과 디렉토리: {campaign_dir}",
+    ]
+    if summary.get('progress'):
+        lines.append(f"진행 상황: {format_progress(summary['progress'])}")
+    if summary.get('stopped_early'):
+        lines.append("첫 번째 취약점 확인 후 중지됨 (--stop-on-first)")
+    if summary['bugs']:
+        lines.append(f"발견된 bug {len(summary['bugs'])}개 (중복 제거):")
+        for bug in summary['bugs']:
+            lines.append(f"  - {bug['title']} (워커 {bug['worker']}, {bug['count']}회 발견) {bug['path']}")
+    else:
+        lines.append("발견된 취약점 없음")
+    return '\n'.join(lines)
@@ -0,0 +1,143 @@
+# ityfuzz_corpus.py
+# ITYfuzz 코퍼스 저장소: 런타임 바이트코드 해시(정확히 일치)와 ABI 해시(유사 대상)로 코퍼스를 보관하여 다음 캠페인을 이어서 시작
+
+import json
+import os
+import shutil
+import time
+import uuid
+from pathlib import Path
+from .ityfuzz_campaign import SEED_PREFIX, corpus_entries
+from ..cache import cache_dir
+from ..config import CORPUS_CONFIG
+
+META_FILE = 'meta.json'
+
+class CorpusStore:
+    """
+    대상별 코퍼스 저장소 (~/.cache/chainhawk/corpus/<런타임 바이트코드 해시>/)
+    바이트코드가 같으면 그대로, 바이트코드는 바뀌었지만 ABI가 같으면 가장 최근 코퍼스로 새 캠페인을 시작합니다.
+    대상별 크기 예산(target_max_bytes)과 전체 크기 예산(max_bytes)을 넘으면 오래된 항목부터 삭제합니다.
+    """
+
+    def __init__(self, target_max_bytes=None, max_bytes=None, root=None):
+        self.root = Path(root or cache_dir('corpus'))
+        self.target_max_bytes = target_max_bytes or CORPUS_CONFIG['target_max_bytes']
+        self.max_bytes = max_bytes or CORPUS_CONFIG['max_bytes']
+
+    def _entry_dir(self, bytecode_hash):
+        return self.root / bytecode_hash
+
+    def _read_meta(self, entry_dir):
+        if '.tmp-' in entry_dir.name:
+            return None
+        try:
+            with open(entry_dir / META_FILE, 'r') as f:
+                return json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+
+    def find(self, bytecode_hash, abi_hash=None):
+        """
+        시작 코퍼스로 쓸 저장 항목을 찾습니다.
+
+        Returns:
+            (항목 디렉토리, 'exact' | 'abi') 또는 (None, None)
+        """
+        exact = self._entry_dir(bytecode_hash)
+        if (exact / META_FILE).exists():
+            return exact, 'exact'
+        if not abi_hash:
+            return None, None
+        # 바이트코드가 바뀐 같은 ABI의 대상: 가장 최근에 저장된 코퍼스 사용
+        best, best_time = None, -1
+        for entry_dir in self.root.iterdir():
+            meta = self._read_meta(entry_dir) if entry_dir.is_dir() else None
+            if meta and meta.get('abi_hash') == abi_hash and meta.get('updated', 0) > best_time:
+                best, best_time = entry_dir, meta['updated']
+        return (best, 'abi') if best else (None, None)
+
+    def seed(self, bytecode_hash, abi_hash, fuzz_workers):
+        """
+        저장된 코퍼스를 모든 워커의 코퍼스 디렉토리에 복사합니다.
+
+        Returns:
+            (복사한 항목 수, 일치 종류)
+        """
+        entry_dir, match = self.find(bytecode_hash, abi_hash)
+        if entry_dir is None:
+            return 0, None
+        files = [path for path in (entry_dir / 'corpus').iterdir() if path.is_file()] if (entry_dir / 'corpus').is_dir() else []
+        for worker in fuzz_workers:
+            worker.corpus_dir.mkdir(parents=True, exist_ok=True)
+            for path in files:
+                shutil.copyfile(path, worker.corpus_dir / f'{SEED_PREFIX}{path.name}')
+        os.utime(entry_dir)
+        return len(files), match
+
+    def save(self, bytecode_hash, abi_hash, name, fuzz_workers):
+        """
+        ITYfuzz가 이번 캠페인에서 새 커버리지를 낸 입력으로 코퍼스에 추가한 항목을 기존 저장 코퍼스와
+        내용 해시로 합쳐 저장합니다. 시드·병합으로 넣은 파일은 다시 담지 않으므로 같은 입력이 중복되지 않으며,
+        짧은 실행(--stop-on-first, 스케줄러의 짧은 구간)이 끝나도 기존 저장 코퍼스를 잃지 않습니다.
+        대상 예산을 넘으면 작은 입력부터 남깁니다. (짧은 입력이 같은 경로를 더 빠르게 재현)
+
+        Returns:
+            저장한 항목 수
+        """
+        entry_dir = self._entry_dir(bytecode_hash)
+        candidates = {}
+        for worker in fuzz_workers:
+            for digest, path in corpus_entries(worker.corpus_dir, fuzzer_only=True).items():
+                candidates.setdefault(digest, path)
+        stored = corpus_entries(entry_dir / 'corpus')
+        added = sum(1 for digest in candidates if digest not in stored)
+        if not added:
+            # 새 항목이 없으면 저장 코퍼스를 다시 쓰지 않고 사용 시각만 갱신
+            if stored:
+                os.utime(entry_dir)
+            return len(stored)
+        for digest, path in stored.items():
+            candidates.setdefault(digest, path)
+
+        kept, total = {}, 0
+        for digest, path in sorted(candidates.items(), key=lambda item: (item[1].stat().st_size, item[0])):
+            size = path.stat().st_size
+            if total + size > self.target_max_bytes:
+                break
+            kept[digest] = path
+            total += size
+
+        # 새 디렉토리에 구성한 뒤 교체 (기존 저장 코퍼스 파일을 읽는 도중 지우지 않도록)
+        staging = entry_dir.with_name(f'{entry_dir.name}.tmp-{uuid.uuid4().hex[:8]}')
+        (staging / 'corpus').mkdir(parents=True)
+        for digest, path in kept.items():
+            shutil.copyfile(path, staging / 'corpus' / digest[:32])
+        with open(staging / META_FILE, 'w') as f:
+            json.dump({'abi_hash': abi_hash, 'name': name, 'updated': time.time(), 'entries': len(kept), 'bytes': total}, f)
+        shutil.rmtree(entry_dir, ignore_errors=True)
+        os.replace(staging, entry_dir)
+        self.evict()
+        return len(kept)
+
+    def evict(self):
+        """
+        전체 크기가 max_bytes를 넘으면 가장 오래 사용되지 않은 대상의 코퍼스부터 삭제합니다.
+
+        Returns:
+            삭제한 대상 수
+        """
+        entries = []
+        for entry_dir in self.root.iterdir():
+            meta = self._read_meta(entry_dir) if entry_dir.is_dir() else None
+            if meta is not None:
+                entries.append((entry_dir.stat().st_mtime, meta.get('bytes', 0), entry_dir))
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, entry_dir in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            total -= size
+            removed += 1
+        return removed
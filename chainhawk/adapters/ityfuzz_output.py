@@ -0,0 +1,218 @@
+# ityfuzz_output.py
+# ITYfuzz 출력 스트림 파서: 실행 속도(exec/sec), 커버리지, objective(버그) 이벤트를 줄 단위로 추출하여 진행 상황으로 제공
+
+import re
+import threading
+import time
+
+# 터미널 색상 코드 (ITYfuzz는 TTY가 아니어도 색상을 출력함)
+_ANSI = re.compile(r'\x1b\[[0-9;]*[A-Za-z]')
+# 통계 줄: "... corpus: 23, objectives: 0, executions: 12345, exec/sec: 1.2k"
+_STAT_FIELDS = {
+    'corpus': re.compile(r'\bcorpus:\s*([\d.]+[kKmM]?)'),
+    'objectives': re.compile(r'\bobjectives:\s*([\d.]+[kKmM]?)'),
+    'execs': re.compile(r'\bexecutions:\s*([\d.]+[kKmM]?)'),
+    'exec_per_sec': re.compile(r'\bexec/sec:\s*([\d.]+[kKmM]?)'),
+}
+# 커버리지 줄: "Instruction Coverage: 512/1024 (50.00%)", "Branch Coverage: 30.5%" 등
+_COVERAGE = re.compile(r'(instruction|branch|edge)s?\s*coverage\s*[:=]\s*(?:(\d+)\s*/\s*(\d+))?\s*\(?\s*([\d.]+)?\s*%?', re.IGNORECASE)
+# ITYfuzz 취약점 보고 머리줄: "😊😊 Found violations!", "============= Vulnerability Found =============" 등
+# 줄 전체가 머리줄일 때만 인정 ("Sorted objective 2 by priority" 같은 일반 로그는 버그가 아님)
+# 그 밖의 버그는 통계 줄의 objectives 카운터가 늘어난 것으로만 판단
+_BUG = re.compile(r'^\W*found\s+(?:violations?|vulnerabilit(?:y|ies))\W*$|^=*\s*(?:vulnerabilit(?:y|ies)|violations?)\s+found\s*=*$',
+                  re.IGNORECASE)
+
+def _count(value):
+    """
+    ITYfuzz 통계 값 ("1.2k", "3M", "42")을 숫자로 변환합니다.
+    """
+    scale = {'k': 1e3, 'm': 1e6}.get(value[-1].lower(), 1)
+    number = float(value[:-1] if scale != 1 else value) * scale
+    return int(number) if number.is_integer() else number
+
+class FuzzProgress:
+    """
+    워커 하나의 퍼징 진행 상황 (마지막으로 보고된 통계와 확인된 버그)
+    """
+
+    def __init__(self):
+        self.execs = 0
+        self.exec_per_sec = 0
+        self.corpus = 0
+        self.objectives = 0
+        self.coverage = {}  # 종류(instruction/branch/edge) -> 백분율
+        self.bugs = []  # 버그 보고 줄
+        self.updated = None
+
+    def to_dict(self):
+        return {
+            'execs': self.execs,
+            'exec_per_sec': self.exec_per_sec,
+            'corpus': self.corpus,
+            'objectives': self.objectives,
+            'coverage': dict(self.coverage),
+            'bugs': len(self.bugs),
+        }
+
+class ItyfuzzOutputParser:
+    """
+    ITYfuzz 출력 줄을 하나씩 받아 진행 상황을 갱신하고 이벤트를 반환하는 파서
+    형식을 모르는 줄은 무시하므로 ITYfuzz 버전에 따라 일부 항목만 채워질 수 있습니다.
+    """
+
+    def __init__(self):
+        self.progress = FuzzProgress()
+
+    def feed(self, line):
+        """
+        출력 한 줄을 파싱합니다.
+
+        Returns:
+            [(이벤트 종류, 값)] 목록 ('stats' -> 통계 dict, 'coverage' -> 커버리지 dict, 'bug' -> 보고 줄)
+        """
+        line = _ANSI.sub('', line).strip()
+        if not line:
+            return []
+        progress = self.progress
+        events = []
+
+        stats = {}
+        for field, pattern in _STAT_FIELDS.items():
+            match = pattern.search(line)
+            if match:
+                stats[field] = _count(match.group(1))
+        if stats:
+            new_objectives = stats.get('objectives', progress.objectives) > progress.objectives
+            for field, value in stats.items():
+                setattr(progress, field, value)
+            events.append(('stats', stats))
+            if new_objectives:
+                events.append(('bug', line))
+
+        coverage = {}
+        for kind, covered, total, percent in _COVERAGE.findall(line):
+            if covered and total and int(total):
+                coverage[kind.lower()] = round(int(covered) * 100 / int(total), 2)
+            elif percent:
+                coverage[kind.lower()] = float(percent)
+        if coverage:
+            progress.coverage.update(coverage)
+            events.append(('coverage', coverage))
+
+        if not stats and _BUG.search(line):
+            events.append(('bug', line))
+
+        for kind, value in events:
+            if kind == 'bug':
+                progress.bugs.append(value)
+        if events:
+            progress.updated = time.monotonic()
+        return events
+
+class CampaignMonitor:
+    """
+    캠페인 전체의 워커별 진행 상황을 모으는 모니터
+    여러 워커 스레드가 동시에 갱신하며, 버그가 확인되면 stop_on_first일 때 중지 이벤트를 설정합니다.
+    """
+
+    def __init__(self, stop_on_first=False, report_interval=10):
+        self.stop_on_first = stop_on_first
+        self.report_interval = report_interval
+        self.stop_event = threading.Event()
+        self.first_bug = None
+        self._progress = {}  # 워커 번호 -> FuzzProgress
+        self._processes = set()  # 실행 중인 워커 프로세스 (중지 시 함께 종료)
+        self._last_report = time.monotonic()
+        self._lock = threading.Lock()
+
+    def parser(self, worker_index):
+        """
+        워커용 파서를 반환합니다. (라운드가 바뀌어도 같은 진행 상황을 이어서 갱신)
+        """
+        parser = ItyfuzzOutputParser()
+        with self._lock:
+            parser.progress = self._progress.setdefault(worker_index, parser.progress)
+        return parser
+
+    def attach(self, process):
+        """
+        실행 중인 워커 프로세스를 등록합니다. 이미 중지된 캠페인이면 바로 중지합니다.
+        """
+        with self._lock:
+            self._processes.add(process)
+        if self.stop_event.is_set():
+            process.stop()
+
+    def detach(self, process):
+        with self._lock:
+            self._processes.discard(process)
+
+    def stop(self):
+        """
+        캠페인 중지를 알리고 실행 중인 모든 워커 프로세스를 중지합니다.
+        """
+        self.stop_event.set()
+        with self._lock:
+            processes = list(self._processes)
+        for process in processes:
+            if not process.stopped:
+                process.stop()
+
+    def update(self, worker_index, events):
+        """
+        워커의 파싱 이벤트를 반영합니다.
+
+        Returns:
+            캠페인을 중지해야 하면 True
+        """
+        for kind, value in events:
+            if kind == 'bug':
+                with self._lock:
+                    if self.first_bug is None:
+                        self.first_bug = {'worker': worker_index, 'line': value}
+                        print(f"[경고] 워커 {worker_index}에서 취약점이 확인되었습니다: {value}")
+                if self.stop_on_first and not self.stop_event.is_set():
+                    print("[정보] --stop-on-first: 캠페인을 중지합니다.")
+                    self.stop()
+        return self.stop_event.is_set()
+
+    def snapshot(self):
+        """
+        워커 전체 합계 진행 상황을 반환합니다. (커버리지는 워커 중 최댓값)
+        """
+        with self._lock:
+            workers = sorted(self._progress.items())
+        progresses = [progress for _, progress in workers]
+        coverage = {}
+        for progress in progresses:
+            for kind, percent in progress.coverage.items():
+                coverage[kind] = max(coverage.get(kind, 0), percent)
+        return {
+            'execs': sum(progress.execs for progress in progresses),
+            'exec_per_sec': sum(progress.exec_per_sec for progress in progresses),
+            'corpus': sum(progress.corpus for progress in progresses),
+            'objectives': sum(progress.objectives for progress in progresses),
+            'coverage': coverage,
+            'bugs': sum(len(progress.bugs) for progress in progresses),
+            'workers': {index: progress.to_dict() for index, progress in workers},
+        }
+
+    def maybe_report(self):
+        """
+        report_interval초마다 합계 진행 상황을 한 줄로 출력합니다.
+        """
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_report < self.report_interval:
+                return
+            self._last_report = now
+        print(f"[정보] {format_progress(self.snapshot())}")
+
+def format_progress(snapshot):
+    """
+    진행 상황 dict를 한 줄 문자열로 만듭니다.
+    """
+    coverage = ', '.join(f"{kind} {percent:.1f}%" for kind, percent in sorted(snapshot['coverage'].items()))
+    text = (f"실행 {snapshot['execs']:,}회 ({snapshot['exec_per_sec']:,}/초), "
+            f"코퍼스 {snapshot['corpus']}, objectives {snapshot['objectives']}")
+    return f"{text}, 커버리지 {coverage}" if coverage else text
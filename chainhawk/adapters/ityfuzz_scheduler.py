@@ -0,0 +1,182 @@
+# ityfuzz_scheduler.py
+# 여러 대상 컨트랙트의 ITYfuzz 퍼징 시간 스케줄러: 전체 시간 예산을 커버리지가 계속 늘어나는 대상에 우선 배분하고 정체된 대상은 중단
+
+import time
+from ..config import ITYFUZZ_SCHEDULER_CONFIG
+
+# 커버리지 점수로 사용할 지표 우선순위 (출력에 없으면 코퍼스 크기로 대체)
+_SCORE_KINDS = ('branch', 'edge', 'instruction')
+
+def coverage_score(progress):
+    """
+    캠페인 진행 상황에서 대상의 커버리지 점수를 계산합니다.
+
+    Returns:
+        (지표 이름, 값) 또는 (None, None)
+    """
+    if not progress:
+        return None, None
+    for kind in _SCORE_KINDS:
+        if kind in progress['coverage']:
+            return kind, progress['coverage'][kind]
+    if progress['corpus']:
+        return 'corpus', progress['corpus']
+    return None, None
+
+class FuzzTarget:
+    """
+    스케줄러가 시간을 배분하는 퍼징 대상 하나의 상태
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.slices = 0
+        self.seconds = 0.0
+        self.metric = None
+        self.score = None  # 현재 지표의 지금까지 최고 커버리지 점수
+        self.best = {}  # 지표별 지금까지의 최고 점수 (구간마다 새로 시작한 실행끼리가 아니라 최고 기록과 비교)
+        self.last_rate = None  # 마지막 구간의 초당 커버리지 증가량
+        self.stale = 0  # 커버리지가 늘지 않은 연속 구간 수
+        self.status = 'active'  # active | plateau | bug
+        self.bugs = []
+        self.details = ''
+
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'slices': self.slices,
+            'seconds': round(self.seconds, 1),
+            'metric': self.metric,
+            'score': self.score,
+            'status': self.status,
+            'bugs': len(self.bugs),
+        }
+
+class BudgetScheduler:
+    """
+    전체 시간 예산(초)을 대상들에 구간(slice) 단위로 배분하는 스케줄러
+    모든 대상을 한 구간씩 실행한 뒤에는 마지막 구간의 초당 커버리지 증가량이 가장 큰 대상에 다음 구간을 줍니다.
+    plateau_slices 구간 연속으로 증가량이 min_gain 이하인 대상은 정체로 보고 더 이상 시간을 주지 않으며,
+    모든 대상이 정체되면 남은 예산을 쓰지 않고 끝냅니다.
+    구간마다 ITYfuzz를 다시 시작하므로 구간 사이의 진행은 코퍼스 저장소로 이어지며,
+    커버리지 증가량은 대상의 지표별 최고 기록과 비교합니다.
+    """
+
+    def __init__(self, targets, budget, slice_seconds=None, min_slice=None, plateau_slices=None, min_gain=None):
+        if not targets:
+            raise RuntimeError("퍼징할 대상이 없습니다.")
+        self.targets = [FuzzTarget(name) for name in dict.fromkeys(targets)]
+        self.budget = budget
+        self.slice_seconds = slice_seconds or ITYFUZZ_SCHEDULER_CONFIG['slice']
+        self.min_slice = min_slice or ITYFUZZ_SCHEDULER_CONFIG['min_slice']
+        self.plateau_slices = plateau_slices or ITYFUZZ_SCHEDULER_CONFIG['plateau_slices']
+        self.min_gain = ITYFUZZ_SCHEDULER_CONFIG['min_gain'] if min_gain is None else min_gain
+        self.stopped_early = False
+
+    def _next_target(self):
+        active = [target for target in self.targets if target.status == 'active']
+        if not active:
+            return None
+        # 아직 한 번도 실행하지 않은 대상부터, 그다음은 최근 증가 속도가 큰 대상 (같으면 사용 시간이 적은 대상)
+        unexplored = [target for target in active if target.slices == 0]
+        if unexplored:
+            return unexplored[0]
+        return max(active, key=lambda target: (target.last_rate or 0, -target.seconds))
+
+    def _slice_length(self, target, remaining):
+        if target.slices == 0:
+            # 첫 구간: 남은 예산을 아직 실행하지 않은 대상 수로 나눈 몫을 넘지 않도록
+            unexplored = sum(1 for other in self.targets if other.status == 'active' and other.slices == 0)
+            return min(self.slice_seconds, max(self.min_slice, remaining / unexplored))
+        return min(self.slice_seconds, remaining)
+
+    def _record(self, target, seconds, summary):
+        target.slices += 1
+        target.seconds += seconds
+        metric, score = coverage_score(summary.get('progress'))
+        if score is not None and metric not in target.best:
+            # 지표가 처음 보고된 경우 기준값만 설정
+            target.best[metric] = score
+            target.metric, target.score = metric, score
+            target.last_rate, target.stale = score / max(seconds, 1), 0
+        elif score is not None:
+            # 직전 구간이 아니라 지금까지의 최고 기록을 넘어선 만큼만 증가로 인정
+            gain = score - target.best[metric]
+            target.best[metric] = max(target.best[metric], score)
+            target.metric, target.score = metric, target.best[metric]
+            target.last_rate = max(gain, 0) / max(seconds, 1)
+            target.stale = target.stale + 1 if gain <= self.min_gain else 0
+        else:
+            # 진행 상황을 알 수 없는 대상은 증가가 없는 것으로 취급
+            target.last_rate = 0
+            target.stale += 1
+        first_bug = summary.get('first_bug')
+        if first_bug and not target.bugs and not summary.get('bugs'):
+            # 버그 보고서 파일이 없어도 출력 스트림에서 확인된 objective는 기록
+            target.bugs.append({'fingerprint': None, 'title': first_bug['line'], 'worker': first_bug['worker'],
+                                'path': None, 'count': 1})
+        for bug in summary.get('bugs') or []:
+            if bug['fingerprint'] not in {known['fingerprint'] for known in target.bugs}:
+                target.bugs.append(bug)
+        if target.stale >= self.plateau_slices:
+            target.status = 'plateau'
+
+    def run(self, fuzz_target, debug=False):
+        """
+        예산이 남아 있고 정체되지 않은 대상이 있는 동안 구간을 배분하여 퍼징합니다.
+
+        Args:
+            fuzz_target: (대상 이름, 구간 시간(초)) -> (stdout, stderr, 캠페인 요약 dict)
+
+        Returns:
+            예산 사용 보고서 dict ({'budget', 'spent', 'unspent', 'stopped_early', 'targets'})
+        """
+        start = time.monotonic()
+        while True:
+            remaining = self.budget - (time.monotonic() - start)
+            if remaining < self.min_slice:
+                break
+            target = self._next_target()
+            if target is None:
+                break
+            seconds = self._slice_length(target, remaining)
+            if debug:
+                print(f"[디버그] 스케줄러: {target.name}에 {seconds:.0f}초 배분 (남은 예산 {remaining:.0f}초)")
+            slice_start = time.monotonic()
+            stdout, _, summary = fuzz_target(target.name, seconds)
+            target.details = stdout
+            self._record(target, time.monotonic() - slice_start, summary)
+            if target.status == 'plateau':
+                print(f"[정보] {target.name}: 커버리지 정체 ({target.metric} {target.score}), 남은 시간을 다른 대상에 배분합니다.")
+            if summary.get('stopped_early'):
+                # --stop-on-first: 취약점이 확인되면 전체 스케줄 종료
+                target.status = 'bug'
+                self.stopped_early = True
+                break
+        return self.report(time.monotonic() - start)
+
+    def report(self, spent):
+        return {
+            'budget': self.budget,
+            'spent': round(spent, 1),
+            'unspent': round(max(self.budget - spent, 0), 1),
+            'stopped_early': self.stopped_early,
+            'targets': [target.to_dict() for target in self.targets],
+        }
+
+    def bugs(self):
+        return [dict(bug, target=target.name) for target in self.targets for bug in target.bugs]
+
+def format_budget_report(report):
+    """
+    예산 사용 보고서를 표 형태 문자열로 만듭니다.
+    """
+    lines = [f"퍼징 시간 예산: {report['budget']}초 중 {report['spent']}초 사용 (미사용 {report['unspent']}초)"]
+    for target in report['targets']:
+        share = target['seconds'] * 100 / report['spent'] if report['spent'] else 0
+        score = f"{target['metric']} {target['score']}" if target['metric'] else "커버리지 정보 없음"
+        lines.append(f"  - {target['name']}: {target['seconds']}초 ({share:.0f}%), 구간 {target['slices']}회, "
+                     f"{score}, 상태 {target['status']}, bug {target['bugs']}개")
+    if report['stopped_early']:
+        lines.append("첫 번째 취약점 확인 후 중지됨 (--stop-on-first)")
+    return '\n'.join(lines)
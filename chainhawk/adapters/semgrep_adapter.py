@@ -1,53 +1,527 @@
 # semgrep_adapter.py
 # Semgrep 도커 이미지 빌드 및 실행 기능 제공
 
-import subprocess
-import json
 import os
+import bisect
+import functools
 import glob
+import re
+import threading
+import yaml
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from tqdm import tqdm
-from ..config import DOCKER_CONFIG
+from ..cache import DiskCache, sha256_file, sha256_text
+from ..config import DOCKER_CONFIG, SEMGREP_CONFIG
+from ..infrastructure.container_session import get_session, sessions_enabled
+from ..infrastructure.docker_manager import ContainerProcess, ensure_image, image_id
+from ..infrastructure.process_runner import get_runner
+from ..project import discover_sources, shard_files
+from ..result.aggregator import FindingAggregator, semgrep_findings
+from .semgrep_output import read_semgrep_output
+from .semgrep_prefilter import load_requirements, prune_pairs
 
-def build_docker_image():
+# 컨테이너 내부 마운트 경로
+CONTAINER_SRC = '/src'
+CONTAINER_RULES = '/rules'
+
+def collect_rule_files(rules):
     """
-    Semgrep 도커 이미지가 없으면 자동으로 빌드합니다.
+    룰셋 디렉터리(또는 단일 파일)에서 .yaml 룰셋 파일 목록을 수집합니다.
     """
-    tag = DOCKER_CONFIG['semgrep']['tag']
-    dockerfile = DOCKER_CONFIG['semgrep']['dockerfile']
-    # 이미지 존재 여부 확인
-    check_cmd = ['docker', 'images', '-q', tag]
-    result = subprocess.run(check_cmd, capture_output=True, text=True)
-    if not result.stdout.strip():
-        print(f"[정보] 도커 이미지({tag})가 없어 자동 빌드합니다...")
-        build_cmd = ['docker', 'build', '-f', dockerfile, '-t', tag, '.']
-        build_result = subprocess.run(build_cmd, capture_output=True, text=True)
-        if build_result.returncode != 0:
-            raise RuntimeError(f"도커 이미지 빌드 실패: {build_result.stderr}")
-        print(f"[성공] 도커 이미지({tag}) 빌드 완료.")
+    if os.path.isfile(rules):
+        return [rules]
+    rule_files = []
+    for root, _, files in os.walk(rules):
+        for file in sorted(files):
+            if file.endswith('.yaml'):
+                rule_files.append(os.path.join(root, file))
+    return sorted(rule_files)
 
-def extract_json(text):
+def load_rule_ids(rule_file):
     """
-    텍스트에서 JSON 부분을 추출합니다.
+    룰셋 파일에 정의된 룰 id 목록을 반환합니다.
     """
     try:
-        # 첫 번째 '{' 부터 마지막 '}' 까지의 텍스트를 추출
-        start = text.find('{')
-        end = text.rfind('}') + 1
-        if start >= 0 and end > start:
-            json_text = text[start:end]
-            return json_text
-    except Exception as e:
-        print(f"[오류] JSON 추출 오류: {e}")
-    return text
-
-def run_semgrep(target_path, rules_path='semgrep_rules', debug=False):
+        with open(rule_file, 'r', encoding='utf-8') as f:
+            document = yaml.safe_load(f) or {}
+    except (OSError, yaml.YAMLError):
+        return []
+    return [rule['id'] for rule in document.get('rules', []) if isinstance(rule, dict) and rule.get('id')]
+
+def build_rule_index(rule_files):
     """
-    Semgrep을 도커 컨테이너에서 실행하고 결과를 반환합니다.
+    룰 id -> 룰셋 파일 매핑을 생성합니다. (배치 결과를 룰셋별로 분리할 때 사용)
+    """
+    rule_index = {}
+    for rule_file in rule_files:
+        for rule_id in load_rule_ids(rule_file):
+            rule_index.setdefault(rule_id, rule_file)
+    return rule_index
+
+def match_rule_file(check_id, rule_index):
+    """
+    Semgrep 결과의 check_id를 룰셋 파일로 매핑합니다.
+    로컬 config를 사용하면 Semgrep이 룰 id 앞에 경로 기반 접두어(예: rules.basic-reentrancy)를 붙이므로
+    가장 긴 접미어부터 차례로 비교합니다.
+    """
+    parts = (check_id or '').split('.')
+    for i in range(len(parts)):
+        rule_file = rule_index.get('.'.join(parts[i:]))
+        if rule_file:
+            return rule_file
+    return None
+
+def _container_rule_path(rule_file, rules_root):
+    """
+    호스트 룰셋 파일 경로를 컨테이너 내부(/rules) 경로로 변환합니다.
+    """
+    return f'{CONTAINER_RULES}/' + os.path.relpath(rule_file, rules_root).replace(os.sep, '/')
+
+def _broken_rule_files(errors, rule_files, rules_root):
+    """
+    Semgrep 오류 목록에서 배치 실행을 깨뜨린 룰셋 파일을 찾아냅니다.
+    """
+    by_container_path = {_container_rule_path(rule_file, rules_root): rule_file for rule_file in rule_files}
+    broken = set()
+    for error in errors:
+        paths = [error.get('path')] + [span.get('file') for span in error.get('spans', []) or []]
+        for path in paths:
+            if path in by_container_path:
+                broken.add(by_container_path[path])
+    return broken
+
+def _semgrep_args(configs, targets, jobs):
+    """
+    Semgrep 실행 인자를 만듭니다. (컨테이너 내부 경로 기준)
+    """
+    args = []
+    for config in configs:
+        args += ['--config', config]
+    args += ['--metrics', 'off', '--json', '--jobs', str(jobs)]
+    args += [f'{CONTAINER_SRC}/{target}' for target in targets]
+    return args
+
+class SemgrepOutput:
+    """
+    Semgrep 실행 결과 (결과 항목은 slim_result 형식)
+    """
+
+    def __init__(self, returncode, results, errors, complete, stderr):
+        self.returncode = returncode
+        self.results = results
+        self.errors = errors
+        self.complete = complete  # JSON 출력을 끝까지 파싱했는지 여부
+        self.stderr = stderr
+
+def _stream_semgrep(process):
+    """
+    실행 중인 Semgrep 프로세스의 표준 출력을 파이프에서 읽는 대로 파싱하고 종료를 기다립니다.
+    """
+    try:
+        results, parser = read_semgrep_output(process.stdout_chunks())
+    finally:
+        returncode = process.wait()
+    return SemgrepOutput(returncode, results, parser.errors, parser.complete, process.stderr)
+
+def _run_semgrep_container(project_root, rules_root, args, debug=False):
+    """
+    프로젝트 루트를 /src에, 룰셋 디렉터리를 /rules에 읽기 전용으로 마운트한 환경에서 Semgrep을 실행합니다.
+    세션 재사용이 켜져 있으면 띄워둔 세션 컨테이너에서 exec로, 아니면 일회용 컨테이너로 실행합니다.
+    출력은 전체를 모으지 않고 스트리밍으로 파싱하며, 동시 실행 수는 실행기의 'scan' 자원 제한을 따릅니다.
+
+    Returns:
+        SemgrepOutput
+    """
+    volumes = [
+        (project_root, CONTAINER_SRC, 'ro'),
+        (rules_root, CONTAINER_RULES, 'ro'),
+    ]
+
+    def scan():
+        if sessions_enabled():
+            process = get_session('semgrep', volumes, debug=debug).spawn(['semgrep'] + args)
+        else:
+            process = ContainerProcess(DOCKER_CONFIG['semgrep']['tag'], args, volumes=volumes, debug=debug)
+        return _stream_semgrep(process)
+
+    return get_runner().call('scan', scan)
+
+def to_project_path(path):
+    """
+    컨테이너 내부 결과 경로(/src/...)를 프로젝트 기준 상대 경로로 되돌립니다.
+    """
+    prefix = CONTAINER_SRC + '/'
+    return path[len(prefix):] if path and path.startswith(prefix) else path
+
+def run_semgrep_batch(project_root, targets, rules_root, rule_files, jobs=1, debug=False):
+    """
+    룰셋 디렉터리를 한 번만 마운트하고, 모든 룰셋을 하나의 Semgrep 프로세스로 실행합니다.
+
+    Returns:
+        (findings, errors): 파싱에 성공하면 결과 목록과 오류 목록, 실패하면 (None, 오류 목록)
+    """
+    configs = [_container_rule_path(rule_file, rules_root) for rule_file in rule_files]
+    result = _run_semgrep_container(project_root, rules_root, _semgrep_args(configs, targets, jobs), debug)
+    if debug:
+        print(f"[디버그] 반환 코드: {result.returncode}")
+
+    if not result.complete:
+        if debug:
+            print(f"[경고] 배치 결과 파싱 실패 (결과 {len(result.results)}건까지 읽음)")
+            print(f"[디버그] stderr: {result.stderr}")
+        return None, result.errors
+
+    # 결과 JSON은 있지만 룰 로딩 단계에서 실패한 경우 (잘못된 룰셋 포함)
+    if result.returncode not in (0, 1) and not result.results:
+        return None, result.errors
+    return result.results, result.errors
+
+def run_semgrep_rule(project_root, targets, rules_root, rule_file, jobs=1, debug=False):
+    """
+    단일 룰셋 파일로 Semgrep을 실행합니다. (배치 실패 시 개별 격리 실행용)
+    """
+    rule_name = os.path.basename(rule_file)
+    configs = [_container_rule_path(rule_file, rules_root)]
+    result = _run_semgrep_container(project_root, rules_root, _semgrep_args(configs, targets, jobs), debug)
+    if debug:
+        print(f"[디버그] 반환 코드: {result.returncode}")
+
+    if result.returncode != 0 and "METRICS:" not in result.stderr:
+        if debug:
+            print(f"[경고] {rule_name} 룰셋 실행 실패: {result.stderr}")
+        return None
+
+    if not result.complete:
+        if debug:
+            print(f"[경고] {rule_name} 결과 파싱 실패")
+        return None
+    return result.results
+
+def scan_rules_batched(project_root, targets, rules_root, rule_files, jobs=1, progress=None, debug=False):
+    """
+    배치 모드로 모든 룰셋을 실행하고 결과를 룰셋 파일별로 분리합니다.
+    배치를 깨뜨린 룰셋은 제외하고 나머지를 다시 배치 실행하며, 제외된 룰셋만 개별 실행합니다.
+
+    Returns:
+        {룰셋 파일: 결과 목록 또는 None(실행 실패)}, 룰셋에 매핑되지 않은 결과는 None 키에 저장
+    """
+    per_rule = {}
+    pending = list(rule_files)
+    isolated = []
+
+    while pending:
+        findings, errors = run_semgrep_batch(project_root, targets, rules_root, pending, jobs, debug)
+        if findings is not None:
+            rule_index = build_rule_index(pending)
+            split = {rule_file: [] for rule_file in pending}
+            for finding in findings:
+                # 매핑되지 않은 결과는 None 키로 모아 버리지 않고 함께 보고
+                rule_file = match_rule_file(finding.get('check_id'), rule_index)
+                split.setdefault(rule_file, []).append(finding)
+            per_rule.setdefault(None, []).extend(split.pop(None, []))
+            for rule_file in pending:
+                per_rule[rule_file] = split[rule_file]
+                _advance(progress, rule_file)
+            break
+
+        broken = _broken_rule_files(errors, pending, rules_root)
+        if not broken:
+            # 원인 룰셋을 특정할 수 없으면 모든 룰셋을 개별 격리 실행
+            isolated.extend(pending)
+            break
+        if debug:
+            print(f"[경고] 배치 실행을 깨뜨린 룰셋: {[os.path.basename(rule_file) for rule_file in sorted(broken)]}")
+        isolated.extend(sorted(broken))
+        pending = [rule_file for rule_file in pending if rule_file not in broken]
+
+    for rule_file in isolated:
+        if debug:
+            print(f"[디버그] {os.path.basename(rule_file)} 룰셋 개별 재실행 중...")
+        per_rule[rule_file] = run_semgrep_rule(project_root, targets, rules_root, rule_file, jobs, debug)
+        _advance(progress, rule_file)
+
+    return per_rule
+
+def scan_rules_individually(project_root, targets, rules_root, rule_files, jobs=1, progress=None, debug=False):
+    """
+    룰셋 파일마다 개별 컨테이너로 Semgrep을 실행합니다. (배치 모드 비활성화 시)
+    """
+    per_rule = {}
+    for rule_file in rule_files:
+        if debug:
+            print(f"[디버그] {os.path.basename(rule_file)} 룰셋으로 검사 중...")
+        per_rule[rule_file] = run_semgrep_rule(project_root, targets, rules_root, rule_file, jobs, debug)
+        _advance(progress, rule_file)
+    return per_rule
+
+_progress_lock = threading.Lock()
+
+def _advance(progress, rule_file):
+    """
+    여러 샤드 워커가 공유하는 룰셋 진행률 표시를 한 칸 진행합니다.
+    """
+    if progress is None:
+        return
+    with _progress_lock:
+        progress.set_postfix_str(os.path.basename(rule_file))
+        progress.update(1)
+
+def finding_sort_key(finding):
+    """
+    샤드 병합 후에도 실행 순서와 무관하게 결정적인 순서를 보장하는 정렬 키
+    """
+    start = finding.get('start', {})
+    return (finding.get('path', ''), start.get('line', 0), start.get('col', 0), finding.get('check_id', ''))
+
+def result_cache_key(rule_hash, file_hash, digest):
+    """
+    (룰 해시, 파일 해시, 이미지 digest) 조합의 캐시 키 (결과 형식이 바뀌면 접두사 버전을 올림)
+    """
+    return sha256_text('semgrep-v2', rule_hash, file_hash, digest)
+
+# 매칭 위치를 감싸는 선언 (컨트랙트/라이브러리/인터페이스, 함수/생성자/fallback/receive/modifier)
+_DECLARATION = re.compile(rb'\b(contract|library|interface)\s+(\w+)'
+                          rb'|\b(?:function|modifier)\s+(\w+)|\b(constructor|fallback|receive)\s*\(')
+
+def _declarations(data):
+    """
+    파일의 선언 위치 목록 [(바이트 오프셋, 컨트랙트 이름 또는 None, 함수 이름 또는 None)]
+    """
+    declarations = []
+    for match in _DECLARATION.finditer(data):
+        if match.group(2):
+            declarations.append((match.start(), match.group(2).decode('utf-8', 'replace'), None))
+        else:
+            declarations.append((match.start(), None, (match.group(3) or match.group(4)).decode('utf-8', 'replace')))
+    return declarations
+
+def source_reader(project_root):
+    """
+    결과의 바이트 오프셋으로 (매칭된 소스, 감싸는 컨트랙트, 감싸는 함수)를 찾는 함수를 반환합니다.
+    (최근에 읽은 파일 내용은 재사용) 오프셋이 없거나 파일을 읽을 수 없으면 (None, None, None)을 반환하여
+    줄 번호 기반 지문으로 돌아갑니다.
+    """
+    @functools.lru_cache(maxsize=64)
+    def read(path):
+        try:
+            with open(os.path.join(project_root, path), 'rb') as f:
+                data = f.read()
+        except OSError:
+            return None
+        declarations = _declarations(data)
+        return data, declarations, [offset for offset, _, _ in declarations]
+
+    def locate(finding):
+        start = (finding.get('start') or {}).get('offset')
+        end = (finding.get('end') or {}).get('offset')
+        loaded = read(finding.get('path', '')) if start is not None and end is not None else None
+        if loaded is None or not 0 <= start <= end <= len(loaded[0]):
+            return None, None, None
+        data, declarations, offsets = loaded
+        contract = function = None
+        # 매칭 시작 위치 앞의 가장 가까운 함수 선언과 컨트랙트 선언 (함수가 컨트랙트보다 앞이면 함수 밖)
+        for offset, contract_name, function_name in reversed(declarations[:bisect.bisect_right(offsets, start)]):
+            if contract_name is not None:
+                contract = contract_name
+                break
+            if function is None:
+                function = function_name
+        return data[start:end].decode('utf-8', 'replace'), contract, function
+    return locate
+
+def plan_work_units(targets, rule_files, pending_rules):
+    """
+    파일별로 실행이 필요한 룰셋 집합이 같은 파일끼리 묶어 작업 단위를 만듭니다.
+
+    Args:
+        targets: 대상 파일 목록
+        rule_files: 전체 룰셋 파일 목록 (순서 유지용)
+        pending_rules: {파일: 실행이 필요한 룰셋 파일 집합}
+
+    Returns:
+        [(룰셋 파일 목록, 파일 목록)]
+    """
+    groups = {}
+    for target in targets:
+        needed = frozenset(pending_rules.get(target, ()))
+        if needed:
+            groups.setdefault(needed, []).append(target)
+    return [([rule_file for rule_file in rule_files if rule_file in needed], files) for needed, files in groups.items()]
+
+def scan_semgrep(project_root, targets, rules, debug=False, batch=None, jobs=None, use_cache=None, prefilter=None,
+                 on_findings=None):
+    """
+    (룰셋, 파일) 쌍 중 캐시에 없고 사전 필터를 통과한 것만 샤드로 나누어 워커 풀에서 병렬로 Semgrep을 실행하고,
+    캐시된 결과와 함께 하나의 정렬된 목록으로 병합합니다.
+
+    Args:
+        project_root: 프로젝트 루트 절대 경로 (컨테이너의 /src로 마운트)
+        targets: 프로젝트 기준 상대 경로 목록
+        rules: 룰셋 디렉터리 또는 파일 절대 경로
+        debug: 디버그 모드
+        batch: 배치 모드 사용 여부 (None이면 설정값 사용)
+        jobs: 사용할 코어 수 (None이면 설정값 또는 호스트 코어 수)
+        use_cache: 결과 캐시 사용 여부 (None이면 설정값 사용)
+        prefilter: 리터럴 토큰 사전 필터 사용 여부 (None이면 설정값 사용)
+        on_findings: 결과 목록 콜백, 지정하면 캐시 적중분은 즉시, 나머지는 작업이 끝날 때마다 전달하고
+                     결과를 모아두지 않음 (반환되는 findings는 빈 목록)
+
+    Returns:
+        (findings, failed_rules, stats): 정렬된 결과 목록(path는 프로젝트 기준 상대 경로),
+        실행 실패한 룰셋 파일 목록, 실행 통계(쌍 수, 캐시 적중/미스, 사전 필터로 제외된 쌍 수)
+    """
+    rule_files = collect_rule_files(rules)
+    if batch is None:
+        batch = SEMGREP_CONFIG['batch']
+    if use_cache is None:
+        use_cache = SEMGREP_CONFIG['cache']
+    if prefilter is None:
+        prefilter = SEMGREP_CONFIG['prefilter']
+    jobs = jobs or SEMGREP_CONFIG['jobs'] or os.cpu_count() or 1
+    rules_root = rules if os.path.isdir(rules) else os.path.dirname(rules)
+    stats = {'pairs': len(rule_files) * len(targets), 'cache_hits': 0, 'cache_misses': 0, 'pruned': 0}
+
+    all_findings = []
+
+    def emit(findings):
+        if on_findings is not None:
+            on_findings(findings)
+        else:
+            all_findings.extend(findings)
+
+    pending_rules = {target: set(rule_files) for target in targets}
+    rule_hashes = {rule_file: sha256_file(rule_file) for rule_file in rule_files} if use_cache or prefilter else {}
+    cache = None
+    if use_cache:
+        cache = DiskCache('semgrep', SEMGREP_CONFIG['cache_max_bytes'])
+        digest = image_id(DOCKER_CONFIG['semgrep']['tag'])
+        file_hashes = {target: sha256_file(os.path.join(project_root, target)) for target in targets}
+        pair_keys = {
+            (rule_file, target): result_cache_key(rule_hashes[rule_file], file_hashes[target], digest)
+            for target in targets for rule_file in pending_rules[target]
+        }
+        cached = cache.get_many(pair_keys.values())
+        for (rule_file, target), key in pair_keys.items():
+            if key in cached:
+                # 캐시에는 경로 없이 저장하므로 현재 경로로 복원하여 재생
+                emit([dict(finding, path=target) for finding in cached[key]])
+                pending_rules[target].discard(rule_file)
+                stats['cache_hits'] += 1
+            else:
+                stats['cache_misses'] += 1
+
+    # 룰 패턴의 필수 토큰이 파일에 없어 매칭될 수 없는 쌍은 Semgrep 엔진에 보내지 않음
+    if prefilter:
+        requirements = load_requirements(rule_files, rule_hashes)
+        stats['pruned'] = prune_pairs(pending_rules, requirements, lambda target: os.path.join(project_root, target))
+        if debug:
+            print(f"[디버그] 사전 필터로 제외된 (룰셋, 파일) 쌍: {stats['pruned']}개")
+
+    # 작업 단위별로 샤드 분할: 샤드 수는 코어 수와 샤드당 최소 파일 수로 제한하고, 남는 코어는 Semgrep 자체 --jobs로 사용
+    min_files = max(1, SEMGREP_CONFIG['min_files_per_shard'])
+    tasks = []
+    for unit_rules, unit_files in plan_work_units(targets, rule_files, pending_rules):
+        shard_count = max(1, min(jobs, -(-len(unit_files) // min_files)))
+        for shard in shard_files(unit_files, shard_count, weight=lambda rel: os.path.getsize(os.path.join(project_root, rel))):
+            tasks.append((unit_rules, shard))
+    workers = max(1, min(jobs, len(tasks)))
+    jobs_per_shard = max(1, jobs // workers)
+    if debug:
+        print(f"[디버그] 실행할 작업 {len(tasks)}개 (워커 {workers}개, 작업당 --jobs {jobs_per_shard})")
+
+    def scan_task(task):
+        unit_rules, shard = task
+        if batch:
+            return scan_rules_batched(project_root, shard, rules_root, unit_rules, jobs_per_shard, progress, debug)
+        return scan_rules_individually(project_root, shard, rules_root, unit_rules, jobs_per_shard, progress, debug)
+
+    failed_rules = set()
+    fresh = {}
+
+    def merge_task(task, per_rule):
+        unit_rules, shard = task
+        for finding in per_rule.get(None, []):
+            finding['path'] = to_project_path(finding.get('path', ''))
+        emit(per_rule.get(None, []))
+        for rule_file in unit_rules:
+            findings = per_rule.get(rule_file)
+            if findings is None:
+                failed_rules.add(rule_file)
+                continue
+            by_file = {target: [] for target in shard}
+            for finding in findings:
+                finding['path'] = to_project_path(finding.get('path', ''))
+                by_file.setdefault(finding['path'], []).append(finding)
+            emit(findings)
+            # 룰셋에 매핑되지 않은 결과가 있었던 작업은 쌍 단위 결과를 확신할 수 없으므로 캐시하지 않음
+            if cache is not None and not per_rule.get(None):
+                for target in shard:
+                    stored = [{k: v for k, v in finding.items() if k != 'path'} for finding in by_file[target]]
+                    fresh[pair_keys[(rule_file, target)]] = stored
+
+    # 작업이 끝나는 순서대로 병합하여 전체 스캔이 끝나기 전에도 결과를 전달
+    with tqdm(total=sum(len(unit_rules) for unit_rules, _ in tasks), desc="Semgrep 룰셋 분석 진행", unit="rule") as progress:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(scan_task, task): task for task in tasks}
+            for future in as_completed(futures):
+                merge_task(futures[future], future.result())
+
+    if cache is not None:
+        if fresh:
+            cache.put_many(fresh)
+        cache.close()
+
+    all_findings.sort(key=finding_sort_key)
+    return all_findings, sorted(failed_rules), stats
+
+def format_findings(findings):
+    """
+    결과(Finding) 목록을 한글 보고서 문자열로 변환합니다.
+    """
+    if findings:
+        output = "다음과 같은 취약점이 발견되었습니다:\n\n"
+        for finding in findings:
+            output += f"[취약점] {finding.rule}\n"
+            output += f"위치: {finding.file}:{finding.start_line or '?'}\n"
+            output += f"설명: {finding.message or '설명 없음'}\n"
+            output += "-" * 80 + "\n"
+        return output
+    
+    return "분석 완료: 취약점이 발견되지 않았습니다."
+
+def semgrep_targets(target_path, include=None, exclude=None, debug=False):
+    """
+    분석할 .sol 파일을 찾습니다.
+
+    Returns:
+        (프로젝트 루트 절대 경로, 프로젝트 기준 상대 경로 목록)
     """
-    build_docker_image()
     abs_target = os.path.abspath(target_path)
     if debug:
         print(f"[디버그] 절대 경로: {abs_target}")
+
+    if os.path.isdir(abs_target):
+        project_root = abs_target
+        targets = discover_sources(project_root, include, exclude)
+    else:
+        project_root = os.path.dirname(abs_target)
+        targets = [os.path.basename(abs_target)]
+    if debug:
+        print(f"[디버그] 분석 대상 파일 {len(targets)}개: {targets}")
+    return project_root, targets
+
+def collect_semgrep_findings(project_root, targets, rules_path='semgrep_rules', debug=False, batch=None, jobs=None,
+                             use_cache=None, aggregator=None, on_finding=None):
+    """
+    찾은 파일들을 Semgrep으로 분석하고 결과를 Finding으로 정규화하여 집계기에 모읍니다.
+    여러 룰셋이 같은 위치에 같은 룰로 보고한 결과는 지문 기준으로 하나로 합쳐집니다.
+    on_finding을 지정하면 처음 보는 결과를 스캔 도중 바로 전달합니다. (원본 결과 목록을 모아두지 않음)
+
+    Returns:
+        FindingAggregator
+    """
+    if not targets:
+        raise RuntimeError("분석할 .sol 파일이 없습니다.")
     
     # rules_path가 절대경로가 아니면, 현재 작업 디렉터리 기준으로 변환
     if not os.path.isabs(rules_path):
@@ -57,79 +531,73 @@ def run_semgrep(target_path, rules_path='semgrep_rules', debug=False):
     if debug:
         print(f"[디버그] 룰셋 절대 경로: {rules}")
 
-    # 룰셋 파일 목록 수집
-    rule_files = []
-    for root, _, files in os.walk(rules):
-        for file in files:
-            if file.endswith('.yaml'):
-                rule_files.append(os.path.join(root, file))
-    
-    if not rule_files:
-        return "[오류] 룰셋 파일을 찾을 수 없습니다."
+    if not collect_rule_files(rules):
+        raise RuntimeError("룰셋 파일을 찾을 수 없습니다.")
 
-    if debug:
-        print(f"[디버그] 발견된 룰셋 파일들: {rule_files}")
-    
-    tag = DOCKER_CONFIG['semgrep']['tag']
-
-    # 먼저 rules 디렉터리 확인
-    check_cmd = [
-        'docker', 'run', '--rm',
-        '-v', f'{rules}:/rules',
-        tag,
-        'ls', '-la', '/rules'
-    ]
-    check_result = subprocess.run(check_cmd, capture_output=True, text=True)
-    if debug:
-        print("[정보] 룰셋 디렉터리 내용:")
-        print(check_result.stdout)
+    if use_cache is None:
+        use_cache = SEMGREP_CONFIG['cache']
+    aggregator = aggregator if aggregator is not None else FindingAggregator()
+    # 지문은 줄 번호 대신 매칭된 소스와 감싸는 컨트랙트·함수로 계산 (위쪽 코드 수정으로 줄이 밀려도 같은 결과로 인식)
+    locate = source_reader(project_root)
 
-    # 각 룰셋 파일에 대해 개별적으로 Semgrep 실행 (진행률 표시)
-    all_findings = []
-    for rule_file in tqdm(rule_files, desc="Semgrep 룰셋 분석 진행", unit="rule"):
-        rule_name = os.path.basename(rule_file)
-        if debug:
-            print(f"[디버그] {rule_name} 룰셋으로 검사 중...")
-        
-        # Semgrep 실행
-        cmd = [
-            'docker', 'run', '--rm',
-            '-v', f'{abs_target}:/src/{os.path.basename(abs_target)}',
-            '-v', f'{rule_file}:/rules/{rule_name}',
-            tag,
-            '--config', f'/rules/{rule_name}',
-            '--metrics', 'off',
-            '--json',
-            f'/src/{os.path.basename(abs_target)}'
-        ]
-        if debug:
-            print(f"[디버그] 실행할 명령어: {' '.join(cmd)}")
-        
-        result = subprocess.run(cmd, capture_output=True, text=True, check=False)
-        if debug:
-            print(f"[디버그] 반환 코드: {result.returncode}")
-        
-        if result.returncode != 0 and "METRICS:" not in result.stderr:
-            if debug:
-                print(f"[경고] {rule_name} 룰셋 실행 실패: {result.stderr}")
-            continue
-        
-        try:
-            json_text = extract_json(result.stdout)
-            findings = json.loads(json_text)
-            if findings.get('results'):
-                all_findings.extend(findings['results'])
-        except json.JSONDecodeError as e:
-            if debug:
-                print(f"[경고] {rule_name} 결과 파싱 실패: {e}")
-    
-    if all_findings:
-        output = "다음과 같은 취약점이 발견되었습니다:\n\n"
-        for finding in all_findings:
-            output += f"[취약점] {finding.get('check_id', 'Unknown')}\n"
-            output += f"위치: {os.path.basename(finding.get('path', ''))}:{finding.get('start', {}).get('line', '?')}\n"
-            output += f"설명: {finding.get('extra', {}).get('message', '설명 없음')}\n"
-            output += "-" * 80 + "\n"
-        return output
-    
-    return "분석 완료: 취약점이 발견되지 않았습니다." 
\ No newline at end of file
+    def on_findings(findings):
+        # 콜백 한 번에 룰셋 하나의 파일별 결과가 모두 들어오므로 그 안에서 발생 순번을 매김
+        for finding in semgrep_findings(findings, locate):
+            if aggregator.add(finding):
+                on_finding(finding)
+
+    findings, failed_rules, stats = scan_semgrep(project_root, targets, rules, debug, batch, jobs, use_cache,
+                                                 on_findings=on_findings if on_finding else None)
+    for rule_file in failed_rules:
+        print(f"[경고] {os.path.basename(rule_file)} 룰셋 실행에 실패하여 건너뜁니다.")
+    if use_cache:
+        print(f"[정보] Semgrep 결과 캐시: 적중 {stats['cache_hits']}쌍 / 미스 {stats['cache_misses']}쌍 (전체 {stats['pairs']}쌍)")
+    if stats['pruned']:
+        print(f"[정보] 사전 필터: 매칭 불가능한 {stats['pruned']}쌍 제외 (전체 {stats['pairs']}쌍)")
+
+    aggregator.extend(semgrep_findings(findings, locate))
+    if debug and aggregator.total != len(aggregator):
+        print(f"[디버그] 중복 결과 {aggregator.total - len(aggregator)}건 제거")
+    return aggregator
+
+def semgrep_report(project_root, targets, rules_path='semgrep_rules', debug=False, batch=None, jobs=None, use_cache=None,
+                   report=None):
+    """
+    찾은 파일들을 Semgrep으로 분석하고 결과 보고서 문자열을 반환합니다.
+    report(보고서 작성기)를 지정하면 결과를 스캔 도중 작성기로 바로 내보내고 요약 문자열만 반환합니다.
+    """
+    try:
+        aggregator = collect_semgrep_findings(project_root, targets, rules_path, debug, batch, jobs, use_cache,
+                                              on_finding=report.write if report is not None else None)
+    except RuntimeError as e:
+        return f"[오류] {e}"
+    if report is not None:
+        return format_summary(aggregator)
+    return format_findings(aggregator.sorted())
+
+def format_summary(aggregator):
+    """
+    결과를 보고서로 내보낸 경우의 요약 문자열
+    """
+    stats = aggregator.stats()
+    return f"분석 완료: 고유 결과 {stats['unique']}건 (중복 {stats['duplicates']}건 제거)"
+
+def run_semgrep(target_path, rules_path='semgrep_rules', debug=False, batch=None, include=None, exclude=None, jobs=None, use_cache=None,
+                report=None):
+    """
+    Semgrep을 도커 컨테이너에서 실행하고 결과를 반환합니다.
+
+    Args:
+        target_path: 분석할 .sol 파일 또는 Foundry 프로젝트 디렉토리 경로
+        rules_path: 룰셋 디렉터리 또는 룰셋 파일 경로
+        debug: 디버그 모드
+        batch: 룰셋 전체를 단일 Semgrep 프로세스로 실행할지 여부 (None이면 설정값 사용)
+        include: 디렉토리 분석 시 포함할 glob 패턴 목록
+        exclude: 디렉토리 분석 시 제외할 glob 패턴 목록
+        jobs: 사용할 코어 수 (None이면 호스트 코어 수)
+        use_cache: (룰셋, 파일) 쌍 단위 결과 캐시 사용 여부 (None이면 설정값 사용)
+        report: 결과를 스트리밍으로 기록할 보고서 작성기 (report.generator.open_report)
+    """
+    ensure_image('semgrep', debug)
+    project_root, targets = semgrep_targets(target_path, include, exclude, debug)
+    return semgrep_report(project_root, targets, rules_path, debug, batch, jobs, use_cache, report)
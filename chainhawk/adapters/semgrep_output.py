@@ -0,0 +1,259 @@
+# semgrep_output.py
+# Semgrep --json 출력 스트림 파서: 전체 문서를 메모리에 올리지 않고 results 배열을 항목 단위로 읽어 필요한 필드만 남기고, errors는 따로 수집
+
+import codecs
+import json
+import re
+
+_WHITESPACE = ' \t\r\n'
+_DECODER = json.JSONDecoder()
+_STRUCTURAL = re.compile(r'["\[\]{}]')
+_STRING_SPECIAL = re.compile(r'["\\]')
+_SCALAR_END = re.compile(r'[\s,\]}]')
+
+def slim_result(result):
+    """
+    Semgrep 결과 항목에서 집계·정렬·캐시에 필요한 필드만 남깁니다. (extra.lines, metadata 등 큰 필드는 버림)
+    매칭된 소스는 필요할 때 바이트 오프셋으로 파일에서 다시 읽습니다.
+    """
+    extra = result.get('extra') or {}
+    start = result.get('start') or {}
+    end = result.get('end') or {}
+    return {
+        'check_id': result.get('check_id'),
+        'path': result.get('path', ''),
+        'start': {'line': start.get('line'), 'col': start.get('col'), 'offset': start.get('offset')},
+        'end': {'line': end.get('line'), 'col': end.get('col'), 'offset': end.get('offset')},
+        'extra': {'severity': extra.get('severity'), 'message': extra.get('message', '')},
+    }
+
+class _ValueScanner:
+    """
+    JSON 값 하나의 끝을 찾는 증분 스캐너 (문자열·이스케이프·괄호 깊이를 청크 사이에서도 유지)
+    값을 디코딩하지 않고 구조 문자만 정규식으로 건너뛰므로, 이미 읽은 부분을 다시 훑지 않습니다.
+    """
+
+    def __init__(self):
+        self.kind = None  # container | string | scalar
+        self.depth = 0
+        self.in_string = False
+        self.escape = False
+
+    def scan(self, buffer, pos, final):
+        """
+        buffer[pos:]를 이어서 읽습니다.
+
+        Returns:
+            값이 끝나는 위치(끝 다음 인덱스), 아직 끝나지 않았으면 None (다음 청크는 buffer 끝에서부터 이어서 호출)
+        """
+        if self.kind is None:
+            char = buffer[pos]
+            if char in '{[':
+                self.kind, self.depth = 'container', 1
+                pos += 1
+            elif char == '"':
+                self.kind, self.in_string = 'string', True
+                pos += 1
+            else:
+                self.kind = 'scalar'
+        if self.kind == 'scalar':
+            match = _SCALAR_END.search(buffer, pos)
+            if match:
+                return match.start()
+            return len(buffer) if final else None
+        while True:
+            if self.escape:
+                if pos >= len(buffer):
+                    return None
+                pos, self.escape = pos + 1, False
+            if self.in_string:
+                match = _STRING_SPECIAL.search(buffer, pos)
+                if not match:
+                    return None
+                pos = match.end()
+                if match.group() == '\\':
+                    self.escape = True
+                    continue
+                self.in_string = False
+                if self.kind == 'string':
+                    return pos
+                continue
+            match = _STRUCTURAL.search(buffer, pos)
+            if not match:
+                return None
+            pos = match.end()
+            char = match.group()
+            if char == '"':
+                self.in_string = True
+            elif char in '{[':
+                self.depth += 1
+            else:
+                self.depth -= 1
+                if self.depth == 0:
+                    return pos
+
+class SemgrepOutputParser:
+    """
+    Semgrep JSON 출력을 청크 단위로 받아 최상위 results 배열의 항목을 하나씩 디코딩하는 증분 파서
+    results 항목은 닫는 괄호가 도착한 뒤 한 번만 디코딩하여 slim_result로 줄여 반환하고, errors 항목은 self.errors에 모읍니다.
+    나머지 최상위 값(paths.scanned 등)은 디코딩하지 않고 스캐너로 건너뛰며 읽은 부분은 바로 버립니다.
+    JSON 앞에 붙은 다른 출력은 첫 번째 '{'까지 무시합니다.
+    """
+
+    def __init__(self):
+        self.errors = []
+        self.complete = False  # 최상위 객체를 끝까지 읽었는지 여부
+        self._decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        self._buffer = ''
+        self._state = 'start'  # start | key | colon | value | array | item | done
+        self._key = None
+        self._scanner = None  # 건너뛰는 값 또는 읽고 있는 배열 항목의 스캐너
+        self._item_start = 0  # 읽고 있는 배열 항목의 버퍼 내 시작 위치
+        self._resume = 0  # 항목 스캔을 이어갈 버퍼 내 위치
+
+    def feed(self, chunk):
+        """
+        출력 청크(bytes 또는 str)를 파싱합니다.
+
+        Returns:
+            이번 청크까지 읽어 완성된 결과 항목 목록 (slim_result 형식)
+        """
+        if isinstance(chunk, bytes):
+            chunk = self._decoder.decode(chunk)
+        if self._state == 'done' or not chunk:
+            return []
+        self._buffer += chunk
+        return self._parse(final=False)
+
+    def close(self):
+        """
+        입력 끝을 알리고 남은 버퍼를 파싱합니다.
+
+        Returns:
+            남은 결과 항목 목록
+        """
+        self._buffer += self._decoder.decode(b'', final=True)
+        return self._parse(final=True) if self._state != 'done' else []
+
+    def _skip(self, pos, separators=''):
+        buffer = self._buffer
+        while pos < len(buffer) and (buffer[pos] in _WHITESPACE or buffer[pos] in separators):
+            pos += 1
+        return pos
+
+    def _decode_key(self, pos, final):
+        """
+        pos 위치의 객체 키(짧은 문자열)를 디코딩합니다. 키가 아직 다 도착하지 않았으면 None을 반환합니다.
+        """
+        try:
+            return _DECODER.raw_decode(self._buffer, pos)
+        except json.JSONDecodeError:
+            if final:
+                raise
+            return None
+
+    def _truncated(self):
+        return json.JSONDecodeError("출력이 값 중간에서 끝났습니다", self._buffer, len(self._buffer))
+
+    def _parse(self, final):
+        results = []
+        pos = 0
+        try:
+            while True:
+                if self._state == 'start':
+                    start = self._buffer.find('{', pos)
+                    if start < 0:
+                        pos = len(self._buffer)
+                        break
+                    pos, self._state = start + 1, 'key'
+                elif self._state == 'key':
+                    pos = self._skip(pos, ',')
+                    if pos >= len(self._buffer):
+                        break
+                    if self._buffer[pos] == '}':
+                        pos, self._state, self.complete = pos + 1, 'done', True
+                        break
+                    decoded = self._decode_key(pos, final)
+                    if decoded is None:
+                        break
+                    self._key, pos = decoded
+                    self._state = 'colon'
+                elif self._state == 'colon':
+                    pos = self._skip(pos, ':')
+                    if pos >= len(self._buffer):
+                        break
+                    if self._key in ('results', 'errors') and self._buffer[pos] == '[':
+                        pos, self._state = pos + 1, 'array'
+                    else:
+                        self._state, self._scanner = 'value', _ValueScanner()
+                elif self._state == 'value':
+                    # 관심 없는 최상위 값(version, paths 등)은 디코딩하지 않고 끝만 찾아 버림
+                    end = self._scanner.scan(self._buffer, pos, final)
+                    if end is None:
+                        if final:
+                            raise self._truncated()
+                        pos = len(self._buffer)
+                        break
+                    pos, self._state, self._scanner = end, 'key', None
+                elif self._state == 'array':
+                    pos = self._skip(pos, ',')
+                    if pos >= len(self._buffer):
+                        break
+                    if self._buffer[pos] == ']':
+                        pos, self._state = pos + 1, 'key'
+                        continue
+                    self._state, self._scanner = 'item', _ValueScanner()
+                    self._item_start = self._resume = pos
+                elif self._state == 'item':
+                    end = self._scanner.scan(self._buffer, self._resume, final)
+                    if end is None:
+                        if final:
+                            raise self._truncated()
+                        # 항목이 끝날 때까지 항목 시작부터 보관하고, 다음 청크는 이미 훑은 곳 다음부터 스캔
+                        pos, self._resume = self._item_start, len(self._buffer)
+                        break
+                    item = _DECODER.decode(self._buffer[self._item_start:end])
+                    pos, self._state, self._scanner = end, 'array', None
+                    if self._key == 'results':
+                        results.append(slim_result(item))
+                    else:
+                        self.errors.append(item)
+                else:
+                    break
+        except json.JSONDecodeError:
+            # 잘린 출력: 지금까지 읽은 항목만 반환하고 complete는 False로 남김
+            self._state = 'done'
+        # 처리한 부분은 버퍼에서 제거하여 메모리 사용량을 항목 하나 크기로 유지
+        if self._state == 'done':
+            self._buffer = ''
+        else:
+            self._buffer = self._buffer[pos:]
+            self._item_start -= pos
+            self._resume -= pos
+        return results
+
+def read_semgrep_output(chunks, on_result=None):
+    """
+    Semgrep 표준 출력 청크 스트림을 끝까지 읽습니다.
+
+    Args:
+        chunks: bytes/str 청크 이터러블 (파이프에서 읽는 대로)
+        on_result: 결과 항목 콜백, 지정하면 결과를 모아두지 않고 하나씩 전달
+
+    Returns:
+        (결과 목록, 파서): 파서의 errors, complete로 오류 목록과 파싱 성공 여부 확인
+    """
+    parser = SemgrepOutputParser()
+    results = []
+
+    def emit(items):
+        if on_result is None:
+            results.extend(items)
+            return
+        for item in items:
+            on_result(item)
+
+    for chunk in chunks:
+        emit(parser.feed(chunk))
+    emit(parser.close())
+    return results, parser
@@ -0,0 +1,194 @@
+# semgrep_prefilter.py
+# Semgrep 룰셋 사전 필터: 룰 패턴의 필수 리터럴 토큰으로 매칭 불가능한 (룰셋, 파일) 쌍을 미리 제외
+
+import re
+import yaml
+from ..cache import DiskCache, sha256_file
+from ..config import SEMGREP_CONFIG
+
+# 패턴에 있어도 필수 토큰으로 취급하지 않는 Solidity 키워드/기본 타입
+# (Semgrep이 uint/uint256 같은 별칭이나 생성자·fallback 등을 동등하게 매칭할 수 있으므로 보수적으로 제외)
+SOLIDITY_STOPWORDS = frozenset('''
+    abstract address anonymous as assembly bool break bytes calldata catch constant constructor continue contract
+    delete do else emit enum error event external fallback false for from function if immutable import indexed
+    interface internal is library mapping memory modifier new override payable pragma private public pure receive
+    return returns revert storage string struct this true try type unchecked using view virtual while
+    int uint fixed ufixed byte wei gwei ether seconds minutes hours days weeks
+'''.split())
+
+_SIZED_TYPE = re.compile(r'(?:u?int|bytes|u?fixed)\d+(?:x\d+)?\Z')
+# 식별자 (메타변수 $X, $...ARGS는 첫 번째 분기가 통째로 소비하고 버림)
+_IDENTIFIER = re.compile(r'\$(?:\.\.\.)?\w+|(?<!\w)([A-Za-z_]\w*)')
+_MIN_TOKEN_LENGTH = 3
+# 토큰 추출 규칙이 바뀌면 올려서 이전에 캐시된 조건을 버림
+REQUIREMENT_VERSION = 2
+
+# 충족 조건이 필요한 패턴 키 (pattern-not*, metavariable-*, focus-metavariable 등은 조건을 좁히기만 하므로 무시)
+_REQUIRED_KEYS = ('pattern', 'patterns', 'pattern-either', 'pattern-inside')
+
+def pattern_tokens(pattern):
+    """
+    패턴 문자열에서 파일에 반드시 등장해야 하는 리터럴 식별자 목록을 추출합니다.
+    """
+    tokens = set()
+    for token in _IDENTIFIER.findall(pattern or ''):
+        if not token or len(token) < _MIN_TOKEN_LENGTH or token in SOLIDITY_STOPWORDS or _SIZED_TYPE.match(token):
+            continue
+        tokens.add(token)
+    return sorted(tokens)
+
+def _all_of(children):
+    children = [child for child in children if child is not None]
+    if not children:
+        return None
+    if len(children) == 1:
+        return children[0]
+    return {'all': children}
+
+def _any_of(children):
+    # 하나라도 제약이 없으면 전체가 제약 없음
+    if not children or any(child is None for child in children):
+        return None
+    if len(children) == 1:
+        return children[0]
+    return {'any': children}
+
+def _formula_requirement(node):
+    """
+    룰 수식(pattern / patterns / pattern-either / pattern-inside)을 필수 토큰 조건으로 변환합니다.
+
+    Returns:
+        None(제약 없음), 토큰 목록(모두 필요), {'all': [...]}, {'any': [...]}
+    """
+    if not isinstance(node, dict):
+        return None
+    requirements = []
+    for key in _REQUIRED_KEYS:
+        if key not in node:
+            continue
+        value = node[key]
+        if key in ('pattern', 'pattern-inside'):
+            requirements.append(pattern_tokens(value) or None)
+        elif key == 'patterns':
+            requirements.append(_all_of([_formula_requirement(item) for item in value or []]))
+        elif key == 'pattern-either':
+            requirements.append(_any_of([_formula_requirement(item) for item in value or []]))
+    return _all_of(requirements)
+
+def rule_requirement(rule):
+    """
+    단일 룰이 매칭되기 위해 파일에 있어야 하는 토큰 조건을 계산합니다.
+    taint 모드는 소스와 싱크가 모두 같은 파일에서 매칭되어야 하며, 그 외 모드나 정규식 패턴만 있는 룰은 제약 없음(None)입니다.
+    """
+    if not isinstance(rule, dict):
+        return None
+    mode = rule.get('mode', 'search')
+    if mode == 'taint':
+        return _all_of([
+            _any_of([_formula_requirement(item) for item in rule.get('pattern-sources', []) or []]),
+            _any_of([_formula_requirement(item) for item in rule.get('pattern-sinks', []) or []]),
+        ])
+    if mode != 'search' or not any(key in rule for key in ('pattern', 'patterns', 'pattern-either')):
+        return None
+    return _formula_requirement(rule)
+
+def load_rule_file_requirement(rule_file):
+    """
+    룰셋 파일 하나의 토큰 조건을 계산합니다. (파일 안의 룰 중 하나라도 매칭 가능하면 실행 필요)
+    """
+    try:
+        with open(rule_file, 'r', encoding='utf-8') as f:
+            document = yaml.safe_load(f) or {}
+    except (OSError, yaml.YAMLError):
+        return None
+    rules = document.get('rules', []) or []
+    return _any_of([rule_requirement(rule) for rule in rules])
+
+def requirement_tokens(requirement):
+    """
+    조건에 등장하는 모든 토큰 집합을 반환합니다.
+    """
+    if requirement is None:
+        return set()
+    if isinstance(requirement, list):
+        return set(requirement)
+    tokens = set()
+    for child in requirement.get('all', requirement.get('any', [])):
+        tokens |= requirement_tokens(child)
+    return tokens
+
+def requirement_satisfied(requirement, present):
+    """
+    파일에 존재하는 토큰 집합(present)이 조건을 만족하는지 확인합니다.
+    """
+    if requirement is None:
+        return True
+    if isinstance(requirement, list):
+        return all(token in present for token in requirement)
+    if 'all' in requirement:
+        return all(requirement_satisfied(child, present) for child in requirement['all'])
+    return any(requirement_satisfied(child, present) for child in requirement['any'])
+
+def load_requirements(rule_files, rule_hashes=None):
+    """
+    룰셋 파일별 토큰 조건을 반환합니다. 룰셋 해시 기준으로 디스크에 캐시하여 룰셋이 바뀔 때만 다시 추출합니다.
+    """
+    rule_hashes = rule_hashes or {rule_file: sha256_file(rule_file) for rule_file in rule_files}
+    with DiskCache('semgrep-prefilter', SEMGREP_CONFIG['cache_max_bytes']) as cache:
+        keys = {rule_file: f'requirement:{REQUIREMENT_VERSION}:' + rule_hashes[rule_file] for rule_file in rule_files}
+        cached = cache.get_many(keys.values())
+        requirements = {}
+        fresh = {}
+        for rule_file, key in keys.items():
+            if key in cached:
+                requirements[rule_file] = cached[key]
+            else:
+                requirements[rule_file] = fresh[key] = load_rule_file_requirement(rule_file)
+        if fresh:
+            cache.put_many(fresh)
+    return requirements
+
+def build_token_matcher(requirements):
+    """
+    모든 룰셋의 필수 토큰을 하나의 다중 패턴 정규식으로 컴파일합니다. (필수 토큰이 없으면 None)
+    """
+    tokens = set()
+    for requirement in requirements.values():
+        tokens |= requirement_tokens(requirement)
+    if not tokens:
+        return None
+    # 긴 토큰을 먼저 시도하도록 정렬 (transferFrom이 transfer보다 먼저)
+    alternation = '|'.join(re.escape(token) for token in sorted(tokens, key=lambda token: (-len(token), token)))
+    return re.compile(r'\b(?:' + alternation + r')\b')
+
+def index_file_tokens(path, matcher):
+    """
+    파일을 한 번만 스캔하여 필수 토큰 중 등장하는 것들의 집합을 반환합니다.
+    """
+    if matcher is None:
+        return set()
+    with open(path, 'r', encoding='utf-8', errors='replace') as f:
+        return set(matcher.findall(f.read()))
+
+def prune_pairs(pending_rules, requirements, path_of):
+    """
+    매칭이 불가능한 (룰셋, 파일) 쌍을 pending_rules에서 제거합니다.
+
+    Args:
+        pending_rules: {파일: 실행이 필요한 룰셋 파일 집합} (제자리 수정)
+        requirements: {룰셋 파일: 토큰 조건}
+        path_of: 파일 -> 실제 경로 함수
+
+    Returns:
+        제외된 쌍 수
+    """
+    matcher = build_token_matcher(requirements)
+    pruned = 0
+    for target, rule_set in pending_rules.items():
+        if not rule_set:
+            continue
+        present = index_file_tokens(path_of(target), matcher)
+        doomed = {rule_file for rule_file in rule_set if not requirement_satisfied(requirements.get(rule_file), present)}
+        rule_set -= doomed
+        pruned += len(doomed)
+    return pruned
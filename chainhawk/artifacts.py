@@ -0,0 +1,190 @@
+# artifacts.py
+# forge 빌드 산출물(out/**/*.json) 기반 컨트랙트 인덱스 (이름 -> 소스 파일, ABI, 바이트코드 해시)
+
+import json
+import os
+import threading
+from .cache import DiskCache, sha256_text
+from .config import ARTIFACT_INDEX_CONFIG
+
+# 인덱스에서 제외하는 out/ 하위 디렉토리 (컴파일러 입출력 전체가 들어 있어 매우 큼)
+SKIPPED_DIRS = ('build-info',)
+
+def _bytecode_object(value):
+    if isinstance(value, dict):
+        value = value.get('object', '')
+    return value or ''
+
+def _source_path(artifact, name, fallback):
+    """
+    산출물이 어떤 소스 파일에서 컴파일되었는지 찾습니다. (메타데이터 compilationTarget -> AST 경로 -> out/ 하위 디렉토리 이름)
+    """
+    metadata = artifact.get('metadata')
+    if isinstance(metadata, str):
+        try:
+            metadata = json.loads(metadata)
+        except json.JSONDecodeError:
+            metadata = None
+    if isinstance(metadata, dict):
+        for source, target in (metadata.get('settings', {}).get('compilationTarget') or {}).items():
+            if target == name:
+                return source
+    ast = artifact.get('ast')
+    if isinstance(ast, dict) and ast.get('absolutePath'):
+        return ast['absolutePath']
+    return fallback
+
+def parse_artifact(path, rel_path):
+    """
+    산출물 JSON 하나를 인덱스 항목으로 변환합니다.
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        artifact = json.load(f)
+    name = os.path.splitext(os.path.basename(rel_path))[0]
+    bytecode = _bytecode_object(artifact.get('bytecode'))
+    deployed = _bytecode_object(artifact.get('deployedBytecode'))
+    abi = artifact.get('abi', [])
+    return {
+        'name': name,
+        'source': _source_path(artifact, name, os.path.dirname(rel_path)),
+        'artifact': rel_path,
+        'abi': abi,
+        'abi_hash': sha256_text(json.dumps(abi, sort_keys=True, separators=(',', ':'))),
+        'bytecode_hash': sha256_text(deployed) if deployed not in ('', '0x') else None,
+        'deployable': bytecode not in ('', '0x'),
+    }
+
+class ArtifactIndex:
+    """
+    Foundry 프로젝트 out/ 산출물의 컨트랙트 인덱스
+    산출물별 (경로, 수정 시각, 크기)가 바뀐 파일만 다시 파싱하며, 파싱 결과는 디스크에 보관하여 다음 실행에서도 재사용합니다.
+    이름/산출물 경로 조회는 사전 조회(O(1))입니다.
+    """
+
+    def __init__(self, project_dir, out_dir='out'):
+        self.project_dir = os.path.abspath(project_dir)
+        self.out_dir = os.path.join(self.project_dir, out_dir)
+        self._entries = {}  # 산출물 상대 경로 -> 항목
+        self._stamps = {}  # 산출물 상대 경로 -> (수정 시각, 크기)
+        self._by_name = {}  # 컨트랙트 이름 -> [항목]
+        self._lock = threading.Lock()
+
+    def _scan(self):
+        stamps = {}
+        if not os.path.isdir(self.out_dir):
+            return stamps
+        for source_dir in os.scandir(self.out_dir):
+            if not source_dir.is_dir() or source_dir.name in SKIPPED_DIRS:
+                continue
+            for artifact in os.scandir(source_dir.path):
+                if artifact.is_file() and artifact.name.endswith('.json'):
+                    stat = artifact.stat()
+                    stamps[f"{source_dir.name}/{artifact.name}"] = (stat.st_mtime_ns, stat.st_size)
+        return stamps
+
+    def refresh(self):
+        """
+        out/을 다시 확인하여 바뀐 산출물만 인덱스에 반영합니다.
+
+        Returns:
+            다시 파싱한 산출물 수
+        """
+        with self._lock:
+            stamps = self._scan()
+            changed = [rel_path for rel_path, stamp in stamps.items() if self._stamps.get(rel_path) != stamp]
+            removed = [rel_path for rel_path in self._stamps if rel_path not in stamps]
+            if not changed and not removed:
+                return 0
+
+            for rel_path in removed:
+                self._entries.pop(rel_path, None)
+            parsed = 0
+            if changed:
+                keys = {rel_path: sha256_text(self.out_dir, rel_path, *stamps[rel_path]) for rel_path in changed}
+                with DiskCache('artifacts', ARTIFACT_INDEX_CONFIG['cache_max_bytes']) as cache:
+                    cached = cache.get_many(keys.values())
+                    fresh = {}
+                    for rel_path, key in keys.items():
+                        entry = cached.get(key)
+                        if entry is None:
+                            try:
+                                entry = parse_artifact(os.path.join(self.out_dir, rel_path), rel_path)
+                            except (OSError, json.JSONDecodeError):
+                                # 빌드 도중 쓰이고 있는 파일 등: 다음 갱신 때 다시 시도
+                                stamps.pop(rel_path)
+                                self._entries.pop(rel_path, None)
+                                continue
+                            fresh[key] = entry
+                            parsed += 1
+                        self._entries[rel_path] = entry
+                    if fresh:
+                        cache.put_many(fresh)
+
+            self._stamps = stamps
+            self._by_name = {}
+            for rel_path in sorted(self._entries):
+                entry = self._entries[rel_path]
+                self._by_name.setdefault(entry['name'], []).append(entry)
+            return parsed
+
+    def get(self, name, source=None):
+        """
+        컨트랙트 이름으로 항목을 찾습니다. 같은 이름이 여러 소스에 있으면 source로 구분하거나 src/ 쪽을 우선합니다.
+        """
+        candidates = self._by_name.get(name, [])
+        if source:
+            candidates = [entry for entry in candidates if entry['source'] == source]
+        if not candidates:
+            return None
+        return next((entry for entry in candidates if entry['source'].startswith('src/')), candidates[0])
+
+    def require(self, name):
+        """
+        컨트랙트 항목을 반환합니다. 없으면 RuntimeError.
+        """
+        entry = self.get(name)
+        if entry is None:
+            raise RuntimeError(f"컴파일 산출물을 찾을 수 없습니다: {name} (out/*/{name}.json)")
+        return entry
+
+    def contracts(self, source_prefix=None, deployable=None):
+        """
+        조건에 맞는 항목 목록을 (소스 경로, 이름) 순으로 반환합니다.
+        """
+        entries = [
+            entry for entry in self._entries.values()
+            if (source_prefix is None or entry['source'].startswith(source_prefix))
+            and (deployable is None or entry['deployable'] == deployable)
+        ]
+        return sorted(entries, key=lambda entry: (entry['source'], entry['name']))
+
+    def default_contract(self):
+        """
+        자동 감지 대상 컨트랙트: src/에서 배포 가능한 첫 번째 컨트랙트 (주석·문자열 속 'contract' 오탐 없음)
+        """
+        entries = self.contracts('src/', deployable=True)
+        return entries[0] if entries else None
+
+    def artifact_path(self, entry):
+        return os.path.join(self.out_dir, entry['artifact'])
+
+    def __len__(self):
+        return len(self._entries)
+
+_indexes = {}
+_indexes_lock = threading.Lock()
+
+def get_artifact_index(project_dir, out_dir='out'):
+    """
+    프로젝트별로 공유하는 산출물 인덱스를 최신 상태로 갱신하여 반환합니다.
+
+    Args:
+        out_dir: 프로젝트 기준 산출물 디렉토리 (Halmos 전용 빌드 등)
+    """
+    key = (os.path.abspath(project_dir), out_dir)
+    with _indexes_lock:
+        index = _indexes.get(key)
+        if index is None:
+            index = _indexes[key] = ArtifactIndex(key[0], out_dir)
+    index.refresh()
+    return index
@@ -0,0 +1,124 @@
+# cache.py
+# 로컬 디스크 캐시 공통 기능 (콘텐츠 해시, 용량 제한 LRU 저장소)
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from .config import CACHE_CONFIG
+
+def cache_dir(name):
+    """
+    캐시 하위 디렉터리 경로를 반환합니다. (없으면 생성)
+    기본 위치는 $XDG_CACHE_HOME/chainhawk 또는 ~/.cache/chainhawk 입니다.
+    """
+    root = CACHE_CONFIG['dir'] or os.environ.get('CHAINHAWK_CACHE_DIR')
+    if not root:
+        base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+        root = os.path.join(base, 'chainhawk')
+    path = os.path.join(root, name)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+def sha256_bytes(data):
+    """
+    바이트열의 SHA-256 해시(hex)를 반환합니다.
+    """
+    return hashlib.sha256(data).hexdigest()
+
+def sha256_text(*parts):
+    """
+    여러 문자열 구성 요소를 구분자와 함께 이어 붙인 SHA-256 해시(hex)를 반환합니다.
+    """
+    return sha256_bytes('\0'.join(str(part) for part in parts).encode('utf-8'))
+
+def sha256_file(path, chunk_size=1 << 20):
+    """
+    파일 내용의 SHA-256 해시(hex)를 반환합니다.
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class DiskCache:
+    """
+    SQLite 파일 하나에 JSON 값을 저장하는 키-값 캐시
+    마지막 사용 시각 기준 LRU로 전체 용량(max_bytes)을 제한하며 적중/미스 횟수를 집계합니다.
+    """
+
+    def __init__(self, name, max_bytes):
+        self.path = os.path.join(cache_dir(name), 'cache.sqlite3')
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._conn = sqlite3.connect(self.path)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS entries ('
+            ' key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, last_used REAL NOT NULL)'
+        )
+        self._conn.execute('CREATE INDEX IF NOT EXISTS entries_last_used ON entries(last_used)')
+        self._conn.commit()
+
+    def get_many(self, keys):
+        """
+        여러 키를 한 번에 조회하고 {키: 값}을 반환합니다. 적중한 항목의 사용 시각을 갱신합니다.
+        """
+        keys = list(dict.fromkeys(keys))
+        found = {}
+        # SQLite 바인딩 변수 개수 제한을 넘지 않도록 나누어 조회
+        for i in range(0, len(keys), 500):
+            chunk = keys[i:i + 500]
+            placeholders = ','.join('?' * len(chunk))
+            rows = self._conn.execute(f'SELECT key, value FROM entries WHERE key IN ({placeholders})', chunk)
+            for key, value in rows:
+                found[key] = json.loads(value)
+        now = time.time()
+        with self._conn:
+            self._conn.executemany('UPDATE entries SET last_used = ? WHERE key = ?', [(now, key) for key in found])
+        self.hits += len(found)
+        self.misses += len(keys) - len(found)
+        return found
+
+    def put_many(self, items):
+        """
+        {키: 값} 항목들을 하나의 트랜잭션으로 저장한 뒤 용량 제한을 적용합니다.
+        """
+        now = time.time()
+        rows = []
+        for key, value in items.items():
+            encoded = json.dumps(value, separators=(',', ':'))
+            rows.append((key, encoded, len(encoded), now))
+        with self._conn:
+            self._conn.executemany('INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?)', rows)
+        self.evict()
+
+    def evict(self):
+        """
+        전체 크기가 max_bytes를 넘으면 가장 오래 사용되지 않은 항목부터 삭제합니다.
+        """
+        total = self._conn.execute('SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()[0]
+        if total <= self.max_bytes:
+            return 0
+        excess = total - self.max_bytes
+        doomed = []
+        for key, size in self._conn.execute('SELECT key, size FROM entries ORDER BY last_used'):
+            doomed.append((key,))
+            excess -= size
+            if excess <= 0:
+                break
+        with self._conn:
+            self._conn.executemany('DELETE FROM entries WHERE key = ?', doomed)
+        return len(doomed)
+
+    def close(self):
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -1,6 +1,15 @@
+import sys
+import time
+from contextlib import nullcontext, redirect_stdout
 import click
 from .adapters.semgrep_adapter import run_semgrep
 from .adapters.ityfuzz_adapter import run_ityfuzz
+from .adapters.halmos_adapter import run_halmos
+from .incremental import incremental_scope
+from .orchestrator import ENGINES, engine_status, format_analysis, run_analysis
+from .report.generator import REPORT_FORMATS, open_report
+from .result.aggregator import halmos_finding, ityfuzz_finding
+from .result.store import FindingStore, open_run
 
 @click.group()
 def cli():
@@ -9,88 +18,223 @@ def cli():
 
 @click.command()
 @click.option('--foundry-dir', '-f', required=True, help='Foundry 프로젝트 디렉토리 경로')
-@click.option('--contract', '-c', help='배포할 컨트랙트 이름 (선택사항, 자동 감지됨)')
+@click.option('--contract', '-c', multiple=True, help='배포할 컨트랙트 이름 (선택사항, 자동 감지됨, onchain 모드에서는 반복 지정하여 여러 대상 퍼징, --engine halmos에서는 속성 함수를 찾을 컨트랙트)')
 @click.option('--rules', '-r', default='semgrep_rules', help='Semgrep 룰셋 디렉터리 또는 config')
-@click.option('--engine', '-e', default='semgrep', type=click.Choice(['semgrep', 'ityfuzz']), show_default=True, help='분석 엔진 선택')
+@click.option('--engine', '-e', default='semgrep', type=click.Choice(['semgrep', 'ityfuzz', 'halmos', 'all']), show_default=True, help='분석 엔진 선택 (all: Semgrep, ITYfuzz, Halmos를 하나의 단계 DAG로 동시 실행)')
+@click.option('--concurrency', type=click.IntRange(min=1), help='--engine all에서 동시에 실행할 최대 단계 수 (기본값: 설정값)')
+@click.option('--since', help='증분 분석 기준 git ref: 이후 변경된 파일과 이를 import하는 파일·컨트랙트만 분석하고 나머지 결과는 직전 실행에서 이어받음')
+@click.option('--include', multiple=True, help='Semgrep 분석에 포함할 glob 패턴 (프로젝트 기준, 반복 지정 가능)')
+@click.option('--exclude', multiple=True, help='Semgrep 분석에서 제외할 glob 패턴 (프로젝트 기준, 반복 지정 가능)')
+@click.option('--jobs', '-j', type=int, help='Semgrep 병렬 작업 수 (기본값: 호스트 코어 수)')
+@click.option('--ityfuzz-mode', type=click.Choice(['setup', 'onchain']), help='ITYfuzz 실행 모드 (setup: 배포 스크립트 대상, onchain: Anvil 배포 주소 대상)')
+@click.option('--workers', '-w', type=click.IntRange(min=1), help='병렬로 실행할 ITYfuzz 인스턴스 수 (워커별 시드/출력 디렉토리, 코퍼스 병합)')
+@click.option('--budget', type=click.IntRange(min=1), help='ITYfuzz 전체 퍼징 시간 예산(초), 커버리지가 정체된 대상의 시간을 아직 커버리지가 늘어나는 대상에 배분')
+@click.option('--stop-on-first', is_flag=True, help='첫 번째 취약점이 확인되면 ITYfuzz 캠페인을 즉시 중지 (전체 로그는 fuzz.log에 보존)')
+@click.option('--solver-timeout', type=click.IntRange(min=1), help='Halmos 어설션 하나의 솔버 제한 시간(초) (기본값: 설정값)')
+@click.option('--reuse-chain', is_flag=True, default=None, help='Anvil 체인을 실행 간에 유지하고 스냅샷으로 되돌려 재사용 (stop-chain으로 중지)')
+@click.option('--load-state', type=click.Path(exists=True, dir_okay=False), help='배포가 끝난 체인 상태 파일을 불러와 재배포 생략 (onchain 모드)')
+@click.option('--dump-state', type=click.Path(dir_okay=False), help='배포 후 체인 상태를 파일로 저장 (onchain 모드)')
+@click.option('--deploy-plan', type=click.Path(exists=True, dir_okay=False), help='여러 컨트랙트를 의존 순서대로 일괄 배포할 배포 계획 JSON 파일 (onchain 모드)')
+@click.option('--no-cache', is_flag=True, help='캐시를 사용하지 않음 (Semgrep: 모든 (룰셋, 파일) 쌍 재분석, ITYfuzz: 컴파일 캐시와 저장된 코퍼스 생략, Halmos: 모든 속성 함수 재검증)')
+@click.option('--format', 'report_format', default='text', type=click.Choice(REPORT_FORMATS), show_default=True, help='결과 보고서 형식 (text: 한글 보고서, jsonl: 결과당 JSON 한 줄, sarif: SARIF 2.1.0)')
+@click.option('--output', '-o', type=click.Path(dir_okay=False), help='결과 보고서를 기록할 파일 (기본값: 표준 출력, 결과는 발견되는 즉시 기록)')
 @click.option('--debug', '-d', is_flag=True, help='디버그 모드 활성화')
-def analyze(foundry_dir, contract, rules, engine, debug):
-    """스마트 컨트랙트 취약점 분석 실행 (Semgrep/ITYfuzz)"""
+def analyze(foundry_dir, contract, rules, engine, concurrency, since, include, exclude, jobs, ityfuzz_mode, workers, budget, stop_on_first, solver_timeout, reuse_chain, load_state, dump_state, deploy_plan, no_cache, report_format, output, debug):
+    """스마트 컨트랙트 취약점 분석 실행 (Semgrep/ITYfuzz/Halmos)"""
+    # 결과는 보고서 작성기로 발견되는 즉시 기록 (기계 판독 형식을 표준 출력에 쓰면 나머지 출력은 모두 표준 오류로)
+    summary_to_stderr = report_format != 'text' and (not output or output == '-')
     if debug:
-        click.echo(f"[디버그] 분석 시작... (엔진: {engine})")
-        click.echo(f"[디버그] Foundry 디렉토리: {foundry_dir}")
+        click.echo(f"[디버그] 분석 시작... (엔진: {engine})", err=summary_to_stderr)
+        click.echo(f"[디버그] Foundry 디렉토리: {foundry_dir}", err=summary_to_stderr)
         if contract:
-            click.echo(f"[디버그] 대상 컨트랙트: {contract}")
-        if engine == 'semgrep':
-            click.echo(f"[디버그] 룰셋 경로: {rules}")
+            click.echo(f"[디버그] 대상 컨트랙트: {', '.join(contract)}", err=summary_to_stderr)
+        if engine in ('semgrep', 'all'):
+            click.echo(f"[디버그] 룰셋 경로: {rules}", err=summary_to_stderr)
+
+    scope = None
+    if since:
+        # 변경 파일 + import 그래프상의 의존 파일만 분석 범위로 (설정 파일이 바뀌었으면 None: 전체 분석)
+        try:
+            with redirect_stdout(sys.stderr) if summary_to_stderr else nullcontext():
+                scope = incremental_scope(foundry_dir, since, debug)
+        except RuntimeError as e:
+            click.echo(f"[오류] 증분 분석 범위 계산 실패: {e}", err=summary_to_stderr)
+            return
+        if scope is not None:
+            click.echo(f"[정보] 증분 분석: {scope.summary()}", err=summary_to_stderr)
 
-    if engine == 'semgrep':
-        # Semgrep은 개별 파일이 필요하므로 첫 번째 .sol 파일 사용
-        from pathlib import Path
-        foundry_path = Path(foundry_dir)
-        sol_files = list((foundry_path / "src").glob("*.sol"))
-        if sol_files:
-            target_file = str(sol_files[0])
-            results = run_semgrep(target_file, rules, debug)
+    if not summary_to_stderr:
+        click.echo("[분석 결과]")
+    # 보고서에 쓰는 결과는 실행 기록 저장소에도 지문 기준으로 함께 기록 (chainhawk diff로 실행 간 비교)
+    engines = ENGINES if engine == 'all' else (engine,)
+    started = time.monotonic()
+    with open_run(foundry_dir, engines, since) as run, open_report(report_format, output, record=run) as report:
+        if engine == 'all' or since:
+            # 공통 단계(프로젝트 탐색 등)는 한 번만 실행하고, Semgrep은 퍼저 준비(이미지/컴파일/체인/배포)와 동시에 진행
+            # --since는 엔진 하나여도 같은 DAG로 실행하여 이전 실행 결과를 이어받고 다음 실행의 기준을 저장
+            options = {
+                'rules': rules, 'include': include or None, 'exclude': exclude or None, 'jobs': jobs,
+                'use_cache': False if no_cache else None, 'contract': list(contract), 'ityfuzz_mode': ityfuzz_mode,
+                'workers': workers, 'reuse_chain': reuse_chain, 'load_state': load_state, 'dump_state': dump_state,
+                'deploy_plan': deploy_plan, 'stop_on_first': stop_on_first, 'budget': budget,
+                'solver_timeout': solver_timeout, 'report': report, 'scope': scope,
+            }
+            analysis = run_analysis(foundry_dir, engines, options, concurrency, debug)
+            run.add_targets(analysis['targets'])
+            run.add_timings(analysis['timings'])
+            for name, result in analysis['engines'].items():
+                run.set_engine_status(name, engine_status(result))
+            results = format_analysis(analysis)
+        elif engine == 'semgrep':
+            # Foundry 프로젝트 전체 소스 트리(하위 디렉토리 포함)를 샤드로 나누어 분석
+            results = run_semgrep(foundry_dir, rules, debug, include=include or None, exclude=exclude or None, jobs=jobs,
+                                  use_cache=not no_cache, report=report)
+        elif engine == 'ityfuzz':
+            results = run_ityfuzz(foundry_dir, list(contract), debug, mode=ityfuzz_mode,
+                                  reuse_chain=reuse_chain, load_state=load_state, dump_state=dump_state,
+                                  use_cache=False if no_cache else None, deploy_plan=deploy_plan, workers=workers,
+                                  stop_on_first=stop_on_first, budget=budget)
+            for bug in results.get('bugs') or []:
+                report.write(ityfuzz_finding(bug))
+        elif engine == 'halmos':
+            # check_/prove_ 속성 함수별로 병렬 검증 (바이트코드와 옵션이 같으면 캐시된 판정 재사용)
+            results = run_halmos(foundry_dir, list(contract), debug, use_cache=False if no_cache else None,
+                                 solver_timeout=solver_timeout)
+            for bug in results.get('bugs') or []:
+                report.write(halmos_finding(bug))
         else:
-            results = "[오류] src 디렉토리에 .sol 파일이 없습니다."
-    elif engine == 'ityfuzz':
-        results = run_ityfuzz(foundry_dir, contract, debug)
-    else:
-        results = '[오류] 지원하지 않는 분석 엔진입니다.'
+            results = '[오류] 지원하지 않는 분석 엔진입니다.'
+        if engine != 'all' and not since:
+            run.add_timings({engine: time.monotonic() - started})
+            # 실패한 엔진은 비교(diff)·증분 분석 기준에서 제외되도록 상태를 기록
+            run.set_engine_status(engine, engine_status(results))
     
-    click.echo("[분석 결과]")
-    click.echo(results)
+    if output:
+        click.echo(f"[정보] 보고서 저장: {output} ({report_format}, {report.count}건)", err=summary_to_stderr)
+    click.echo(results, err=summary_to_stderr)
+    click.echo(f"[정보] 실행 기록 저장: #{run.run_id} (비교: chainhawk diff <이전 실행> {run.run_id})", err=summary_to_stderr)
+
+@click.command()
+@click.argument('run_a')
+@click.argument('run_b')
+@click.option('--foundry-dir', '-f', help='latest 참조를 찾을 Foundry 프로젝트 디렉토리 (기본값: 모든 프로젝트)')
+@click.option('--limit', default=50, type=click.IntRange(min=0), show_default=True, help='새 결과/해결된 결과를 표시할 최대 건수 (0: 모두)')
+def diff(run_a, run_b, foundry_dir, limit):
+    """두 분석 실행의 결과 비교 (새 결과 / 해결된 결과 / 변경 없음)
+
+    RUN_A, RUN_B는 실행 id, latest 또는 latest~N (예: chainhawk diff latest~1 latest)
+    """
+    with FindingStore() as store:
+        try:
+            run_a, run_b = store.resolve_run(run_a, foundry_dir), store.resolve_run(run_b, foundry_dir)
+        except RuntimeError as e:
+            click.echo(f"[오류] {e}")
+            return
+        result = store.diff(run_a, run_b, limit or None)
+    if result['excluded']:
+        click.echo(f"[경고] 두 실행 중 한쪽에서 완료되지 않은 엔진은 비교에서 제외합니다: {', '.join(sorted(result['excluded']))}")
+    if not result['engines']:
+        click.echo("[오류] 두 실행 모두에서 완료된 엔진이 없어 비교할 수 없습니다.")
+        return
+    counts = result['counts']
+    click.echo(f"실행 #{run_a} → #{run_b}: 새 결과 {counts['new']}건, 해결된 결과 {counts['fixed']}건, 변경 없음 {counts['unchanged']}건")
+    for title, key in (('새 결과', 'new'), ('해결된 결과', 'fixed')):
+        if not counts[key]:
+            continue
+        click.echo(f"\n=== {title} ===")
+        for finding in result[key]:
+            location = f"{finding.file}:{finding.start_line}" if finding.file else (finding.contract or '-')
+            click.echo(f"  [{finding.severity}] {finding.rule}  {location}  ({finding.engine})")
+        if counts[key] > len(result[key]):
+            click.echo(f"  ... 외 {counts[key] - len(result[key])}건")
+
+@click.command()
+@click.option('--foundry-dir', '-f', help='Foundry 프로젝트 디렉토리 (기본값: 모든 프로젝트)')
+@click.option('--limit', default=20, type=click.IntRange(min=1), show_default=True, help='표시할 최근 실행 수')
+def runs(foundry_dir, limit):
+    """저장된 분석 실행 기록 목록"""
+    with FindingStore() as store:
+        entries = store.runs(foundry_dir, limit)
+    if not entries:
+        click.echo("[정보] 저장된 실행 기록이 없습니다.")
+        return
+    for entry in entries:
+        started = time.strftime('%Y-%m-%d %H:%M', time.localtime(entry['started']))
+        since = f"  --since {entry['since']}" if entry['since'] else ''
+        failed = [name for name, status in entry['engine_status'].items() if status == 'failed']
+        failed = f"  (실패: {', '.join(failed)})" if failed else ''
+        click.echo(f"#{entry['id']:<6} {started}  {entry['status']:<9} {','.join(entry['engines']):<22} 결과 {entry['findings']:>6}건  {entry['project']}{since}{failed}")
 
 @click.command()
 def validate():
     """도구 설정 검증"""
     click.echo("🔧 Chainhawk 설정 검증 중...")
     
-    # Docker 확인
-    import subprocess
-    try:
-        docker_result = subprocess.run(['docker', '--version'], capture_output=True, text=True)
-        if docker_result.returncode == 0:
-            click.echo("✅ Docker: 사용 가능")
-        else:
-            click.echo("❌ Docker: 사용 불가")
-    except FileNotFoundError:
-        click.echo("❌ Docker: 설치되지 않음")
+    # 도구 확인을 하나의 이벤트 루프에서 동시에 실행 (Docker는 Engine API로 데몬에 직접 연결)
+    from .config import PROCESS_CONFIG
+    from .infrastructure.docker_manager import get_client
+    from .infrastructure.process_runner import get_runner
+    runner = get_runner()
+    timeout = PROCESS_CONFIG['probe_timeout']
+    docker_probe, forge_probe, semgrep_probe = runner.gather(
+        runner.call_async('probe', lambda: get_client().version().get('Version', '?')),
+        runner.run_process(['forge', '--version'], timeout=timeout),
+        runner.run_process(['semgrep', '--version'], timeout=timeout),
+    )
+    
+    if isinstance(docker_probe, Exception):
+        click.echo("❌ Docker: 데몬에 연결할 수 없음")
+    else:
+        click.echo(f"✅ Docker: 사용 가능 (Engine {docker_probe})")
     
     # Foundry 확인 (ITYfuzz용)
-    try:
-        forge_result = subprocess.run(['forge', '--version'], capture_output=True, text=True)
-        if forge_result.returncode == 0:
-            click.echo("✅ Foundry (forge): 사용 가능")
-        else:
-            click.echo("❌ Foundry (forge): 사용 불가")
-    except FileNotFoundError:
+    if isinstance(forge_probe, FileNotFoundError):
         click.echo("❌ Foundry: 설치되지 않음 (ITYfuzz 사용 시 필요)")
+    elif not isinstance(forge_probe, Exception) and forge_probe.returncode == 0:
+        click.echo("✅ Foundry (forge): 사용 가능")
+    else:
+        click.echo("❌ Foundry (forge): 사용 불가")
     
     # Semgrep 확인
-    try:
-        semgrep_result = subprocess.run(['semgrep', '--version'], capture_output=True, text=True)
-        if semgrep_result.returncode == 0:
-            click.echo("✅ Semgrep: 사용 가능")
-        else:
-            click.echo("❌ Semgrep: 사용 불가")
-    except FileNotFoundError:
+    if isinstance(semgrep_probe, FileNotFoundError):
         click.echo("❌ Semgrep: 설치되지 않음")
-    
-    # curl 확인 (Anvil 상태 체크용)
-    try:
-        curl_result = subprocess.run(['curl', '--version'], capture_output=True, text=True)
-        if curl_result.returncode == 0:
-            click.echo("✅ curl: 사용 가능")
-        else:
-            click.echo("❌ curl: 사용 불가")
-    except FileNotFoundError:
-        click.echo("❌ curl: 설치되지 않음")
+    elif not isinstance(semgrep_probe, Exception) and semgrep_probe.returncode == 0:
+        click.echo("✅ Semgrep: 사용 가능")
+    else:
+        click.echo("❌ Semgrep: 사용 불가")
     
     click.echo("\n💡 ITYfuzz 사용 시 필요한 것들:")
     click.echo("  - Docker 이미지 빌드: docker build -f docker/ityfuzz.Dockerfile -t chainhawk-ityfuzz .")
     click.echo("  - Foundry 설치: https://getfoundry.sh")
 
+@click.command()
+@click.option('--foundry-dir', '-f', required=True, help='Foundry 프로젝트 디렉토리 경로 (컴파일된 out/ 필요)')
+@click.option('--all', 'show_all', is_flag=True, help='lib/, test/, script/ 컨트랙트와 인터페이스까지 모두 표시')
+def contracts(foundry_dir, show_all):
+    """컴파일 산출물 기반 컨트랙트 목록 표시"""
+    from .artifacts import get_artifact_index
+    index = get_artifact_index(foundry_dir)
+    if not len(index):
+        click.echo("[경고] 컴파일 산출물(out/)이 없습니다. 먼저 forge build를 실행하세요.")
+        return
+    entries = index.contracts() if show_all else index.contracts('src/', deployable=True)
+    default = index.default_contract()
+    for entry in entries:
+        marker = '*' if default is not None and entry is default else ' '
+        bytecode = entry['bytecode_hash'][:12] if entry['bytecode_hash'] else '-'
+        click.echo(f"{marker} {entry['name']:<32} {entry['source']:<48} 함수 {sum(1 for item in entry['abi'] if item.get('type') == 'function'):>3}개  바이트코드 {bytecode}")
+    click.echo(f"\n총 {len(entries)}개 (* 자동 감지 대상)")
+
+@click.command('stop-chain')
+def stop_chain():
+    """--reuse-chain으로 유지 중인 Anvil 체인 중지"""
+    from .infrastructure.anvil_manager import stop_persistent_chains
+    stopped = stop_persistent_chains()
+    if stopped:
+        click.echo(f"[정보] 유지 중인 Anvil 체인 {stopped}개를 중지했습니다.")
+    else:
+        click.echo("[정보] 유지 중인 Anvil 체인이 없습니다.")
+
 @click.command()
 def info():
     """도구 정보 표시"""
@@ -99,34 +243,43 @@ def info():
     click.echo("\n📋 지원하는 분석 엔진:")
     click.echo("  • semgrep  - 정적 분석 (SAST)")
     click.echo("  • ityfuzz  - 퍼징 분석 (동적 테스트)")
+    click.echo("  • halmos   - 심볼릭 실행 (check_/prove_ 속성 검증)")
     click.echo("\n📖 사용 예시:")
     click.echo("  chainhawk analyze --target contract.sol --engine semgrep")
     click.echo("  chainhawk analyze --target contract.sol --engine ityfuzz --debug")
     click.echo("  chainhawk validate")
+    click.echo("  chainhawk diff latest~1 latest")
 
 # 명령어 등록
 cli.add_command(analyze)
 cli.add_command(validate) 
+cli.add_command(contracts)
+cli.add_command(diff)
+cli.add_command(runs)
+cli.add_command(stop_chain)
 cli.add_command(info)
 
 # 기존 호환성을 위한 main 함수
 @click.command()
 @click.option('--target', '-t', required=True, help='분석할 스마트 컨트랙트 경로')
 @click.option('--rules', '-r', default='semgrep_rules', help='Semgrep 룰셋 디렉터리 또는 config')
-@click.option('--engine', '-e', default='semgrep', type=click.Choice(['semgrep', 'ityfuzz']), show_default=True, help='분석 엔진 선택')
+@click.option('--engine', '-e', default='semgrep', type=click.Choice(['semgrep', 'ityfuzz', 'all']), show_default=True, help='분석 엔진 선택 (all: Semgrep과 ITYfuzz를 하나의 단계 DAG로 동시 실행)')
+@click.option('--concurrency', type=click.IntRange(min=1), help='--engine all에서 동시에 실행할 최대 단계 수 (기본값: 설정값)')
 @click.option('--debug', '-d', is_flag=True, help='디버그 모드 활성화')
-def main(target, rules, engine, debug):
+def main(target, rules, engine, concurrency, debug):
     """스마트 컨트랙트 취약점 분석 실행 (Semgrep/ITYfuzz)"""
     if debug:
         click.echo(f"[디버그] 분석 시작... (엔진: {engine})")
         click.echo(f"[디버그] 대상 파일: {target}")
-        if engine == 'semgrep':
+        if engine in ('semgrep', 'all'):
             click.echo(f"[디버그] 룰셋 경로: {rules}")
 
-    if engine == 'semgrep':
+    if engine == 'all':
+        results = format_analysis(run_analysis(target, ('semgrep', 'ityfuzz'), {'rules': rules}, concurrency, debug))
+    elif engine == 'semgrep':
         results = run_semgrep(target, rules, debug)
     elif engine == 'ityfuzz':
-        results = run_ityfuzz(target, debug)
+        results = run_ityfuzz(target, debug=debug)
     else:
         results = '[오류] 지원하지 않는 분석 엔진입니다.'
     click.echo("[분석 결과]")
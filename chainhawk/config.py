@@ -10,21 +10,153 @@ DOCKER_CONFIG = {
         'dockerfile': 'docker/ityfuzz.Dockerfile',
         'tag': 'chainhawk-ityfuzz',
     },
+    'halmos': {
+        'dockerfile': 'docker/halmos.Dockerfile',
+        'tag': 'chainhawk-halmos',
+    },
     'anvil': {
         'image': 'ghcr.io/foundry-rs/foundry:latest',
         'tag': 'chainhawk-anvil',
     }
 }
 
+# Docker Engine API 클라이언트 설정
+DOCKER_API_CONFIG = {
+    'max_pool_size': 16,  # 동시에 유지할 API 연결 수 (병렬 샤드/워커 수 이상)
+}
+
+# 분석기 세션 컨테이너 설정 (docker run --rm 대신 띄워둔 컨테이너에 docker exec)
+SESSION_CONFIG = {
+    'enabled': True,
+    'idle_timeout': 300,  # 마지막 실행 후 유휴 상태로 유지할 시간(초)
+}
+
+# Semgrep 설정
+SEMGREP_CONFIG = {
+    'batch': True,  # 룰셋 전체를 단일 Semgrep 프로세스로 실행
+    'jobs': None,  # 사용할 코어 수 (None이면 호스트 코어 수)
+    'min_files_per_shard': 8,  # 샤드 하나에 배정할 최소 파일 수
+    'cache': True,  # (룰셋, 파일) 쌍 단위 결과 캐시 사용
+    'cache_max_bytes': 256 * 1024 * 1024,  # 결과 캐시 최대 크기 (초과 시 LRU 삭제)
+    'prefilter': True,  # 룰 패턴의 필수 리터럴 토큰이 없는 파일은 해당 룰셋 실행 생략
+}
+
+# 로컬 캐시 설정 (None이면 $XDG_CACHE_HOME/chainhawk 또는 ~/.cache/chainhawk)
+CACHE_CONFIG = {
+    'dir': None,
+}
+
+# 체인 JSON-RPC 클라이언트 설정
+RPC_CONFIG = {
+    'timeout': 10,  # 요청 하나의 제한 시간(초)
+    'pool_size': 8,  # 엔드포인트별로 유지할 최대 연결 수
+    'receipt_timeout': 30,  # 트랜잭션 영수증 대기 최대 시간(초)
+}
+
+# 컨트랙트 배포 설정
+DEPLOY_CONFIG = {
+    'gas_limit': 30000000,  # 생성 트랜잭션 가스 한도 (Anvil 블록 가스 한도 이하)
+}
+
+# Forge 빌드 산출물 캐시 설정 (소스/설정/solc 버전 해시별로 out/, cache/ 보관)
+FORGE_CACHE_CONFIG = {
+    'enabled': True,
+    'max_bytes': 2 * 1024 * 1024 * 1024,  # 보관할 산출물 세트 전체 최대 크기 (초과 시 LRU 삭제)
+}
+
+# forge 산출물 컨트랙트 인덱스 설정 (산출물별 파싱 결과를 디스크에 보관)
+ARTIFACT_INDEX_CONFIG = {
+    'cache_max_bytes': 128 * 1024 * 1024,  # 인덱스 캐시 최대 크기 (초과 시 LRU 삭제)
+}
+
+# ITYfuzz 코퍼스 저장소 설정 (대상 런타임 바이트코드 해시별로 코퍼스를 보관하여 다음 캠페인 시작 코퍼스로 사용)
+CORPUS_CONFIG = {
+    'enabled': True,
+    'target_max_bytes': 32 * 1024 * 1024,  # 대상 하나에 보관할 최대 코퍼스 크기
+    'max_bytes': 1024 * 1024 * 1024,  # 전체 저장소 최대 크기 (초과 시 오래된 대상부터 삭제)
+}
+
+# Foundry 프로젝트 분석 대상 탐색 설정 (프로젝트 루트 기준 glob 패턴)
+PROJECT_CONFIG = {
+    'include': ['src/**/*.sol', 'script/**/*.sol'],
+    'exclude': ['lib/**', 'out/**', 'cache/**', 'broadcast/**', 'node_modules/**'],
+}
+
+# Solidity import 그래프 설정 (analyze --since의 변경 영향 범위 계산)
+IMPORT_GRAPH_CONFIG = {
+    'dirs': ('src', 'lib', 'script', 'test'),  # 그래프에 포함할 소스 디렉토리
+    'cache_max_bytes': 64 * 1024 * 1024,  # 파일별 import 파싱 캐시 최대 크기 (초과 시 LRU 삭제)
+    'full_on': ('foundry.toml', 'remappings.txt'),  # 변경되면 전체 분석으로 전환하는 설정 파일
+}
+
+# 실행 기록 저장소 설정 (SQLite)
+STORE_CONFIG = {
+    'path': None,  # 저장소 파일 경로 (None: $CHAINHAWK_STORE 또는 ~/.local/share/chainhawk/history.sqlite3)
+    'batch_size': 20000,  # 결과를 모아 한 트랜잭션으로 기록할 건수
+}
+
 # ITYfuzz 설정
 ITYFUZZ_CONFIG = {
+    'mode': 'setup',  # 실행 모드: setup(배포 스크립트 대상) 또는 onchain(Anvil에 배포된 주소 대상)
     'chain_id': 31337,
-    'port': 8545,
     'iterations': 500,
-    'timeout': 120,
+    'timeout': 300,  # 대상 하나의 퍼징 시간(초), --budget을 지정하면 스케줄러가 대상별 시간을 배분
     'accounts': 10,
     'balance': 10000,
-    'mnemonic': 'test test test test test test test test test test test junk'
+    'mnemonic': 'test test test test test test test test test test test junk',
+    'workers': 1,  # 동시에 실행할 ITYfuzz 인스턴스 수 (--workers)
+    'seed': None,  # 캠페인 기본 시드 (None이면 무작위, 워커 i는 seed + i)
+    'sync_interval': 60,  # 워커 간 코퍼스 병합 주기(초)
+    'corpus_dir': 'corpus',  # 작업 디렉토리 안의 코퍼스 디렉토리
+    'solutions_dir': 'vulnerabilities',  # 작업 디렉토리 안의 버그 보고서 디렉토리
+}
+
+# 외부 도구 실행기 설정 (자원 종류별 동시 실행 수, None이면 호스트 코어 수)
+PROCESS_CONFIG = {
+    'limits': {
+        'fuzz': None,  # 퍼저 워커 (CPU 집약)
+        'scan': None,  # Semgrep 샤드
+        'compile': 2,  # forge build
+        'prove': None,  # Halmos 함수별 심볼릭 실행 (CPU/메모리 집약)
+        'probe': 8,  # --version 확인 등 가벼운 호출
+    },
+    'threads': 64,  # 블로킹 작업(컨테이너 실행)용 스레드 수
+    'kill_grace': 5,  # 제한 시간 초과 시 SIGTERM 후 SIGKILL까지 대기 시간(초)
+    'compile_timeout': 600,  # 호스트 forge build 제한 시간(초)
+    'probe_timeout': 20,  # validate 도구 확인 제한 시간(초)
+}
+
+# 다중 엔진 분석 DAG 설정 (--engine all)
+ORCHESTRATOR_CONFIG = {
+    'max_workers': 4,  # 동시에 실행할 수 있는 최대 단계 수 (--concurrency)
+}
+
+# Halmos 설정
+HALMOS_CONFIG = {
+    'prefixes': ('check_', 'prove_'),  # 검증할 속성 함수 이름 접두어
+    'solver_timeout': 60,  # 어설션 하나의 솔버 제한 시간(초, --solver-timeout)
+    'timeout': 600,  # 함수 하나의 전체 실행 제한 시간(초)
+    'build_dir': 'cache/halmos',  # 프로젝트 기준 Halmos 전용 빌드 디렉토리 (out/, 컴파일 캐시를 퍼저와 공유하지 않음)
+    'loop': 2,  # 루프 언롤링 횟수
+    'cache': True,  # 함수별 판정 캐시 사용 (바이트코드 해시 + 옵션 기준)
+    'cache_max_bytes': 64 * 1024 * 1024,  # 판정 캐시 최대 크기 (초과 시 LRU 삭제)
+}
+
+# 여러 대상 퍼징 시간 스케줄러 설정 (--budget)
+ITYFUZZ_SCHEDULER_CONFIG = {
+    'slice': 60,  # 대상에 한 번에 배분하는 시간(초)
+    'min_slice': 15,  # 남은 예산이 이보다 짧으면 더 이상 구간을 시작하지 않음
+    'plateau_slices': 2,  # 커버리지 증가가 없는 구간이 연속으로 이만큼이면 정체로 판단
+    'min_gain': 0.5,  # 구간당 최소 커버리지 증가량 (백분율 포인트, 코퍼스 지표는 항목 수)
+}
+
+# Anvil 인스턴스 풀 설정 (인스턴스마다 고유 컨테이너 이름과 빈 포트를 사용)
+ANVIL_POOL_CONFIG = {
+    'size': 4,  # 동시에 실행할 수 있는 최대 인스턴스 수
+    'warm': 0,  # 미리 띄워 둘 예비 인스턴스 수
+    'reuse': False,  # 체인을 실행 간에 유지하고 반납·재연결 시 기준 스냅샷으로 되돌려(evm_revert) 재사용 (stop-chain으로 중지)
+    'load_state': None,  # 새 인스턴스마다 불러올 체인 상태 파일 (--dump-state로 저장한 파일)
+    'startup_timeout': 30,  # 체인 준비 대기 최대 시간(초)
 }
 
 # Anvil 기본 계정들 (고정된 니모닉에서 생성)
@@ -0,0 +1,91 @@
+# incremental.py
+# git 변경 기반 증분 분석: 기준 ref 이후 바뀐 파일과 이를 import하는 파일만 분석하고, 영향이 없는 결과는 실행 기록의 이전 실행에서 이어받음
+
+import os
+from .config import IMPORT_GRAPH_CONFIG, PROCESS_CONFIG
+from .infrastructure.process_runner import get_runner
+from .project import build_import_graph
+from .result.store import FindingStore
+
+def _git(project_dir, args):
+    result = get_runner().run_command(['git'] + args, cwd=project_dir, timeout=PROCESS_CONFIG['probe_timeout'])
+    if result.returncode != 0:
+        raise RuntimeError(f"git {' '.join(args)} 실패: {result.stderr.strip()}")
+    return [line.strip() for line in result.stdout.splitlines() if line.strip()]
+
+def changed_files(project_dir, since):
+    """
+    기준 ref 이후 바뀐 파일 목록 (커밋되지 않은 변경과 추적하지 않는 새 파일 포함, 프로젝트 기준 상대 경로)
+    """
+    changed = _git(project_dir, ['diff', '--name-only', '--relative', since, '--', '.'])
+    changed += _git(project_dir, ['ls-files', '--others', '--exclude-standard', '--', '.'])
+    return sorted(set(changed))
+
+class ChangeScope:
+    """
+    증분 분석 범위: 바뀐 파일, 이를 직접·간접적으로 import하는 파일, 그 파일들에 선언된 컨트랙트
+    """
+
+    def __init__(self, since, changed, files, contracts, deployable):
+        self.since = since
+        self.changed = changed  # git이 보고한 변경 경로 (삭제된 파일 포함)
+        self.files = files  # 분석 대상 파일 집합
+        self.contracts = contracts  # 영향을 받는 컨트랙트 이름 집합 (인터페이스 제외)
+        self.deployable = deployable  # 그중 src/의 배포 가능한 컨트랙트 (abstract/library 제외)
+
+    def filter_targets(self, targets):
+        """
+        Semgrep 대상 파일 목록에서 영향 범위에 든 파일만 남깁니다.
+        """
+        return [target for target in targets if target in self.files]
+
+    def affects(self, finding):
+        """
+        이전 실행의 결과가 이번 분석 범위에 드는지 (파일 또는 컨트랙트 기준)
+        """
+        return (finding.file in self.files if finding.file else False) or finding.contract in self.contracts
+
+    def summary(self):
+        return (f"{self.since} 이후 변경 {len(self.changed)}개, 영향 범위 파일 {len(self.files)}개, "
+                f"컨트랙트 {len(self.contracts)}개")
+
+def incremental_scope(project_dir, since, debug=False):
+    """
+    기준 ref 이후의 변경 영향 범위를 계산합니다.
+
+    Returns:
+        ChangeScope, 설정 파일(foundry.toml, remappings.txt)이 바뀌었으면 None (전체 분석)
+    """
+    project_dir = os.path.abspath(project_dir)
+    changed = changed_files(project_dir, since)
+    full_on = [path for path in changed if path in IMPORT_GRAPH_CONFIG['full_on']]
+    if full_on:
+        print(f"[정보] 설정 파일이 변경되어 전체 분석합니다: {', '.join(full_on)}")
+        return None
+
+    graph = build_import_graph(project_dir)
+    seeds = set()
+    for path in changed:
+        if path in graph.imports:
+            seeds.add(path)
+        elif os.path.isdir(os.path.join(project_dir, path)):
+            # 서브모듈(lib/의존성) 갱신은 디렉토리 경로로 보고되므로 하위 파일 전체를 변경으로 취급
+            prefix = path.rstrip('/') + '/'
+            seeds.update(rel_path for rel_path in graph.imports if rel_path.startswith(prefix))
+    files = graph.dependents(seeds) | set(changed)
+    scope = ChangeScope(
+        since, changed, files,
+        graph.contracts(files, kinds=('contract', 'abstract', 'library')),
+        graph.contracts((path for path in files if path.startswith('src/')), kinds=('contract',)),
+    )
+    if debug:
+        print(f"[디버그] 변경 파일: {changed}")
+        print(f"[디버그] 영향 범위 파일: {sorted(files)}")
+    return scope
+
+def carry_forward(project_dir, scope, engines):
+    """
+    엔진별 직전 완료 실행(실행 기록 저장소) 결과 중 이번 분석 범위 밖(영향을 받지 않은 파일·컨트랙트)의 결과를 반환합니다.
+    """
+    with FindingStore() as store:
+        return [finding for finding in store.latest_findings(project_dir, engines) if not scope.affects(finding)]
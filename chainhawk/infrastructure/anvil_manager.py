@@ -3,3 +3,486 @@ Anvil 블록체인 관리자
 로컬 테스트 체인 시작/중지 및 상태 관리
 """
 
+import atexit
+import fcntl
+import glob
+import json
+import os
+import socket
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from ..cache import cache_dir, sha256_text
+from ..config import DOCKER_CONFIG, ITYFUZZ_CONFIG, ANVIL_POOL_CONFIG
+from .docker_manager import container_running, ensure_image, get_container, image_name, remove_container, start_container
+from .rpc_client import close_rpc_client, get_rpc_client
+
+def find_free_port():
+    """
+    호스트에서 사용 가능한 TCP 포트를 찾습니다.
+    """
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+class AnvilInstance:
+    """
+    고유한 컨테이너 이름과 포트를 가진 Anvil 체인 하나
+    """
+
+    def __init__(self, name, port, container=None):
+        self.name = name
+        self.port = port
+        self.container = container
+        # 기준 상태 스냅샷 ID (반납 시 이 상태로 되돌림)
+        self.snapshot_id = None
+        # 불러온 상태 파일에 기록된 배포 정보 {컨트랙트 이름: 주소}
+        self.deployments = {}
+        # 실행 간에 유지되는 슬롯 체인이면 {'slot', 'config', 'load_state'} (reuse 모드)
+        self.persistent = None
+        self._slot_lock = None
+
+    @property
+    def rpc_url(self):
+        return f'http://localhost:{self.port}'
+
+    @property
+    def rpc(self):
+        """
+        이 체인의 공유 JSON-RPC 클라이언트
+        """
+        return get_rpc_client(self.rpc_url)
+
+    def __repr__(self):
+        return f'AnvilInstance({self.name}, {self.rpc_url})'
+
+def wait_until_ready(instance, debug=False):
+    """
+    Anvil RPC가 응답할 때까지 짧은 간격에서 시작해 점점 늘어나는 간격으로 대기합니다.
+    """
+    try:
+        return instance.rpc.wait_until_ready(ANVIL_POOL_CONFIG['startup_timeout'], debug)
+    except RuntimeError:
+        raise RuntimeError(f"Anvil 시작 타임아웃: {instance.name}")
+
+def take_snapshot(instance):
+    """
+    현재 체인 상태를 기준 상태로 스냅샷합니다. (evm_snapshot)
+    """
+    instance.snapshot_id = instance.rpc.call("evm_snapshot")
+    return instance.snapshot_id
+
+def revert_to_snapshot(instance):
+    """
+    체인을 기준 상태 스냅샷으로 되돌립니다. (evm_revert)
+    되돌린 스냅샷은 소모되므로 같은 상태에서 새 스냅샷을 다시 찍어 둡니다.
+    """
+    if instance.snapshot_id is None or not instance.rpc.call("evm_revert", [instance.snapshot_id]):
+        raise RuntimeError(f"스냅샷으로 되돌리기 실패: {instance.name}")
+    return take_snapshot(instance)
+
+def dump_chain_state(instance, path, deployments=None):
+    """
+    체인 상태(anvil_dumpState)와 배포 정보를 파일로 저장합니다.
+    """
+    state = instance.rpc.call("anvil_dumpState", timeout=60)
+    with open(path, 'w') as f:
+        json.dump({"state": state, "deployments": deployments or {}}, f)
+    print(f"[정보] 체인 상태를 저장했습니다: {path}")
+
+def load_chain_state(instance, path):
+    """
+    저장된 체인 상태를 불러옵니다. (anvil_loadState, 재배포 없이 즉시 복원)
+
+    Returns:
+        상태 파일에 기록된 배포 정보 {컨트랙트 이름: 주소}
+    """
+    try:
+        with open(path, 'r') as f:
+            saved = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        raise RuntimeError(f"체인 상태 파일을 읽을 수 없습니다: {path} ({e})")
+    if not instance.rpc.call("anvil_loadState", [saved["state"]], timeout=60):
+        raise RuntimeError(f"체인 상태 불러오기 실패: {path}")
+    instance.deployments = dict(saved.get("deployments", {}))
+    return instance.deployments
+
+def build_anvil_args(port):
+    return [
+        'anvil',
+        '--host', '0.0.0.0',
+        '--port', str(port),
+        '--chain-id', str(ITYFUZZ_CONFIG['chain_id']),
+        '--accounts', str(ITYFUZZ_CONFIG['accounts']),
+        '--balance', str(ITYFUZZ_CONFIG['balance']),
+        '--gas-limit', '30000000',
+        '--gas-price', '1',
+        '--mnemonic', ITYFUZZ_CONFIG['mnemonic']
+    ]
+
+def start_anvil_instance(debug=False, load_state=None, name=None):
+    """
+    고유 이름(name을 지정하면 그 이름)과 빈 포트로 Anvil 컨테이너를 시작하고 준비될 때까지 대기합니다.
+    load_state가 주어지면 저장된 체인 상태를 불러온 뒤, 그 상태를 기준 스냅샷으로 찍어 둡니다.
+    """
+    ensure_image('anvil', debug)
+    for attempt in range(3):
+        instance = AnvilInstance(name or f"{DOCKER_CONFIG['anvil']['tag']}-{uuid.uuid4().hex[:8]}", find_free_port())
+        anvil_args = build_anvil_args(instance.port)
+        if debug:
+            print(f"[디버그] Anvil 시작 명령어: {' '.join(anvil_args)}")
+
+        try:
+            instance.container = start_container(image_name('anvil'), anvil_args, name=instance.name, network='host', debug=debug)
+        except RuntimeError as e:
+            if debug:
+                print(f"[디버그] Anvil 시작 오류: {e}")
+            raise RuntimeError(f"Anvil 시작 실패: {e}")
+
+        try:
+            wait_until_ready(instance, debug)
+        except RuntimeError:
+            # 포트를 찾은 뒤 다른 프로세스가 먼저 점유한 경우 등: 새 포트로 재시도
+            stop_anvil_instance(instance)
+            if attempt == 2:
+                raise
+            continue
+
+        try:
+            if load_state:
+                load_chain_state(instance, load_state)
+            take_snapshot(instance)
+        except RuntimeError:
+            stop_anvil_instance(instance)
+            raise
+
+        print(f"[성공] Anvil이 포트 {instance.port}에서 실행 중입니다. ({instance.name})")
+        return instance
+
+def stop_anvil_instance(instance):
+    """
+    Anvil 컨테이너를 중지하고 삭제합니다.
+    """
+    remove_container(instance.container or instance.name)
+    instance.container = None
+    close_rpc_client(instance.rpc_url)
+
+def _slot_path(slot, suffix):
+    return os.path.join(cache_dir('anvil'), f'slot-{slot}.{suffix}')
+
+def _chain_config():
+    """
+    체인 설정 해시 (설정이 바뀌면 유지 중인 슬롯 체인을 다시 시작)
+    """
+    return sha256_text(image_name('anvil'), *build_anvil_args(0))
+
+def _state_stamp(load_state):
+    if not load_state:
+        return None
+    path = os.path.abspath(load_state)
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return [path]
+    return [path, stat.st_mtime_ns, stat.st_size]
+
+def lock_persistent_slot(size):
+    """
+    0..size-1 슬롯 중 다른 프로세스가 쓰고 있지 않은 슬롯의 파일 잠금을 잡습니다.
+
+    Returns:
+        (슬롯 번호, 잠금 파일) 또는 모든 슬롯이 사용 중이면 (None, None)
+    """
+    for slot in range(size):
+        lock = open(_slot_path(slot, 'lock'), 'a')
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock.close()
+            continue
+        return slot, lock
+    return None, None
+
+def save_persistent_slot(instance):
+    """
+    슬롯 체인의 포트와 기준 스냅샷 ID를 기록합니다. (다음 실행에서 다시 연결)
+    """
+    record = dict(instance.persistent, name=instance.name, port=instance.port,
+                  snapshot_id=instance.snapshot_id, deployments=instance.deployments)
+    path = _slot_path(record['slot'], 'json')
+    with open(path + '.tmp', 'w') as f:
+        json.dump(record, f)
+    os.replace(path + '.tmp', path)
+
+def _read_persistent_slot(slot):
+    try:
+        with open(_slot_path(slot, 'json'), 'r') as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+
+def attach_persistent_instance(slot, debug=False, load_state=None):
+    """
+    실행 간에 유지되는 슬롯 체인에 연결합니다. (호출 전에 lock_persistent_slot으로 슬롯을 잠가야 함)
+    기록된 컨테이너가 같은 설정으로 실행 중이면 저장된 스냅샷으로 되돌려 재사용하고,
+    아니면 같은 이름으로 새로 시작합니다. 체인은 stop-chain 명령으로 중지할 때까지 유지됩니다.
+    """
+    name = f"{DOCKER_CONFIG['anvil']['tag']}-persistent-{slot}"
+    persistent = {'slot': slot, 'config': _chain_config(), 'load_state': _state_stamp(load_state)}
+    record = _read_persistent_slot(slot)
+    if record and all(record.get(key) == value for key, value in persistent.items()) and record.get('name') == name:
+        container = get_container(name)
+        if container is not None and container_running(container):
+            instance = AnvilInstance(name, record['port'], container)
+            instance.snapshot_id = record.get('snapshot_id')
+            instance.deployments = dict(record.get('deployments') or {})
+            instance.persistent = persistent
+            try:
+                wait_until_ready(instance, debug)
+                revert_to_snapshot(instance)
+            except RuntimeError as e:
+                print(f"[경고] 유지 중인 Anvil 체인을 재사용할 수 없어 다시 시작합니다: {e}")
+                close_rpc_client(instance.rpc_url)
+            else:
+                save_persistent_slot(instance)
+                print(f"[정보] 유지 중인 Anvil 체인에 연결했습니다: {instance.name} (포트 {instance.port})")
+                return instance
+
+    remove_container(name)
+    instance = start_anvil_instance(debug, load_state, name=name)
+    instance.persistent = persistent
+    save_persistent_slot(instance)
+    return instance
+
+def stop_persistent_chains():
+    """
+    실행 간에 유지되는 모든 슬롯 체인을 중지하고 기록을 삭제합니다.
+
+    Returns:
+        중지한 체인 수
+    """
+    stopped = 0
+    for path in glob.glob(os.path.join(cache_dir('anvil'), 'slot-*.json')):
+        try:
+            with open(path, 'r') as f:
+                record = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            record = {}
+        if record.get('name') and get_container(record['name']) is not None:
+            remove_container(record['name'])
+            stopped += 1
+        os.remove(path)
+    return stopped
+
+class AnvilPool:
+    """
+    Anvil 인스턴스 풀
+    작업마다 인스턴스를 임대(lease)하고 작업이 끝나면 반납받습니다. 최대 size개까지 동시에 실행하며,
+    warm개의 인스턴스를 미리 띄워 두어 임대 시 체인 시작 대기 시간을 없앱니다.
+    반납된 인스턴스는 reuse 모드이면 기준 스냅샷으로 되돌려(evm_revert) 다음 작업에 재사용하고,
+    아니면 정리한 뒤 필요하면 새 인스턴스로 보충합니다.
+    reuse 모드의 인스턴스는 파일 잠금으로 나눠 쓰는 슬롯 체인이라 풀을 닫아도 중지하지 않고,
+    다음 실행에서 저장된 스냅샷으로 되돌려 다시 씁니다. (stop_persistent_chains로 중지)
+    """
+
+    def __init__(self, size=None, warm=None, reuse=None, load_state=None, debug=False):
+        self.size = size or ANVIL_POOL_CONFIG['size']
+        self.warm = min(self.size, ANVIL_POOL_CONFIG['warm'] if warm is None else warm)
+        self.reuse = ANVIL_POOL_CONFIG['reuse'] if reuse is None else reuse
+        self.load_state = load_state or ANVIL_POOL_CONFIG['load_state']
+        self.debug = debug
+        self._idle = []
+        self._leased = set()
+        self._starting = 0
+        self._closed = False
+        self._cond = threading.Condition()
+
+    def _total(self):
+        return len(self._idle) + len(self._leased) + self._starting
+
+    def prestart(self):
+        """
+        warm 개수만큼 인스턴스를 미리 시작합니다.
+        """
+        with self._cond:
+            needed = max(0, self.warm - len(self._idle) - self._starting)
+            needed = min(needed, self.size - self._total())
+            self._starting += needed
+        threads = [threading.Thread(target=self._start_idle, daemon=True) for _ in range(needed)]
+        for thread in threads:
+            thread.start()
+        return threads
+
+    def _start(self):
+        """
+        새 인스턴스를 시작합니다. reuse 모드이면 비어 있는 슬롯 체인에 연결합니다.
+        """
+        if self.reuse:
+            slot, lock = lock_persistent_slot(self.size)
+            if slot is not None:
+                try:
+                    instance = attach_persistent_instance(slot, self.debug, self.load_state)
+                except BaseException:
+                    lock.close()
+                    raise
+                instance._slot_lock = lock
+                return instance
+            print("[경고] 모든 Anvil 슬롯 체인이 다른 실행에서 사용 중이라 임시 체인을 시작합니다.")
+        return start_anvil_instance(self.debug, self.load_state)
+
+    def _stop(self, instance):
+        """
+        인스턴스를 정리합니다. 슬롯 체인은 컨테이너를 남겨 두고 기록과 잠금만 정리합니다.
+        """
+        if instance.persistent is None:
+            stop_anvil_instance(instance)
+            return
+        if instance.container is not None:
+            save_persistent_slot(instance)
+        else:
+            try:
+                os.remove(_slot_path(instance.persistent['slot'], 'json'))
+            except OSError:
+                pass
+        close_rpc_client(instance.rpc_url)
+        if instance._slot_lock is not None:
+            instance._slot_lock.close()
+            instance._slot_lock = None
+
+    def _start_idle(self):
+        try:
+            instance = self._start()
+        except RuntimeError as e:
+            print(f"[경고] 예비 Anvil 인스턴스 시작 실패: {e}")
+            instance = None
+        with self._cond:
+            self._starting -= 1
+            if instance is not None:
+                if self._closed:
+                    self._stop(instance)
+                else:
+                    self._idle.append(instance)
+            self._cond.notify_all()
+
+    def acquire(self, timeout=None):
+        """
+        인스턴스를 임대합니다. 대기 중인 인스턴스가 없고 풀에 여유가 있으면 새로 시작합니다.
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise RuntimeError("Anvil 풀이 이미 종료되었습니다.")
+                if self._idle:
+                    instance = self._idle.pop()
+                    self._leased.add(instance)
+                    break
+                if self._total() < self.size:
+                    self._starting += 1
+                    instance = None
+                    break
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    raise RuntimeError("사용 가능한 Anvil 인스턴스가 없습니다. (임대 대기 시간 초과)")
+                self._cond.wait(remaining)
+
+        if instance is None:
+            try:
+                instance = self._start()
+            finally:
+                with self._cond:
+                    self._starting -= 1
+                    self._cond.notify_all()
+            with self._cond:
+                self._leased.add(instance)
+
+        if self.debug:
+            print(f"[디버그] Anvil 임대: {instance}")
+        # 다음 임대를 위해 예비 인스턴스 보충
+        self.prestart()
+        return instance
+
+    def release(self, instance):
+        """
+        임대한 인스턴스를 반납합니다.
+        reuse 모드에서는 기준 스냅샷으로 되돌려 대기 목록에 넣고, 아니면 정리한 뒤 예비 인스턴스를 보충합니다.
+        """
+        with self._cond:
+            self._leased.discard(instance)
+        reused = False
+        if self.reuse and not self._closed:
+            try:
+                revert_to_snapshot(instance)
+                if instance.persistent is not None:
+                    save_persistent_slot(instance)
+                reused = True
+            except (RuntimeError, OSError) as e:
+                print(f"[경고] Anvil 스냅샷 복원 실패, 인스턴스를 정리합니다: {e}")
+        if not reused:
+            if instance.persistent is not None:
+                # 복원에 실패한 슬롯 체인은 다음 실행에서 다시 시작하도록 컨테이너까지 정리
+                stop_anvil_instance(instance)
+            self._stop(instance)
+        if self.debug:
+            print(f"[디버그] Anvil 반납{' (스냅샷 복원)' if reused else ''}: {instance}")
+        with self._cond:
+            if reused:
+                if self._closed:
+                    self._stop(instance)
+                else:
+                    self._idle.append(instance)
+            self._cond.notify_all()
+        if not self._closed:
+            self.prestart()
+
+    @contextmanager
+    def lease(self, timeout=None):
+        """
+        with 문으로 인스턴스를 임대하고 작업이 끝나면 자동으로 반납합니다.
+        """
+        instance = self.acquire(timeout)
+        try:
+            yield instance
+        finally:
+            self.release(instance)
+
+    def close(self):
+        """
+        풀의 모든 인스턴스를 정리합니다.
+        """
+        with self._cond:
+            self._closed = True
+            instances = self._idle + list(self._leased)
+            self._idle = []
+            self._leased = set()
+            self._cond.notify_all()
+        for instance in instances:
+            self._stop(instance)
+        return sum(1 for instance in instances if instance.persistent is None)
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_anvil_pool(debug=False, reuse=None, load_state=None):
+    """
+    프로세스에서 공유하는 기본 Anvil 풀을 반환합니다. (풀 옵션은 처음 만들 때만 적용)
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = AnvilPool(reuse=reuse, load_state=load_state, debug=debug)
+            _pool.prestart()
+        return _pool
+
+def close_anvil_pool():
+    """
+    기본 Anvil 풀을 정리합니다. (프로세스 종료 시 자동 호출)
+    """
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None and pool.close():
+        print("[정보] Anvil 블록체인이 중지되었습니다.")
+
+atexit.register(close_anvil_pool)
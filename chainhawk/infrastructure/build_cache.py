@@ -0,0 +1,216 @@
+"""
+Forge 빌드 캐시
+소스(src/, lib/ 등)·foundry.toml·solc 버전·툴체인(forge 버전, 설치된 solc, 빌드 위치) 해시를 키로 out/, cache/ 산출물을 보관하고 재사용
+"""
+
+import os
+import re
+import shutil
+import time
+import uuid
+from ..cache import cache_dir, sha256_file, sha256_text
+from ..config import FORGE_CACHE_CONFIG
+
+# 키 계산에 포함하는 소스 디렉토리 (forge build가 컴파일하는 범위)
+SOURCE_DIRS = ('src', 'lib', 'script', 'test')
+# 키 계산에 포함하는 설정 파일
+CONFIG_FILES = ('foundry.toml', 'remappings.txt')
+# 캐시에 보관하는 빌드 산출물 디렉토리
+BUILD_DIRS = ('out', 'cache')
+# 프로젝트 out/에 복원된 산출물의 키를 기록하는 파일
+KEY_MARKER = '.chainhawk-build-key'
+# forge가 빌드할 때마다 갱신하는 파일 (복원 이후 외부에서 다시 빌드되었는지 판별)
+FORGE_FILES_CACHE = os.path.join('cache', 'solidity-files-cache.json')
+
+# 빌드 위치(호스트/컨테이너)에서 실행해 툴체인을 식별하는 명령
+# forge 버전과 설치된 solc 목록(svm): solc를 고정하지 않으면 pragma에 맞는 설치 버전 중에서 자동 선택되므로 목록 전체가 키에 들어감
+TOOLCHAIN_PROBE = ['sh', '-c', 'forge --version && ls -1 "${SVM_HOME:-$HOME/.svm}" 2>/dev/null; true']
+
+_SOLC_SETTING = re.compile(r'''^\s*solc(?:_version)?\s*=\s*["']?([^"'\s#]+)''', re.MULTILINE)
+
+def solc_setting(project_dir):
+    """
+    foundry.toml에 고정된 solc 버전을 반환합니다. (지정하지 않았으면 'auto': pragma로 자동 선택)
+    """
+    try:
+        with open(os.path.join(project_dir, 'foundry.toml'), 'r', encoding='utf-8') as f:
+            match = _SOLC_SETTING.search(f.read())
+    except OSError:
+        return 'auto'
+    return match.group(1) if match else 'auto'
+
+def iter_source_files(project_dir):
+    """
+    키 계산 대상 파일의 프로젝트 기준 상대 경로를 정렬된 순서로 반환합니다.
+    """
+    files = [name for name in CONFIG_FILES if os.path.isfile(os.path.join(project_dir, name))]
+    for source_dir in SOURCE_DIRS:
+        root = os.path.join(project_dir, source_dir)
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames[:] = sorted(d for d in dirnames if d != '.git')
+            for filename in filenames:
+                if filename.endswith('.sol'):
+                    files.append(os.path.relpath(os.path.join(dirpath, filename), project_dir).replace(os.sep, '/'))
+    return sorted(files)
+
+def source_digest(project_dir):
+    """
+    소스 파일 경로·내용 해시와 solc 버전 설정의 해시를 계산합니다.
+    """
+    parts = [f"solc={solc_setting(project_dir)}"]
+    for rel_path in iter_source_files(project_dir):
+        parts.append(f"{rel_path}={sha256_file(os.path.join(project_dir, rel_path))}")
+    return sha256_text(*parts)
+
+def build_key(project_dir, toolchain, sources=None):
+    """
+    빌드 캐시 키를 계산합니다. (소스 해시 + 툴체인 식별 문자열)
+
+    Args:
+        toolchain: 빌드 위치와 그 위치의 TOOLCHAIN_PROBE 출력 (예: "host\nforge 0.2.0 (...)\n0.8.24")
+        sources: 이미 계산한 source_digest 결과 (생략하면 계산)
+    """
+    return sha256_text(sources or source_digest(project_dir), toolchain)
+
+def _entry_dir(key):
+    return os.path.join(cache_dir('forge'), key)
+
+def _dir_size(path):
+    total = 0
+    for dirpath, _, filenames in os.walk(path):
+        for filename in filenames:
+            try:
+                total += os.path.getsize(os.path.join(dirpath, filename))
+            except OSError:
+                pass
+    return total
+
+def _build_stamp(project_dir, key):
+    try:
+        mtime = os.stat(os.path.join(project_dir, FORGE_FILES_CACHE)).st_mtime_ns
+    except OSError:
+        mtime = 0
+    return f"{key}:{mtime}"
+
+def _read_marker(project_dir):
+    try:
+        with open(os.path.join(project_dir, 'out', KEY_MARKER), 'r') as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+def _write_marker(project_dir, key):
+    out_dir = os.path.join(project_dir, 'out')
+    if os.path.isdir(out_dir):
+        with open(os.path.join(out_dir, KEY_MARKER), 'w') as f:
+            f.write(_build_stamp(project_dir, key))
+
+def restore_build(project_dir, key):
+    """
+    캐시된 산출물을 프로젝트의 out/, cache/로 복원합니다.
+
+    Returns:
+        캐시 적중 여부
+    """
+    entry = _entry_dir(key)
+    if not os.path.isdir(entry):
+        return False
+    # 이미 같은 산출물이 복원되어 있고 그 뒤로 다시 빌드되지 않았으면 복사 생략
+    if _read_marker(project_dir) != _build_stamp(project_dir, key):
+        for name in BUILD_DIRS:
+            cached = os.path.join(entry, name)
+            target = os.path.join(project_dir, name)
+            if not os.path.isdir(cached):
+                continue
+            shutil.rmtree(target, ignore_errors=True)
+            shutil.copytree(cached, target)
+        _write_marker(project_dir, key)
+    # LRU 삭제 기준이 되는 마지막 사용 시각 갱신
+    os.utime(entry)
+    return True
+
+def store_build(project_dir, key):
+    """
+    프로젝트의 out/, cache/를 캐시에 저장한 뒤 용량 제한을 적용합니다.
+    """
+    entry = _entry_dir(key)
+    if os.path.isdir(entry):
+        return
+    # 다른 프로세스와 동시에 저장해도 완성된 항목만 보이도록 임시 디렉토리에 복사한 뒤 이름 변경
+    staging = f"{entry}.tmp-{uuid.uuid4().hex[:8]}"
+    try:
+        for name in BUILD_DIRS:
+            source = os.path.join(project_dir, name)
+            if os.path.isdir(source):
+                shutil.copytree(source, os.path.join(staging, name), ignore=shutil.ignore_patterns(KEY_MARKER))
+        os.replace(staging, entry)
+    except OSError:
+        shutil.rmtree(staging, ignore_errors=True)
+        if not os.path.isdir(entry):
+            raise
+    _write_marker(project_dir, key)
+    evict_builds()
+
+def evict_builds(max_bytes=None):
+    """
+    전체 크기가 max_bytes를 넘으면 가장 오래 사용되지 않은 산출물 세트부터 삭제합니다.
+
+    Returns:
+        삭제한 세트 수
+    """
+    max_bytes = FORGE_CACHE_CONFIG['max_bytes'] if max_bytes is None else max_bytes
+    root = cache_dir('forge')
+    entries = []
+    for name in os.listdir(root):
+        path = os.path.join(root, name)
+        if os.path.isdir(path) and '.tmp-' not in name:
+            entries.append((os.path.getmtime(path), _dir_size(path), path))
+    total = sum(size for _, size, _ in entries)
+    removed = 0
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        shutil.rmtree(path, ignore_errors=True)
+        total -= size
+        removed += 1
+    return removed
+
+def ensure_build(project_dir, build, toolchain, use_cache=None, debug=False):
+    """
+    빌드 캐시에 적중하면 산출물을 복원하고 컴파일을 생략합니다. 미스이면 build(project_dir)로 컴파일한 뒤 저장합니다.
+    키에 빌드 위치와 그 위치의 forge·solc 버전이 들어가므로 호스트와 컨테이너의 산출물은 서로 섞이지 않습니다.
+
+    Args:
+        build: 캐시 미스 시 컴파일을 수행하는 함수 (project_dir를 인자로 받음)
+        toolchain: 빌드 위치의 툴체인 식별 문자열을 반환하는 함수 (project_dir를 인자로 받음)
+
+    Returns:
+        캐시 적중 여부
+    """
+    use_cache = FORGE_CACHE_CONFIG['enabled'] if use_cache is None else use_cache
+    if not use_cache:
+        build(project_dir)
+        return False
+
+    started = time.monotonic()
+    try:
+        tools = toolchain(project_dir)
+    except (RuntimeError, OSError) as e:
+        print(f"[경고] 툴체인 버전을 확인할 수 없어 컴파일 캐시를 사용하지 않습니다: {e}")
+        build(project_dir)
+        return False
+    sources = source_digest(project_dir)
+    key = build_key(project_dir, tools, sources)
+    if restore_build(project_dir, key):
+        print(f"[정보] 컴파일 캐시 적중: 컴파일을 생략합니다. (키 {key[:12]}, {time.monotonic() - started:.2f}초)")
+        return True
+
+    if debug:
+        print(f"[디버그] 컴파일 캐시 미스 (키 {key[:12]})")
+    build(project_dir)
+    try:
+        # 빌드 중 solc를 새로 내려받았으면 설치 목록이 바뀌므로 빌드 후 툴체인으로 키를 다시 계산
+        store_build(project_dir, build_key(project_dir, toolchain(project_dir), sources))
+    except (RuntimeError, OSError) as e:
+        print(f"[경고] 컴파일 산출물 캐시 저장 실패: {e}")
+    return False
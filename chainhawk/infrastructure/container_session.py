@@ -0,0 +1,203 @@
+"""
+분석기 컨테이너 세션 관리자
+엔진별 컨테이너를 한 번 띄워두고 docker exec로 재사용
+"""
+
+import atexit
+import threading
+import uuid
+from ..config import DOCKER_CONFIG, SESSION_CONFIG
+from .docker_manager import ExecProcess, container_running, exec_in_container, remove_container, start_container
+
+class ContainerSession:
+    """
+    분석기 이미지로 장기 실행 컨테이너를 하나 띄워두고 각 분석 단계를 docker exec로 실행합니다.
+    작업 공간은 바인드 마운트되며, 마지막 실행 후 idle_timeout초가 지나면 자동으로 정리됩니다.
+    """
+
+    def __init__(self, engine, volumes, workdir=None, network=None, idle_timeout=None, debug=False):
+        """
+        Args:
+            engine: DOCKER_CONFIG의 엔진 이름 (semgrep, ityfuzz)
+            volumes: [(호스트 경로, 컨테이너 경로, 모드)] 목록
+            workdir: 컨테이너 작업 디렉토리
+            network: 도커 네트워크 모드 (예: host)
+            idle_timeout: 유휴 상태 유지 시간(초), None이면 설정값 사용
+            debug: 디버그 모드
+        """
+        self.engine = engine
+        self.tag = DOCKER_CONFIG[engine]['tag']
+        self.volumes = tuple(volumes)
+        self.workdir = workdir
+        self.network = network
+        self.idle_timeout = SESSION_CONFIG['idle_timeout'] if idle_timeout is None else idle_timeout
+        self.debug = debug
+        self.name = f"{self.tag}-session-{uuid.uuid4().hex[:8]}"
+        self.container = None
+        self.started = False
+        self._lock = threading.Lock()
+        self._active = 0
+        self._idle_timer = None
+
+    def start(self):
+        """
+        컨테이너를 백그라운드로 시작합니다. 이미지의 ENTRYPOINT 대신 sleep으로 유지합니다.
+        """
+        self.container = start_container(
+            self.tag, ['infinity'],
+            name=self.name,
+            volumes=self.volumes,
+            workdir=self.workdir,
+            network=self.network,
+            entrypoint='sleep',
+            debug=self.debug,
+        )
+        self.started = True
+        if self.debug:
+            print(f"[디버그] 세션 컨테이너 시작됨: {self.name}")
+
+    def is_healthy(self):
+        """
+        컨테이너가 실행 중인지 확인합니다.
+        """
+        return self.started and container_running(self.container)
+
+    def ensure(self):
+        """
+        컨테이너가 없거나 비정상이면 다시 시작합니다.
+        """
+        with self._lock:
+            if self.is_healthy():
+                return
+            if self.started:
+                if self.debug:
+                    print(f"[디버그] 세션 컨테이너 비정상, 재시작: {self.name}")
+                self._remove()
+            self.start()
+
+    def exec(self, command, workdir=None, timeout=None, capture_output=True):
+        """
+        세션 컨테이너에서 명령어를 실행합니다.
+        timeout이 지정되면 컨테이너 내부의 timeout 명령으로 감싸 제한 시간 초과 시 내부 프로세스도 종료됩니다. (반환 코드 124)
+        """
+        # 유휴 타이머가 실행 도중 컨테이너를 정리하지 않도록 먼저 실행 중으로 표시
+        with self._lock:
+            self._active += 1
+            self._cancel_idle_timer()
+
+        cmd = []
+        if timeout:
+            cmd += ['timeout', '--signal=INT', '--kill-after=10', str(int(timeout))]
+        cmd += list(command)
+        if self.debug:
+            print(f"[디버그] 세션 실행 명령어 ({self.name}): {' '.join(cmd)}")
+
+        try:
+            self.ensure()
+            return exec_in_container(self.container, cmd, workdir=workdir or self.workdir, stream_output=not capture_output)
+        finally:
+            self._release()
+
+    def spawn(self, command, workdir=None, timeout=None):
+        """
+        세션 컨테이너에서 명령어를 시작하고 출력을 스트리밍하며 중지할 수 있는 ExecProcess를 반환합니다.
+        프로세스가 끝나(wait) 반환될 때까지 유휴 정리를 미룹니다.
+        """
+        with self._lock:
+            self._active += 1
+            self._cancel_idle_timer()
+        try:
+            self.ensure()
+            if self.debug:
+                print(f"[디버그] 세션 실행 명령어 ({self.name}): {' '.join(command)}")
+            return ExecProcess(self.container, command, workdir=workdir or self.workdir, timeout=timeout,
+                               on_exit=self._release)
+        except Exception:
+            self._release()
+            raise
+
+    def _release(self):
+        with self._lock:
+            self._active -= 1
+            if self._active == 0:
+                self._schedule_idle_stop()
+
+    def stop(self):
+        """
+        세션 컨테이너를 정리합니다.
+        """
+        with self._lock:
+            self._cancel_idle_timer()
+            if self.started:
+                self._remove()
+                if self.debug:
+                    print(f"[디버그] 세션 컨테이너 정리됨: {self.name}")
+
+    def _remove(self):
+        remove_container(self.container or self.name)
+        self.container = None
+        self.started = False
+
+    def _schedule_idle_stop(self):
+        if not self.idle_timeout:
+            return
+        self._idle_timer = threading.Timer(self.idle_timeout, self._idle_stop)
+        self._idle_timer.daemon = True
+        self._idle_timer.start()
+
+    def _cancel_idle_timer(self):
+        if self._idle_timer is not None:
+            self._idle_timer.cancel()
+            self._idle_timer = None
+
+    def _idle_stop(self):
+        with self._lock:
+            if self._active or not self.started:
+                return
+            self._idle_timer = None
+            self._remove()
+        if self.debug:
+            print(f"[디버그] 유휴 시간 초과로 세션 컨테이너 정리됨: {self.name}")
+
+    def __enter__(self):
+        self.ensure()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+def get_session(engine, volumes, workdir=None, network=None, debug=False):
+    """
+    엔진별 세션 컨테이너를 반환합니다. 마운트 구성이 달라지면 기존 세션을 정리하고 새로 만듭니다.
+    """
+    key = (tuple(volumes), workdir, network)
+    with _sessions_lock:
+        session = _sessions.get(engine)
+        if session is not None and (session.volumes, session.workdir, session.network) != key:
+            session.stop()
+            session = None
+        if session is None:
+            session = ContainerSession(engine, volumes, workdir, network, debug=debug)
+            _sessions[engine] = session
+    return session
+
+def sessions_enabled():
+    """
+    세션 컨테이너 재사용이 설정에서 활성화되어 있는지 확인합니다.
+    """
+    return SESSION_CONFIG['enabled']
+
+def close_sessions():
+    """
+    열려 있는 모든 세션 컨테이너를 정리합니다. (프로세스 종료 시 자동 호출)
+    """
+    with _sessions_lock:
+        sessions = list(_sessions.values())
+        _sessions.clear()
+    for session in sessions:
+        session.stop()
+
+atexit.register(close_sessions)
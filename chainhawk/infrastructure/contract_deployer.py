@@ -1 +1,338 @@
-# 컨트랙트 배포 
\ No newline at end of file
+"""
+컨트랙트 배포
+Foundry 프로젝트 컴파일 및 로컬 체인 배포
+생성 트랜잭션을 프로세스 안에서 서명하고 하나의 RPC 연결로 일괄 전송 (의존 순서 배포 계획 지원)
+"""
+
+import json
+from pathlib import Path
+from eth_abi import encode as abi_encode
+from eth_keys import keys
+from eth_utils import keccak
+import rlp
+from ..artifacts import get_artifact_index
+from ..config import ANVIL_ACCOUNTS, DEPLOY_CONFIG, PROCESS_CONFIG
+from .build_cache import TOOLCHAIN_PROBE
+from .docker_manager import TIMEOUT_RETURNCODE
+from .process_runner import get_runner
+from .rpc_client import get_rpc_client
+
+# 배포 계획에서 앞서 배포한 컨트랙트 주소를 참조하는 인자 접두사 (예: "@Token")
+REFERENCE_PREFIX = '@'
+
+def calculate_contract_address(sender, nonce):
+    """
+    CREATE opcode 규칙을 사용하여 컨트랙트 주소를 계산합니다.
+    """
+    sender_bytes = bytes.fromhex(sender[2:])  # 0x 제거
+    encoded = rlp.encode([sender_bytes, nonce])
+    hash_result = keccak(encoded)
+    return '0x' + hash_result[-20:].hex()
+
+def compile_project(foundry_project_dir, debug=False):
+    """
+    호스트에서 forge build로 Foundry 프로젝트를 컴파일합니다.
+    """
+    compile_cmd = ['forge', 'build']
+
+    if debug:
+        print(f"[디버그] 컴파일 명령어: {' '.join(compile_cmd)}")
+
+    compile_result = get_runner().run_command(
+        compile_cmd,
+        cwd=foundry_project_dir,
+        timeout=PROCESS_CONFIG['compile_timeout'],
+        resource='compile'
+    )
+
+    if compile_result.returncode == TIMEOUT_RETURNCODE:
+        raise RuntimeError(f"컨트랙트 컴파일 시간 초과 ({PROCESS_CONFIG['compile_timeout']}초)")
+    if compile_result.returncode != 0:
+        if debug:
+            print(f"[디버그] 컴파일 오류:")
+            print(f"stdout: {compile_result.stdout}")
+            print(f"stderr: {compile_result.stderr}")
+        raise RuntimeError(f"컨트랙트 컴파일 실패: {compile_result.stderr}")
+
+    if debug:
+        print(f"[디버그] 컴파일 성공!")
+
+def probe_toolchain(foundry_project_dir, debug=False):
+    """
+    호스트의 forge 버전과 설치된 solc 목록을 빌드 캐시 키용 문자열로 반환합니다.
+    """
+    result = get_runner().run_command(TOOLCHAIN_PROBE, cwd=foundry_project_dir,
+                                      timeout=PROCESS_CONFIG['probe_timeout'], resource='probe')
+    if result.returncode != 0 or not result.stdout.strip():
+        raise RuntimeError(f"forge 버전 확인 실패: {result.stderr.strip()}")
+    if debug:
+        print(f"[디버그] 호스트 툴체인: {' / '.join(result.stdout.split())}")
+    return f"host\n{result.stdout.strip()}"
+
+def _find_contract(index, contract_name=None):
+    """
+    배포할 컨트랙트의 인덱스 항목을 찾습니다. (이름이 없으면 src/의 배포 가능한 첫 번째 컨트랙트)
+    """
+    if contract_name:
+        return index.require(contract_name)
+    entry = index.default_contract()
+    if entry is None:
+        raise RuntimeError(f"src 디렉토리에서 배포 가능한 컨트랙트를 찾을 수 없습니다: {index.project_dir}")
+    return entry
+
+def load_deployment_plan(plan_path):
+    """
+    배포 계획 JSON 파일을 읽습니다.
+
+    파일 형식 (목록 또는 {"contracts": 목록}):
+        [
+            "Token",
+            {"name": "Vault", "args": ["@Token", 1000]},
+            {"name": "Router", "contract": "UniswapRouter", "args": ["@Vault"], "value": 0}
+        ]
+        name: 배포 이름 (다른 항목에서 "@이름"으로 주소 참조), contract: 아티팩트 컨트랙트 이름 (기본값 name),
+        args: 생성자 인자, value: 함께 보낼 wei
+    """
+    try:
+        with open(plan_path, 'r') as f:
+            data = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        raise RuntimeError(f"배포 계획 파일을 읽을 수 없습니다: {plan_path} ({e})")
+    entries = data.get('contracts', []) if isinstance(data, dict) else data
+    return [normalize_plan_entry(entry) for entry in entries]
+
+def normalize_plan_entry(entry):
+    """
+    배포 계획 항목을 {'name', 'contract', 'args', 'value'} 형식으로 맞춥니다.
+    """
+    if isinstance(entry, str):
+        entry = {'name': entry}
+    if not isinstance(entry, dict) or not entry.get('name'):
+        raise RuntimeError(f"잘못된 배포 계획 항목입니다: {entry}")
+    return {
+        'name': entry['name'],
+        'contract': entry.get('contract') or entry['name'],
+        'args': list(entry.get('args') or []),
+        'value': int(entry.get('value') or 0),
+    }
+
+def _references(value):
+    if isinstance(value, str) and value.startswith(REFERENCE_PREFIX):
+        yield value[len(REFERENCE_PREFIX):]
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            yield from _references(item)
+
+def order_deployment_plan(entries):
+    """
+    "@이름" 참조를 따라 의존하는 컨트랙트가 먼저 배포되도록 정렬합니다. (같은 깊이에서는 계획 순서 유지)
+    """
+    by_name = {}
+    for entry in entries:
+        if entry['name'] in by_name:
+            raise RuntimeError(f"배포 계획에 같은 이름이 두 번 있습니다: {entry['name']}")
+        by_name[entry['name']] = entry
+
+    ordered = []
+    state = {}  # 이름 -> 'visiting' | 'done'
+
+    def visit(entry, chain):
+        name = entry['name']
+        if state.get(name) == 'done':
+            return
+        if state.get(name) == 'visiting':
+            raise RuntimeError(f"배포 계획에 순환 참조가 있습니다: {' -> '.join(chain + [name])}")
+        state[name] = 'visiting'
+        for dependency in _references(entry['args']):
+            if dependency not in by_name:
+                raise RuntimeError(f"배포 계획에 없는 컨트랙트를 참조합니다: {name} -> @{dependency}")
+            visit(by_name[dependency], chain + [name])
+        state[name] = 'done'
+        ordered.append(entry)
+
+    for entry in entries:
+        visit(entry, [])
+    return ordered
+
+def load_artifact(index, contract):
+    """
+    산출물 인덱스로 컨트랙트를 찾아 ABI와 생성 바이트코드를 읽습니다.
+    """
+    entry = index.require(contract)
+    if not entry['deployable']:
+        raise RuntimeError(f"배포할 바이트코드가 없습니다 (추상 컨트랙트/인터페이스): {contract}")
+    with open(index.artifact_path(entry), 'r') as f:
+        bytecode = json.load(f).get("bytecode", {})
+    bytecode = bytecode.get("object", "") if isinstance(bytecode, dict) else bytecode
+    if "__$" in bytecode:
+        raise RuntimeError(f"외부 라이브러리 링크가 필요한 컨트랙트는 지원하지 않습니다: {contract}")
+    return entry['abi'], bytecode
+
+def _abi_type(param):
+    """
+    ABI 파라미터 정의를 eth-abi 타입 문자열로 변환합니다. (tuple은 구성 요소 타입으로 전개)
+    """
+    abi_type = param['type']
+    if abi_type.startswith('tuple'):
+        inner = ','.join(_abi_type(component) for component in param.get('components', []))
+        return f"({inner}){abi_type[len('tuple'):]}"
+    return abi_type
+
+def _coerce_arg(abi_type, value, addresses):
+    """
+    배포 계획의 JSON 값을 eth-abi 인코딩이 가능한 파이썬 값으로 변환합니다. ("@이름"은 배포 주소로 치환)
+    """
+    if isinstance(value, str) and value.startswith(REFERENCE_PREFIX):
+        value = addresses[value[len(REFERENCE_PREFIX):]]
+    if abi_type.endswith(']'):
+        element_type = abi_type[:abi_type.rindex('[')]
+        return [_coerce_arg(element_type, item, addresses) for item in value]
+    if abi_type.startswith('('):
+        component_types = _split_tuple_types(abi_type[1:-1])
+        return tuple(_coerce_arg(t, item, addresses) for t, item in zip(component_types, value))
+    if abi_type.startswith(('uint', 'int')):
+        return int(value, 0) if isinstance(value, str) else int(value)
+    if abi_type.startswith('bytes'):
+        return bytes.fromhex(value[2:] if value.startswith('0x') else value) if isinstance(value, str) else bytes(value)
+    if abi_type == 'bool':
+        return value if isinstance(value, bool) else str(value).lower() == 'true'
+    return value
+
+def _split_tuple_types(inner):
+    types, depth, current = [], 0, ''
+    for char in inner:
+        if char == ',' and depth == 0:
+            types.append(current)
+            current = ''
+            continue
+        depth += char == '('
+        depth -= char == ')'
+        current += char
+    if current:
+        types.append(current)
+    return types
+
+def encode_constructor_args(abi, args, addresses):
+    """
+    생성자 인자를 ABI 인코딩합니다.
+    """
+    constructor = next((item for item in abi if item.get('type') == 'constructor'), None)
+    inputs = constructor.get('inputs', []) if constructor else []
+    if len(inputs) != len(args):
+        raise RuntimeError(f"생성자 인자 개수가 맞지 않습니다: 필요 {len(inputs)}개, 지정 {len(args)}개")
+    if not inputs:
+        return b''
+    types = [_abi_type(param) for param in inputs]
+    return abi_encode(types, [_coerce_arg(t, arg, addresses) for t, arg in zip(types, args)])
+
+def sign_creation_transaction(private_key, nonce, gas_price, gas, value, data, chain_id):
+    """
+    컨트랙트 생성 트랜잭션(EIP-155 레거시)을 서명하고 RLP 인코딩된 원시 트랜잭션(hex)을 반환합니다.
+    """
+    key = keys.PrivateKey(bytes.fromhex(private_key[2:] if private_key.startswith('0x') else private_key))
+    unsigned = [nonce, gas_price, gas, b'', value, data, chain_id, 0, 0]
+    signature = key.sign_msg_hash(keccak(rlp.encode(unsigned)))
+    v = signature.v + chain_id * 2 + 35
+    return '0x' + rlp.encode([nonce, gas_price, gas, b'', value, data, v, signature.r, signature.s]).hex()
+
+def deploy_contracts(foundry_project_dir, rpc_url, plan, debug=False):
+    """
+    배포 계획의 컨트랙트들을 한 번에 배포합니다.
+    논스·가스 가격·체인 ID를 한 번의 배치로 조회하고, 각 컨트랙트 주소를 미리 계산해 "@이름" 참조를 채운 뒤
+    모든 생성 트랜잭션을 프로세스 안에서 서명하여 하나의 배치 요청으로 전송하고 영수증도 배치로 확인합니다.
+
+    Args:
+        plan: 배포 계획 항목 목록 (컨트랙트 이름 문자열 또는 {'name', 'contract', 'args', 'value'})
+
+    Returns:
+        {배포 이름: 주소} (배포 순서)
+    """
+    entries = order_deployment_plan([normalize_plan_entry(entry) for entry in plan])
+    if not entries:
+        return {}
+    client = get_rpc_client(rpc_url)
+    deployer_address = ANVIL_ACCOUNTS[0]["address"]
+    deployer_key = ANVIL_ACCOUNTS[0]["private_key"]
+
+    nonce, gas_price, chain_id = client.batch([
+        ("eth_getTransactionCount", [deployer_address, "pending"]),
+        ("eth_gasPrice", []),
+        ("eth_chainId", []),
+    ])
+    nonce, gas_price, chain_id = int(nonce, 16), int(gas_price, 16), int(chain_id, 16)
+
+    index = get_artifact_index(foundry_project_dir)
+    addresses = {}
+    raw_transactions = []
+    for offset, entry in enumerate(entries):
+        abi, bytecode = load_artifact(index, entry['contract'])
+        addresses[entry['name']] = calculate_contract_address(deployer_address, nonce + offset)
+        data = bytes.fromhex(bytecode[2:] if bytecode.startswith('0x') else bytecode)
+        data += encode_constructor_args(abi, entry['args'], addresses)
+        raw_transactions.append(sign_creation_transaction(
+            deployer_key, nonce + offset, gas_price, DEPLOY_CONFIG['gas_limit'], entry['value'], data, chain_id
+        ))
+        if debug:
+            print(f"[디버그] 배포 준비: {entry['name']} ({entry['contract']}) -> {addresses[entry['name']]} (논스 {nonce + offset})")
+
+    # 모든 생성 트랜잭션을 하나의 배치로 전송 (논스 순서대로 처리됨)
+    tx_hashes = client.batch([("eth_sendRawTransaction", [raw]) for raw in raw_transactions])
+    receipts = client.wait_for_receipts(tx_hashes)
+
+    failed = []
+    for entry, tx_hash in zip(entries, tx_hashes):
+        receipt = receipts[tx_hash]
+        if int(receipt.get("status", "0x0"), 16) != 1:
+            failed.append(entry['name'])
+        elif (receipt.get("contractAddress") or '').lower() != addresses[entry['name']].lower():
+            raise RuntimeError(f"배포 주소가 예상과 다릅니다: {entry['name']} ({receipt.get('contractAddress')})")
+    if failed:
+        raise RuntimeError(f"컨트랙트 배포 실패 (생성자 revert 또는 가스 부족): {', '.join(failed)}")
+
+    # 배포 후 코드 확인도 한 번의 배치로 수행
+    codes = client.batch([("eth_getCode", [address, "latest"]) for address in addresses.values()])
+    empty = [name for name, code in zip(addresses, codes) if code in (None, "0x", "0x0")]
+    if empty:
+        raise RuntimeError(f"배포된 주소에 코드가 없습니다: {', '.join(empty)}")
+
+    print(f"[성공] 컨트랙트 {len(addresses)}개 배포 완료 (트랜잭션 배치 1회)")
+    return addresses
+
+def deploy_contract(foundry_project_dir, rpc_url, contract_name=None, debug=False, compile=True):
+    """
+    기존 Foundry 프로젝트 디렉토리를 사용하여 컨트랙트 하나를 배포합니다. (생성자 인자가 없는 컨트랙트)
+
+    Args:
+        foundry_project_dir: Foundry 프로젝트 디렉토리 경로
+        rpc_url: 임대받은 Anvil 인스턴스의 RPC URL
+        contract_name: 배포할 컨트랙트 이름 (없으면 자동 감지)
+        debug: 디버그 모드
+        compile: 배포 전에 호스트에서 컴파일할지 여부
+    """
+    foundry_dir = Path(foundry_project_dir)
+
+    if not foundry_dir.exists():
+        raise RuntimeError(f"Foundry 프로젝트 디렉토리가 존재하지 않습니다: {foundry_project_dir}")
+
+    if not (foundry_dir / "foundry.toml").exists():
+        raise RuntimeError(f"유효한 Foundry 프로젝트가 아닙니다: {foundry_project_dir}")
+
+    src_dir = foundry_dir / "src"
+    if not src_dir.exists():
+        raise RuntimeError(f"src 디렉토리가 없습니다: {src_dir}")
+
+    # 컴파일 (실행 계획에서 이미 컴파일한 경우 생략)
+    if compile:
+        compile_project(foundry_dir, debug)
+
+    entry = _find_contract(get_artifact_index(foundry_dir), contract_name)
+    contract_name = entry['name']
+
+    if debug:
+        print(f"[디버그] 컨트랙트 이름: {contract_name}")
+        print(f"[디버그] 컨트랙트 파일: {entry['source']}")
+        print(f"[디버그] Foundry 프로젝트: {foundry_dir}")
+
+    contract_address = deploy_contracts(foundry_dir, rpc_url, [contract_name], debug)[contract_name]
+    print(f"[성공] {contract_name} 배포 완료: {contract_address}")
+    return contract_address
@@ -1,5 +1,369 @@
 """
-스마트 컨트랙트 배포 관리자
-Foundry를 사용하여 컨트랙트를 배포하고 주소를 관리
+Docker 관리자
+Docker Engine API 클라이언트 공유, 이미지 존재/digest 캐시, 컨테이너 실행/exec/로그 스트리밍
 """
 
+import codecs
+import subprocess
+import sys
+import threading
+import time
+import uuid
+import docker
+from docker.errors import BuildError, DockerException, ImageNotFound, NotFound
+from requests.exceptions import ConnectionError as RequestsConnectionError, ReadTimeout
+from ..config import DOCKER_CONFIG, DOCKER_API_CONFIG
+
+# 타임아웃으로 강제 종료된 실행의 반환 코드 (timeout(1)과 동일)
+TIMEOUT_RETURNCODE = 124
+
+_client = None
+_client_lock = threading.Lock()
+# 이미지 이름 -> 이미지 ID (프로세스 내 메모, 없으면 None)
+_image_ids = {}
+_image_lock = threading.Lock()
+
+def get_client():
+    """
+    프로세스 전체에서 공유하는 Docker API 클라이언트를 반환합니다. (연결 풀 재사용)
+    """
+    global _client
+    with _client_lock:
+        if _client is None:
+            try:
+                _client = docker.from_env(max_pool_size=DOCKER_API_CONFIG['max_pool_size'])
+            except DockerException as e:
+                raise RuntimeError(f"Docker 데몬에 연결할 수 없습니다: {e}")
+        return _client
+
+def image_name(engine):
+    """
+    엔진 설정에서 사용할 이미지 이름을 반환합니다. (외부 이미지는 'image', 자체 빌드 이미지는 'tag')
+    """
+    config = DOCKER_CONFIG[engine]
+    return config.get('image') or config['tag']
+
+def image_id(name, refresh=False):
+    """
+    이미지 ID(digest)를 반환합니다. 없으면 None. 한 번 조회한 결과는 프로세스 내에서 재사용합니다.
+    """
+    with _image_lock:
+        if not refresh and name in _image_ids:
+            return _image_ids[name]
+    try:
+        found = get_client().images.get(name).id
+    except ImageNotFound:
+        found = None
+    with _image_lock:
+        _image_ids[name] = found
+    return found
+
+def ensure_image(engine, debug=False):
+    """
+    엔진 이미지가 없으면 Dockerfile로 빌드하거나(자체 이미지) 레지스트리에서 받아옵니다(외부 이미지).
+
+    Returns:
+        이미지 ID
+    """
+    config = DOCKER_CONFIG[engine]
+    name = image_name(engine)
+    existing = image_id(name)
+    if existing:
+        return existing
+
+    client = get_client()
+    if config.get('dockerfile'):
+        print(f"[정보] 도커 이미지({name})가 없어 자동 빌드합니다...")
+        try:
+            image, _ = client.images.build(path='.', dockerfile=config['dockerfile'], tag=name, rm=True)
+        except BuildError as e:
+            raise RuntimeError(f"도커 이미지 빌드 실패: {e.msg}")
+        print(f"[성공] 도커 이미지({name}) 빌드 완료.")
+    else:
+        print(f"[정보] 도커 이미지({name})를 받아옵니다...")
+        try:
+            image = client.images.pull(name)
+        except DockerException as e:
+            raise RuntimeError(f"도커 이미지 다운로드 실패: {e}")
+        if debug:
+            print(f"[디버그] 이미지 다운로드 완료: {name}")
+
+    with _image_lock:
+        _image_ids[name] = image.id
+    return image.id
+
+def to_volume_spec(volumes):
+    """
+    [(호스트 경로, 컨테이너 경로, 모드)] 목록을 Docker API 볼륨 형식으로 변환합니다.
+    """
+    return {str(host_path): {'bind': container_path, 'mode': mode} for host_path, container_path, mode in volumes or []}
+
+def iter_lines(chunks):
+    """
+    바이트 청크 스트림을 줄 단위 문자열로 변환합니다.
+    청크 경계에서 잘린 UTF-8 멀티바이트 문자(한글 로그, 상자 그리기 문자 등)는 증분 디코더로 이어서 디코딩합니다.
+    """
+    decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+    buffer = ''
+    for chunk in chunks:
+        if not chunk:
+            continue
+        text = decoder.decode(chunk) if isinstance(chunk, bytes) else chunk
+        # 새로 받은 부분만 나누어 긴 줄을 청크마다 다시 훑지 않음
+        first, *rest = text.split('\n')
+        buffer += first
+        if rest:
+            yield buffer
+            yield from rest[:-1]
+            buffer = rest[-1]
+    buffer += decoder.decode(b'', final=True)
+    if buffer:
+        yield buffer
+
+def start_container(image, command=None, name=None, volumes=None, workdir=None, network=None, entrypoint=None, debug=False):
+    """
+    컨테이너를 백그라운드로 시작하고 Container 객체를 반환합니다.
+    """
+    if debug:
+        print(f"[디버그] 컨테이너 시작: image={image} name={name} command={command}")
+    try:
+        return get_client().containers.run(
+            image, command,
+            name=name,
+            detach=True,
+            volumes=to_volume_spec(volumes),
+            working_dir=workdir,
+            network_mode=network,
+            entrypoint=entrypoint,
+        )
+    except DockerException as e:
+        raise RuntimeError(f"컨테이너 시작 실패 ({image}): {e}")
+
+def get_container(name):
+    """
+    이름으로 컨테이너를 조회합니다. 없으면 None.
+    """
+    try:
+        return get_client().containers.get(name)
+    except NotFound:
+        return None
+
+def container_running(container):
+    """
+    컨테이너가 실행 중인지 확인합니다.
+    """
+    try:
+        container.reload()
+    except NotFound:
+        return False
+    return container.status == 'running'
+
+def remove_container(container_or_name):
+    """
+    컨테이너를 강제로 중지하고 삭제합니다. (이미 없으면 무시)
+    """
+    container = get_container(container_or_name) if isinstance(container_or_name, str) else container_or_name
+    if container is None:
+        return
+    try:
+        container.remove(force=True)
+    except NotFound:
+        pass
+
+def stream_logs(container, follow=True):
+    """
+    컨테이너 출력(stdout+stderr)을 줄 단위로 스트리밍합니다.
+    """
+    return iter_lines(container.logs(stream=True, follow=follow))
+
+def run_container(image, command=None, volumes=None, workdir=None, network=None, entrypoint=None,
+                  timeout=None, stream_output=False, debug=False):
+    """
+    일회용 컨테이너로 명령어를 실행하고 종료될 때까지 기다립니다. (docker run --rm 대체)
+    timeout 초과 시 컨테이너를 종료하고 반환 코드 124를 돌려줍니다.
+
+    Args:
+        stream_output: True이면 출력을 실시간으로 화면에 표시하고 stdout/stderr는 비워 반환
+
+    Returns:
+        subprocess.CompletedProcess (returncode, stdout, stderr)
+    """
+    container = start_container(image, command, volumes=volumes, workdir=workdir, network=network,
+                                entrypoint=entrypoint, debug=debug)
+    try:
+        if stream_output:
+            printer = threading.Thread(target=_echo_lines, args=(stream_logs(container),), daemon=True)
+            printer.start()
+        try:
+            returncode = container.wait(timeout=timeout)['StatusCode']
+        except (ReadTimeout, RequestsConnectionError):
+            if debug:
+                print(f"[디버그] 컨테이너 실행 타임아웃 ({timeout}초), 강제 종료합니다.")
+            container.kill()
+            returncode = TIMEOUT_RETURNCODE
+        if stream_output:
+            printer.join(timeout=5)
+            return subprocess.CompletedProcess(command, returncode, '', '')
+        stdout = container.logs(stdout=True, stderr=False).decode('utf-8', errors='replace')
+        stderr = container.logs(stdout=False, stderr=True).decode('utf-8', errors='replace')
+        return subprocess.CompletedProcess(command, returncode, stdout, stderr)
+    finally:
+        remove_container(container)
+
+def exec_in_container(container, command, workdir=None, stream_output=False):
+    """
+    실행 중인 컨테이너에서 명령어를 실행합니다. (docker exec 대체)
+
+    Returns:
+        subprocess.CompletedProcess (returncode, stdout, stderr)
+    """
+    api = get_client().api
+    exec_id = api.exec_create(container.id, command, workdir=workdir, stdout=True, stderr=True)['Id']
+    if stream_output:
+        chunks = (out or err for out, err in api.exec_start(exec_id, stream=True, demux=True))
+        _echo_lines(iter_lines(chunks))
+        stdout, stderr = '', ''
+    else:
+        out, err = api.exec_start(exec_id, demux=True)
+        stdout = (out or b'').decode('utf-8', errors='replace')
+        stderr = (err or b'').decode('utf-8', errors='replace')
+    returncode = api.exec_inspect(exec_id)['ExitCode']
+    return subprocess.CompletedProcess(command, returncode, stdout, stderr)
+
+def stream_exec(container, command, workdir=None):
+    """
+    실행 중인 컨테이너에서 명령어를 실행하며 출력(stdout+stderr)을 줄 단위로 스트리밍합니다.
+    """
+    api = get_client().api
+    exec_id = api.exec_create(container.id, command, workdir=workdir, stdout=True, stderr=True)['Id']
+    chunks = (out or err for out, err in api.exec_start(exec_id, stream=True, demux=True))
+    return iter_lines(chunks)
+
+class ExecProcess:
+    """
+    실행 중인 컨테이너 안에서 docker exec로 시작한 프로세스
+    출력을 줄 단위로 읽는 동안 다른 스레드에서 stop()으로 중지할 수 있습니다.
+    (exec 프로세스는 API로 직접 종료할 수 없으므로 컨테이너 안의 PID 파일로 시그널을 보냄)
+    """
+
+    def __init__(self, container, command, workdir=None, timeout=None, on_exit=None):
+        self.container = container
+        self.pid_file = f'/tmp/chainhawk-exec-{uuid.uuid4().hex[:8]}.pid'
+        cmd = []
+        if timeout:
+            cmd += ['timeout', '--signal=INT', '--kill-after=10', str(int(timeout))]
+        cmd += list(command)
+        wrapped = ['sh', '-c', f'echo $$ > {self.pid_file}; exec "$@"', 'sh'] + cmd
+        self.command = cmd
+        self.stopped = False
+        self._on_exit = on_exit
+        self._stderr = []
+        self._api = get_client().api
+        self._exec_id = self._api.exec_create(container.id, wrapped, workdir=workdir, stdout=True, stderr=True)['Id']
+        self._chunks = self._api.exec_start(self._exec_id, stream=True, demux=True)
+
+    def lines(self):
+        """
+        출력(stdout+stderr)을 줄 단위로 반환합니다. 프로세스가 끝나면 종료됩니다.
+        """
+        return iter_lines(out or err for out, err in self._chunks)
+
+    def stdout_chunks(self):
+        """
+        표준 출력을 받은 바이트 청크 그대로 반환합니다. (줄 단위로 나누지 않으므로 한 줄짜리 큰 JSON 출력용)
+        표준 오류는 따로 모아 wait() 이후 self.stderr로 제공합니다.
+        """
+        for out, err in self._chunks:
+            if err:
+                self._stderr.append(err)
+            if out:
+                yield out
+
+    @property
+    def stderr(self):
+        return b''.join(self._stderr).decode('utf-8', errors='replace')
+
+    def stop(self, signal='INT'):
+        """
+        프로세스에 시그널을 보내 중지합니다.
+        """
+        self.stopped = True
+        exec_in_container(self.container, ['sh', '-c', f'kill -{signal} "$(cat {self.pid_file})" 2>/dev/null; true'])
+
+    def wait(self):
+        """
+        출력을 끝까지 소비한 뒤 반환 코드를 돌려줍니다. (timeout 초과 시 124)
+        """
+        for _ in self.lines():
+            pass
+        try:
+            return self._api.exec_inspect(self._exec_id)['ExitCode']
+        finally:
+            if self._on_exit is not None:
+                self._on_exit()
+                self._on_exit = None
+
+class ContainerProcess:
+    """
+    일회용 컨테이너로 시작한 프로세스 (ExecProcess와 같은 lines/stop/wait 인터페이스)
+    """
+
+    def __init__(self, image, command=None, volumes=None, workdir=None, network=None, entrypoint=None,
+                 timeout=None, debug=False):
+        self.command = command
+        self.stopped = False
+        self.debug = debug
+        self._deadline = None if timeout is None else time.monotonic() + timeout
+        self.container = start_container(image, command, volumes=volumes, workdir=workdir, network=network,
+                                         entrypoint=entrypoint, debug=debug)
+        self._timer = None
+        self._timed_out = False
+        self.stderr = ''
+        if timeout is not None:
+            # 출력을 읽는 동안에도 제한 시간이 지나면 중지되도록 타이머로 시그널 전송
+            self._timer = threading.Timer(timeout, self._expire)
+            self._timer.daemon = True
+            self._timer.start()
+
+    def _expire(self):
+        self._timed_out = True
+        self.stop()
+
+    def lines(self):
+        return stream_logs(self.container)
+
+    def stdout_chunks(self):
+        """
+        표준 출력만 받은 바이트 청크 그대로 반환합니다. (표준 오류는 wait() 이후 self.stderr)
+        """
+        return self.container.logs(stream=True, follow=True, stdout=True, stderr=False)
+
+    def stop(self, signal='INT'):
+        self.stopped = True
+        try:
+            self.container.kill(signal=f'SIG{signal}')
+        except DockerException:
+            pass
+
+    def wait(self):
+        try:
+            remaining = None if self._deadline is None else max(1, self._deadline - time.monotonic() + 10)
+            try:
+                returncode = self.container.wait(timeout=remaining)['StatusCode']
+            except (ReadTimeout, RequestsConnectionError):
+                if self.debug:
+                    print("[디버그] 컨테이너가 중지 시그널에 응답하지 않아 강제 종료합니다.")
+                self.container.kill()
+                self._timed_out = True
+                returncode = TIMEOUT_RETURNCODE
+            self.stderr = self.container.logs(stdout=False, stderr=True).decode('utf-8', errors='replace')
+            return TIMEOUT_RETURNCODE if self._timed_out else returncode
+        finally:
+            if self._timer is not None:
+                self._timer.cancel()
+            remove_container(self.container)
+
+def _echo_lines(lines):
+    for line in lines:
+        sys.stdout.write(line + '\n')
+        sys.stdout.flush()
@@ -0,0 +1,192 @@
+"""
+비동기 프로세스 실행기
+하나의 이벤트 루프(전용 스레드)에서 외부 도구 호출을 병렬 실행하며, 자원 종류별 동시 실행 수 제한,
+호출별 제한 시간(초과 시 프로세스 종료), 줄 단위 출력 스트리밍, 취소를 지원
+"""
+
+import asyncio
+import atexit
+import os
+import signal
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from ..config import PROCESS_CONFIG
+from .docker_manager import TIMEOUT_RETURNCODE
+
+class ProcessRunner:
+    """
+    전용 스레드의 asyncio 이벤트 루프에서 프로세스와 블로킹 작업을 실행하는 실행기
+    자원 종류(fuzz, scan, compile, probe)마다 세마포어로 동시 실행 수를 제한합니다.
+    동기 코드에서는 run()/run_command()/call()로, 비동기 코드에서는 코루틴을 직접 사용합니다.
+    """
+
+    def __init__(self, limits=None):
+        self.limits = dict(PROCESS_CONFIG['limits'], **(limits or {}))
+        self._loop = asyncio.new_event_loop()
+        # 컨테이너 실행 등 블로킹 작업용 스레드 (자원별 제한의 합보다 작으면 세마포어보다 먼저 막힘)
+        self._loop.set_default_executor(ThreadPoolExecutor(max_workers=PROCESS_CONFIG['threads'],
+                                                           thread_name_prefix='chainhawk-process'))
+        self._semaphores = {}
+        self._thread = threading.Thread(target=self._loop.run_forever, name='chainhawk-process-runner', daemon=True)
+        self._thread.start()
+
+    def _semaphore(self, resource):
+        # 이벤트 루프 스레드에서만 호출되므로 잠금이 필요 없음
+        semaphore = self._semaphores.get(resource)
+        if semaphore is None:
+            if resource not in self.limits:
+                raise RuntimeError(f"알 수 없는 자원 종류입니다: {resource}")
+            limit = self.limits[resource] or os.cpu_count() or 1
+            semaphore = self._semaphores[resource] = asyncio.Semaphore(limit)
+        return semaphore
+
+    async def run_process(self, command, cwd=None, timeout=None, resource='probe', on_line=None, env=None):
+        """
+        외부 프로그램을 실행하고 종료될 때까지 출력을 읽습니다.
+        제한 시간을 넘기거나 취소되면 프로세스를 종료(SIGTERM, 유예 후 SIGKILL)합니다.
+
+        Args:
+            on_line: (스트림 이름 'stdout'|'stderr', 줄) 콜백, 지정하면 출력을 줄 단위로 전달
+            resource: 동시 실행 수를 제한할 자원 종류
+
+        Returns:
+            subprocess.CompletedProcess (제한 시간 초과 시 returncode 124)
+        """
+        async with self._semaphore(resource):
+            process = await asyncio.create_subprocess_exec(
+                *command, cwd=cwd, env=env, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE,
+                start_new_session=True
+            )
+            readers = asyncio.gather(
+                _read_stream(process.stdout, 'stdout', on_line),
+                _read_stream(process.stderr, 'stderr', on_line),
+            )
+            try:
+                stdout, stderr = await asyncio.wait_for(asyncio.shield(readers), timeout)
+                returncode = await process.wait()
+            except asyncio.TimeoutError:
+                await _terminate(process)
+                stdout, stderr = await readers
+                returncode = TIMEOUT_RETURNCODE
+            except asyncio.CancelledError:
+                await _terminate(process)
+                readers.cancel()
+                raise
+            return subprocess.CompletedProcess(command, returncode, stdout, stderr)
+
+    async def call_async(self, resource, func, *args, **kwargs):
+        """
+        블로킹 함수(컨테이너 실행 등)를 자원 제한 아래에서 스레드로 실행합니다.
+        """
+        async with self._semaphore(resource):
+            return await asyncio.to_thread(func, *args, **kwargs)
+
+    def run(self, coroutine):
+        """
+        코루틴을 실행기 이벤트 루프에서 실행하고 결과를 기다립니다. (동기 코드용)
+        기다리는 도중 중단(Ctrl+C)되면 코루틴을 취소하여 실행 중인 프로세스를 종료합니다.
+        """
+        future = asyncio.run_coroutine_threadsafe(coroutine, self._loop)
+        try:
+            return future.result()
+        except BaseException:
+            future.cancel()
+            raise
+
+    def run_command(self, command, cwd=None, timeout=None, resource='probe', on_line=None):
+        """
+        run_process의 동기 버전
+        """
+        return self.run(self.run_process(command, cwd, timeout, resource, on_line))
+
+    def call(self, resource, func, *args, **kwargs):
+        """
+        call_async의 동기 버전
+        """
+        return self.run(self.call_async(resource, func, *args, **kwargs))
+
+    def gather(self, *coroutines):
+        """
+        여러 코루틴을 하나의 이벤트 루프에서 동시에 실행하고 결과를 순서대로 반환합니다. (예외는 결과로 반환)
+        """
+        async def gather_all():
+            return await asyncio.gather(*coroutines, return_exceptions=True)
+        return self.run(gather_all())
+
+    def close(self):
+        if self._loop.is_running():
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=5)
+
+# 스트림 읽기 단위 (readline은 64KiB를 넘는 한 줄에서 실패하므로 청크로 읽어 직접 줄을 나눔)
+_READ_CHUNK = 1 << 16
+
+async def _read_stream(stream, name, on_line):
+    """
+    스트림을 줄 단위로 읽어 콜백에 전달하고 전체 내용을 반환합니다. (줄 길이 제한 없음)
+    """
+    lines = []
+    pending = []  # 아직 줄바꿈이 나오지 않은 줄 조각 (긴 줄을 매번 다시 훑지 않도록 새 청크만 나눔)
+
+    def emit(raw, newline):
+        line = raw.decode('utf-8', errors='replace')
+        lines.append(line + newline)
+        if on_line is not None:
+            on_line(name, line)
+
+    while True:
+        chunk = await stream.read(_READ_CHUNK)
+        if not chunk:
+            break
+        *complete, rest = chunk.split(b'\n')
+        for raw in complete:
+            pending.append(raw)
+            emit(b''.join(pending), '\n')
+            pending = []
+        if rest:
+            pending.append(rest)
+    if pending:
+        emit(b''.join(pending), '')
+    return ''.join(lines)
+
+async def _terminate(process, grace=None):
+    """
+    프로세스 그룹(자식 프로세스 포함)을 SIGTERM으로 종료하고 유예 시간 안에 끝나지 않으면 SIGKILL합니다.
+    """
+    if process.returncode is not None:
+        return
+    grace = PROCESS_CONFIG['kill_grace'] if grace is None else grace
+    try:
+        os.killpg(process.pid, signal.SIGTERM)
+        await asyncio.wait_for(process.wait(), grace)
+    except ProcessLookupError:
+        pass
+    except asyncio.TimeoutError:
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+        await process.wait()
+
+_runner = None
+_runner_lock = threading.Lock()
+
+def get_runner():
+    """
+    프로세스 전체에서 공유하는 실행기를 반환합니다.
+    """
+    global _runner
+    with _runner_lock:
+        if _runner is None:
+            _runner = ProcessRunner()
+        return _runner
+
+def close_runner():
+    global _runner
+    with _runner_lock:
+        runner, _runner = _runner, None
+    if runner is not None:
+        runner.close()
+
+atexit.register(close_runner)
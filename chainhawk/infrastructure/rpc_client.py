@@ -0,0 +1,168 @@
+"""
+JSON-RPC 클라이언트
+연결을 유지하는 세션으로 체인 RPC를 호출하고, 배치 요청과 영수증 폴링(제한된 백오프)을 지원
+"""
+
+import itertools
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from ..config import RPC_CONFIG
+
+class JsonRpcClient:
+    """
+    RPC 엔드포인트 하나에 대한 JSON-RPC 클라이언트
+    requests.Session으로 TCP 연결을 재사용하며, 여러 호출을 하나의 HTTP 요청(배치)으로 보낼 수 있습니다.
+    전송 오류와 RPC 오류는 모두 RuntimeError로 변환됩니다.
+    """
+
+    def __init__(self, rpc_url, timeout=None):
+        self.rpc_url = rpc_url
+        self.timeout = RPC_CONFIG['timeout'] if timeout is None else timeout
+        self._ids = itertools.count(1)
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=RPC_CONFIG['pool_size'])
+        self._session.mount('http://', adapter)
+        self._session.mount('https://', adapter)
+
+    def _post(self, payload, timeout=None):
+        try:
+            response = self._session.post(self.rpc_url, json=payload, timeout=timeout or self.timeout)
+            return response.json()
+        except (requests.RequestException, ValueError) as e:
+            raise RuntimeError(f"RPC 연결 실패 ({self.rpc_url}): {e}")
+
+    def _request(self, method, params):
+        return {"jsonrpc": "2.0", "method": method, "params": list(params or []), "id": next(self._ids)}
+
+    def call(self, method, params=None, timeout=None):
+        """
+        RPC 메서드 하나를 호출하고 result를 반환합니다.
+        """
+        data = self._post(self._request(method, params), timeout)
+        if data.get("error"):
+            raise RuntimeError(f"RPC 오류 ({method}): {data['error']}")
+        return data.get("result")
+
+    def batch(self, calls, timeout=None):
+        """
+        여러 호출을 하나의 배치 요청으로 보냅니다.
+
+        Args:
+            calls: [(메서드, 파라미터 목록)] 목록
+
+        Returns:
+            호출 순서대로 정렬한 result 목록
+        """
+        calls = list(calls)
+        if not calls:
+            return []
+        payload = [self._request(method, params) for method, params in calls]
+        data = self._post(payload, timeout)
+        if isinstance(data, dict):
+            # 배치 자체가 거부된 경우 (단일 오류 응답)
+            raise RuntimeError(f"RPC 배치 요청 실패: {data.get('error', data)}")
+        by_id = {item.get("id"): item for item in data}
+        results = []
+        for request, (method, _) in zip(payload, calls):
+            item = by_id.get(request["id"])
+            if item is None:
+                raise RuntimeError(f"RPC 배치 응답 누락 ({method})")
+            if item.get("error"):
+                raise RuntimeError(f"RPC 오류 ({method}): {item['error']}")
+            results.append(item.get("result"))
+        return results
+
+    def block_number(self, timeout=None):
+        return int(self.call("eth_blockNumber", timeout=timeout), 16)
+
+    def get_nonce(self, address, block="pending"):
+        return int(self.call("eth_getTransactionCount", [address, block]), 16)
+
+    def get_code(self, address, block="latest"):
+        return self.call("eth_getCode", [address, block])
+
+    def get_receipt(self, tx_hash):
+        return self.call("eth_getTransactionReceipt", [tx_hash])
+
+    def wait_until_ready(self, timeout, debug=False):
+        """
+        RPC가 응답할 때까지 짧은 간격에서 시작해 점점 늘어나는 간격으로 최대 timeout초 대기합니다.
+        """
+        for _ in _backoff(timeout):
+            try:
+                self.block_number(timeout=2)
+                return True
+            except RuntimeError as e:
+                if debug:
+                    print(f"[디버그] 연결 테스트 오류: {e}")
+        raise RuntimeError(f"RPC 응답 대기 시간 초과: {self.rpc_url}")
+
+    def wait_for_receipts(self, tx_hashes, timeout=None):
+        """
+        트랜잭션 영수증이 모두 나올 때까지 아직 없는 것만 배치로 다시 조회합니다.
+
+        Returns:
+            {트랜잭션 해시: 영수증}
+        """
+        timeout = RPC_CONFIG['receipt_timeout'] if timeout is None else timeout
+        pending = list(dict.fromkeys(tx_hashes))
+        receipts = {}
+        for _ in _backoff(timeout):
+            results = self.batch([("eth_getTransactionReceipt", [tx_hash]) for tx_hash in pending])
+            for tx_hash, receipt in zip(pending, results):
+                if receipt:
+                    receipts[tx_hash] = receipt
+            pending = [tx_hash for tx_hash in pending if tx_hash not in receipts]
+            if not pending:
+                return receipts
+        raise RuntimeError(f"트랜잭션 영수증 대기 시간 초과: {', '.join(pending)}")
+
+    def wait_for_receipt(self, tx_hash, timeout=None):
+        return self.wait_for_receipts([tx_hash], timeout)[tx_hash]
+
+    def close(self):
+        self._session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def _backoff(timeout, initial=0.05, maximum=1.0):
+    """
+    timeout초 동안 반복 시도 시점을 내어주는 제너레이터 (시도 사이 대기 간격은 initial부터 maximum까지 2배씩 증가)
+    """
+    deadline = time.monotonic() + timeout
+    delay = initial
+    while True:
+        yield
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return
+        time.sleep(min(delay, remaining))
+        delay = min(delay * 2, maximum)
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+def get_rpc_client(rpc_url):
+    """
+    RPC URL별로 공유하는 클라이언트를 반환합니다. (연결 재사용)
+    """
+    with _clients_lock:
+        client = _clients.get(rpc_url)
+        if client is None:
+            client = _clients[rpc_url] = JsonRpcClient(rpc_url)
+        return client
+
+def close_rpc_client(rpc_url):
+    """
+    RPC URL의 공유 클라이언트를 닫습니다. (체인을 정리한 뒤 같은 포트를 재사용할 때 오래된 연결을 쓰지 않도록)
+    """
+    with _clients_lock:
+        client = _clients.pop(rpc_url, None)
+    if client is not None:
+        client.close()
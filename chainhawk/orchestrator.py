@@ -1,2 +1,363 @@
 # orchestrator.py
-# 분석 워크플로우 관리 및 도구 실행 순서 제어 
\ No newline at end of file
+# 분석 워크플로우 관리 및 도구 실행 순서 제어
+
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import ExitStack
+from .config import ORCHESTRATOR_CONFIG
+from .incremental import carry_forward
+from .result.aggregator import FindingAggregator, halmos_finding, ityfuzz_finding
+
+ENGINES = ('semgrep', 'ityfuzz', 'halmos')
+
+class Stage:
+    """
+    분석 DAG의 단계 하나
+    run(context)의 반환값은 context.results[name]에 저장되어 뒤 단계에서 사용합니다.
+    """
+
+    def __init__(self, name, run, deps=(), always=False):
+        self.name = name
+        self.run = run
+        self.deps = tuple(deps)
+        self.always = always  # 선행 단계가 실패해도 실행 (결과 집계 등)
+
+    def __repr__(self):
+        return f'Stage({self.name}, deps={list(self.deps)})'
+
+class StageContext:
+    """
+    단계 함수에 전달되는 실행 상태 (선행 단계 결과, 실패 정보, 파이프라인이 끝날 때 정리할 자원)
+    """
+
+    def __init__(self, exit_stack):
+        self.results = {}
+        self.errors = {}
+        self._exit_stack = exit_stack
+        self._lock = threading.Lock()
+
+    def enter_context(self, context_manager):
+        """
+        파이프라인이 끝날 때까지 유지할 자원(체인 임대 등)을 등록하고 값을 반환합니다.
+        """
+        with self._lock:
+            return self._exit_stack.enter_context(context_manager)
+
+class StagePipeline:
+    """
+    단계 DAG 실행기
+    선행 단계가 모두 끝난 단계부터 최대 max_workers개까지 동시에 실행합니다.
+    실패한 단계에 의존하는 단계는 건너뛰며(always 단계 제외), 단계별 실행 시간을 기록합니다.
+    """
+
+    def __init__(self, max_workers=None, debug=False):
+        self.max_workers = max_workers or ORCHESTRATOR_CONFIG['max_workers']
+        self.debug = debug
+        self.stages = {}
+        self.timings = {}  # 단계 이름 -> 실행 시간(초)
+
+    def add(self, name, run, deps=(), always=False):
+        """
+        단계를 추가합니다. 같은 이름의 단계는 한 번만 추가되어 엔진 간에 공유됩니다.
+        """
+        if name not in self.stages:
+            self.stages[name] = Stage(name, run, deps, always)
+        return self.stages[name]
+
+    def _validate(self):
+        for stage in self.stages.values():
+            for dep in stage.deps:
+                if dep not in self.stages:
+                    raise RuntimeError(f"알 수 없는 선행 단계입니다: {stage.name} -> {dep}")
+        visiting, done = set(), set()
+
+        def visit(name):
+            if name in done:
+                return
+            if name in visiting:
+                raise RuntimeError(f"단계 의존성에 순환이 있습니다: {name}")
+            visiting.add(name)
+            for dep in self.stages[name].deps:
+                visit(dep)
+            visiting.discard(name)
+            done.add(name)
+
+        for name in self.stages:
+            visit(name)
+
+    def _run_stage(self, stage, context):
+        started = time.monotonic()
+        try:
+            return stage.run(context)
+        finally:
+            self.timings[stage.name] = time.monotonic() - started
+            if self.debug:
+                print(f"[디버그] 단계 완료: {stage.name} ({self.timings[stage.name]:.2f}초)")
+
+    def run(self):
+        """
+        모든 단계를 실행합니다.
+
+        Returns:
+            StageContext (results, errors)
+        """
+        self._validate()
+        with ExitStack() as exit_stack:
+            context = StageContext(exit_stack)
+            pending = dict(self.stages)
+            running = {}
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                while pending or running:
+                    for name, stage in list(pending.items()):
+                        if len(running) >= self.max_workers:
+                            break
+                        if any(dep in pending or dep in running.values() for dep in stage.deps):
+                            continue
+                        del pending[name]
+                        failed = [dep for dep in stage.deps if dep in context.errors]
+                        if failed and not stage.always:
+                            context.errors[name] = RuntimeError(f"선행 단계 실패로 건너뜀: {', '.join(failed)}")
+                            continue
+                        if self.debug:
+                            print(f"[디버그] 단계 시작: {name}")
+                        running[executor.submit(self._run_stage, stage, context)] = name
+                    if not running:
+                        continue
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        name = running.pop(future)
+                        try:
+                            context.results[name] = future.result()
+                        except Exception as e:
+                            context.errors[name] = e
+                            print(f"[오류] {name} 단계 실패: {e}")
+        return context
+
+def build_analysis_pipeline(foundry_dir, engines, options, max_workers=None, debug=False):
+    """
+    엔진 목록에 맞는 분석 DAG를 구성합니다.
+    이미지 준비, 컴파일, 체인 시작, 배포, 정적 분석, 퍼징, 결과 집계 단계로 나누고
+    엔진들이 함께 쓰는 단계(프로젝트 탐색 등)는 한 번만 실행합니다.
+
+    Args:
+        engines: 실행할 엔진 이름 목록 ('semgrep', 'ityfuzz', 'halmos')
+        options: analyze 옵션 dict (rules, include, exclude, jobs, use_cache, contract, ityfuzz_mode, workers,
+                 reuse_chain, load_state, dump_state, deploy_plan, stop_on_first, budget, solver_timeout, report, scope)
+                 scope(incremental.ChangeScope)를 지정하면 영향 범위의 파일·컨트랙트만 분석하고
+                 범위 밖의 직전 실행 결과를 이어받습니다.
+    """
+    from .adapters.semgrep_adapter import collect_semgrep_findings, semgrep_targets
+    from .infrastructure.docker_manager import ensure_image
+
+    pipeline = StagePipeline(max_workers, debug)
+    # 모든 엔진의 Finding을 하나의 지문 인덱스로 중복 제거하고, 처음 보는 결과만 보고서로 바로 내보냄
+    findings = FindingAggregator()
+    report = options.get('report')
+    scope = options.get('scope')
+    skipped = {}  # 증분 분석에서 영향이 없어 생략한 엔진 -> 사유
+
+    def emit(finding):
+        if findings.add(finding) and report is not None:
+            report.write(finding)
+
+    def discover(context):
+        project_root, targets = semgrep_targets(foundry_dir, options.get('include'), options.get('exclude'), debug)
+        return project_root, scope.filter_targets(targets) if scope is not None else targets
+
+    pipeline.add('discover', discover)
+    engine_stages = {}
+
+    if 'semgrep' in engines:
+        pipeline.add('image:semgrep', lambda context: ensure_image('semgrep', debug))
+
+        def static_scan(context):
+            project_root, targets = context.results['discover']
+            if scope is not None and not targets:
+                return FindingAggregator()
+            return collect_semgrep_findings(project_root, targets, options.get('rules') or 'semgrep_rules', debug,
+                                            jobs=options.get('jobs'), use_cache=options.get('use_cache'), on_finding=emit)
+
+        pipeline.add('static', static_scan, deps=('discover', 'image:semgrep'))
+        engine_stages['semgrep'] = 'static'
+
+    fuzz_contracts = options.get('contract')
+    if 'ityfuzz' in engines:
+        from .adapters.ityfuzz_adapter import plan_ityfuzz_run
+
+        plan = plan_ityfuzz_run(options.get('ityfuzz_mode'))
+        if scope is not None:
+            fuzz_contracts = scoped_fuzz_targets(scope, fuzz_contracts, plan)
+            if fuzz_contracts is None:
+                skipped['ityfuzz'] = "변경 영향을 받는 퍼징 대상이 없어 생략했습니다."
+
+    if 'ityfuzz' in engines and 'ityfuzz' not in skipped:
+        from .adapters.ityfuzz_adapter import build_ityfuzz_project, deploy_ityfuzz_targets, fuzz_ityfuzz_targets
+        from .infrastructure.anvil_manager import get_anvil_pool
+
+        use_cache = options.get('use_cache')
+        pipeline.add('image:ityfuzz', lambda context: ensure_image('ityfuzz', debug))
+        # 컨테이너 컴파일은 퍼저 이미지가 필요하고, 호스트 컴파일은 이미지 준비와 동시에 진행
+        compile_deps = ('image:ityfuzz',) if plan['build'] == 'container' else ()
+        pipeline.add('compile', lambda context: build_ityfuzz_project(foundry_dir, plan, use_cache, debug), deps=compile_deps)
+
+        def chain_up(context):
+            if not plan['chain']:
+                return None
+            pool = get_anvil_pool(debug, reuse=options.get('reuse_chain'), load_state=options.get('load_state'))
+            # 퍼징이 끝날 때까지 체인을 유지하고 파이프라인 종료 시 반납
+            return context.enter_context(pool.lease())
+
+        pipeline.add('chain', chain_up)
+
+        def deploy(context):
+            return deploy_ityfuzz_targets(foundry_dir, plan, context.results['chain'], fuzz_contracts,
+                                          options.get('deploy_plan'), options.get('budget'), options.get('dump_state'), debug)
+
+        pipeline.add('deploy', deploy, deps=('compile', 'chain'))
+
+        def fuzz(context):
+            targets, contract_name, contract_address = context.results['deploy']
+            anvil = context.results['chain']
+            return fuzz_ityfuzz_targets(foundry_dir, plan, targets, contract_name, anvil.rpc_url if anvil else None, debug,
+                                        options.get('workers'), use_cache, options.get('stop_on_first'),
+                                        options.get('budget')) + (contract_address,)
+
+        pipeline.add('fuzz', fuzz, deps=('image:ityfuzz', 'deploy'))
+        engine_stages['ityfuzz'] = 'fuzz'
+
+    if 'halmos' in engines:
+        from .adapters.halmos_adapter import (
+            build_halmos_project, discover_properties, halmos_options, prove_halmos_properties
+        )
+
+        pipeline.add('image:halmos', lambda context: ensure_image('halmos', debug))
+        # 전용 빌드 디렉토리(HALMOS_CONFIG['build_dir'])에 쓰므로 퍼저의 컴파일·배포·퍼징과 동시에 진행
+        pipeline.add('compile:halmos', lambda context: build_halmos_project(foundry_dir, debug), deps=('image:halmos',))
+
+        def prove(context):
+            # --contract는 퍼징 대상을 가리키므로 속성 함수는 lib/를 제외한 모든 컨트랙트(증분 분석이면 영향 범위)에서 찾음
+            properties = discover_properties(foundry_dir, contract_names=scope.contracts if scope is not None else None)
+            return prove_halmos_properties(foundry_dir, properties, halmos_options(options.get('solver_timeout')),
+                                           use_cache=options.get('use_cache'), debug=debug)
+
+        pipeline.add('prove', prove, deps=('compile:halmos',))
+        engine_stages['halmos'] = 'prove'
+
+    def aggregate(context):
+        results = {engine: engine_result(engine, stage, context, emit, report) for engine, stage in engine_stages.items()}
+        results.update(skipped)
+        carried = 0
+        if scope is not None:
+            # 분석 범위 밖의 직전 결과는 다시 분석하지 않고 이어받음
+            for finding in carry_forward(foundry_dir, scope, engines):
+                emit(finding)
+                carried += 1
+        return {'engines': results, 'findings': findings, 'carried': carried,
+                'targets': analysis_targets(context, engine_stages)}
+
+    pipeline.add('aggregate', aggregate, deps=tuple(engine_stages.values()), always=True)
+    return pipeline
+
+def analysis_targets(context, engine_stages):
+    """
+    엔진별 분석 대상 목록 (실행 기록용)
+
+    Returns:
+        [(엔진, 대상 이름, 상태)]: Semgrep은 파일, ITYfuzz는 퍼징 컨트랙트, Halmos는 속성 함수(상태는 판정)
+    """
+    targets = []
+    for engine, stage in engine_stages.items():
+        status = 'error' if stage in context.errors else 'ok'
+        if engine == 'semgrep' and 'discover' in context.results:
+            targets += [(engine, path, status) for path in context.results['discover'][1]]
+        elif engine == 'ityfuzz' and 'deploy' in context.results:
+            targets += [(engine, name, status) for name in context.results['deploy'][0]]
+        elif engine == 'halmos' and stage in context.results:
+            targets += [(engine, f"{verdict['contract']}.{verdict['signature']}", verdict['verdict'])
+                        for verdict in context.results[stage][0]]
+    return targets
+
+def scoped_fuzz_targets(scope, contracts, plan):
+    """
+    증분 분석에서 퍼징할 컨트랙트 목록을 정합니다.
+
+    Returns:
+        컨트랙트 이름 목록 (빈 목록이면 자동 감지), 영향을 받는 대상이 없으면 None (퍼징 생략)
+    """
+    if contracts:
+        return [name for name in contracts if name in scope.contracts] or None
+    if plan['mode'] == 'setup':
+        # 배포 스크립트가 대상이므로 스크립트가 영향 범위에 들 때만 (스크립트가 대상 컨트랙트를 import)
+        return [] if 'DeployScript' in scope.contracts else None
+    return sorted(scope.deployable) or None
+
+def engine_result(engine, stage, context, emit, report=None):
+    """
+    엔진 마지막 단계의 결과를 엔진별 결과 형식으로 변환합니다. (실패 시 각 엔진의 오류 형식)
+    ITYfuzz 버그와 Halmos 반례는 emit으로 통합 집계에 추가합니다. (Semgrep 결과는 스캔 도중 이미 추가됨)
+    """
+    from .adapters.halmos_adapter import halmos_error, halmos_result
+    from .adapters.ityfuzz_adapter import ityfuzz_error, ityfuzz_result
+    from .adapters.semgrep_adapter import format_findings, format_summary
+
+    error = context.errors.get(stage)
+    if engine == 'halmos':
+        if error is not None:
+            return halmos_error(error)
+        result = halmos_result(*context.results[stage])
+        for bug in result.get('bugs') or []:
+            emit(halmos_finding(bug))
+        return result
+    if engine == 'ityfuzz':
+        if error is not None:
+            return ityfuzz_error(error)
+        result = ityfuzz_result(*context.results[stage])
+        for bug in result.get('bugs') or []:
+            emit(ityfuzz_finding(bug))
+        return result
+    if error is not None:
+        return f"[오류] Semgrep 실행 중 오류 발생: {error}"
+    semgrep_findings = context.results[stage]
+    return format_summary(semgrep_findings) if report is not None else format_findings(semgrep_findings.sorted())
+
+def engine_status(result):
+    """
+    엔진별 결과 형식(오류 문자열 또는 status dict)에서 실행 기록용 상태를 정합니다.
+
+    Returns:
+        'failed' 또는 'completed'
+    """
+    if isinstance(result, dict):
+        return 'failed' if result.get('status') == 'error' else 'completed'
+    return 'failed' if str(result).startswith('[오류]') else 'completed'
+
+def run_analysis(foundry_dir, engines, options, max_workers=None, debug=False):
+    """
+    여러 엔진의 분석을 하나의 DAG로 실행합니다.
+    정적 분석은 퍼저의 이미지 준비·컴파일·체인 시작·배포와 동시에 진행됩니다.
+
+    Returns:
+        {'engines': {엔진 이름: 결과}, 'findings': FindingAggregator, 'carried': 이어받은 결과 수,
+         'targets': [(엔진, 대상, 상태)], 'timings': {단계 이름: 실행 시간(초)}}
+    """
+    pipeline = build_analysis_pipeline(foundry_dir, engines, options, max_workers, debug)
+    context = pipeline.run()
+    if debug:
+        timings = ', '.join(f"{name} {seconds:.1f}초" for name, seconds in pipeline.timings.items())
+        print(f"[디버그] 단계별 실행 시간: {timings}")
+    analysis = context.results.get('aggregate', {'engines': {}, 'findings': FindingAggregator(), 'carried': 0,
+                                                 'targets': []})
+    return dict(analysis, timings=dict(pipeline.timings))
+
+def format_analysis(analysis):
+    """
+    엔진별 결과와 통합 집계 요약을 하나의 보고서 문자열로 만듭니다.
+    """
+    sections = [f"=== {engine} ===\n{result}" for engine, result in analysis['engines'].items()]
+    stats = analysis['findings'].stats()
+    engines = ', '.join(f"{engine} {count}건" for engine, count in sorted(stats['by_engine'].items()))
+    sections.append(f"=== 통합 결과 ===\n고유 결과 {stats['unique']}건 (중복 {stats['duplicates']}건 제거)"
+                    + (f": {engines}" if engines else "")
+                    + (f"\n이전 실행에서 이어받은 결과 {analysis['carried']}건 (변경 영향 없음)" if analysis.get('carried') else ""))
+    return '\n\n'.join(sections)
@@ -0,0 +1,280 @@
+# project.py
+# Foundry 프로젝트 소스 탐색 (include/exclude 패턴 기반) 및 Solidity import 의존성 그래프
+
+import os
+import re
+from functools import lru_cache
+from .cache import DiskCache, sha256_text
+from .config import IMPORT_GRAPH_CONFIG, PROJECT_CONFIG
+
+# 주석 처리된 import/contract 선언을 잘못 읽지 않도록 파싱 전에 제거
+_COMMENTS = re.compile(r'//[^\n]*|/\*.*?\*/', re.DOTALL)
+# import "a.sol"; import "a.sol" as A; import * as A from "a.sol"; import {A, B as C} from "a.sol";
+_IMPORT = re.compile(r'\bimport\s+(?:[^;"\']*?\bfrom\s+)?["\']([^"\']+)["\']')
+_DECLARATION = re.compile(r'^\s*(abstract\s+contract|contract|library|interface)\s+([A-Za-z_$][\w$]*)', re.MULTILINE)
+# foundry.toml의 remappings = ["a/=lib/a/src/", ...]
+_TOML_REMAPPINGS = re.compile(r'^\s*remappings\s*=\s*\[(.*?)\]', re.MULTILINE | re.DOTALL)
+
+@lru_cache(maxsize=256)
+def _glob_to_regex(pattern):
+    """
+    glob 패턴을 정규식으로 변환합니다.
+    '**/'는 0개 이상의 디렉터리, '*'와 '?'는 경로 구분자를 넘지 않는 문자와 매칭됩니다.
+    """
+    regex = ''
+    i = 0
+    while i < len(pattern):
+        if pattern.startswith('**/', i):
+            regex += '(?:.*/)?'
+            i += 3
+        elif pattern.startswith('**', i):
+            regex += '.*'
+            i += 2
+        elif pattern[i] == '*':
+            regex += '[^/]*'
+            i += 1
+        elif pattern[i] == '?':
+            regex += '[^/]'
+            i += 1
+        else:
+            regex += re.escape(pattern[i])
+            i += 1
+    return re.compile(regex + r'\Z')
+
+def match_any(rel_path, patterns):
+    """
+    프로젝트 기준 상대 경로(posix)가 패턴 중 하나와 일치하는지 확인합니다.
+    """
+    return any(_glob_to_regex(pattern).match(rel_path) for pattern in patterns)
+
+def _is_excluded_dir(rel_dir, exclude):
+    """
+    'dir/**' 형태의 제외 패턴에 해당하는 디렉터리는 하위 탐색 자체를 생략합니다.
+    """
+    for pattern in exclude:
+        if pattern.endswith('/**') and _glob_to_regex(pattern[:-3]).match(rel_dir):
+            return True
+    return False
+
+def discover_sources(project_dir, include=None, exclude=None):
+    """
+    Foundry 프로젝트에서 분석 대상 .sol 파일을 하위 디렉터리까지 모두 찾습니다.
+
+    Args:
+        project_dir: Foundry 프로젝트 디렉토리 경로
+        include: 포함할 glob 패턴 목록 (없으면 설정값 사용)
+        exclude: 제외할 glob 패턴 목록 (없으면 설정값 사용)
+
+    Returns:
+        프로젝트 기준 상대 경로(posix) 목록 (정렬됨)
+    """
+    include = list(include or PROJECT_CONFIG['include'])
+    exclude = list(exclude or PROJECT_CONFIG['exclude'])
+    root = os.path.abspath(project_dir)
+
+    sources = []
+    for current, dirnames, filenames in os.walk(root):
+        rel_current = os.path.relpath(current, root).replace(os.sep, '/')
+        rel_current = '' if rel_current == '.' else rel_current + '/'
+        dirnames[:] = sorted(
+            name for name in dirnames
+            if not name.startswith('.') and not _is_excluded_dir(rel_current + name, exclude)
+        )
+        for filename in filenames:
+            if not filename.endswith('.sol'):
+                continue
+            rel_path = rel_current + filename
+            if match_any(rel_path, include) and not match_any(rel_path, exclude):
+                sources.append(rel_path)
+    return sorted(sources)
+
+def shard_files(files, shard_count, weight=None):
+    """
+    파일 목록을 크기(가중치) 기준으로 균형 있게 샤드로 분할합니다. (가장 큰 파일부터 가장 가벼운 샤드에 배치)
+
+    Args:
+        files: 파일 목록
+        shard_count: 샤드 수
+        weight: 파일 -> 가중치 함수 (기본값: 1)
+
+    Returns:
+        비어 있지 않은 샤드 목록 (각 샤드 내부는 입력 순서 유지)
+    """
+    shard_count = max(1, min(shard_count, len(files)))
+    weight = weight or (lambda _: 1)
+    order = {path: i for i, path in enumerate(files)}
+    shards = [[] for _ in range(shard_count)]
+    loads = [0] * shard_count
+    for path in sorted(files, key=weight, reverse=True):
+        lightest = loads.index(min(loads))
+        shards[lightest].append(path)
+        loads[lightest] += weight(path)
+    return [sorted(shard, key=order.get) for shard in shards if shard]
+
+def load_remappings(project_dir):
+    """
+    Foundry 프로젝트의 import remapping 목록을 만듭니다.
+    remappings.txt, foundry.toml의 remappings 설정, lib/ 하위 의존성의 기본 remapping(이름/ -> lib/이름/src/) 순으로
+    먼저 나온 접두어가 우선합니다. (컨텍스트 지정 'context:prefix=target'은 접두어만 사용)
+
+    Returns:
+        [(접두어, 프로젝트 기준 대상 경로)] (긴 접두어 우선 정렬)
+    """
+    lines = []
+    try:
+        with open(os.path.join(project_dir, 'remappings.txt'), 'r', encoding='utf-8') as f:
+            lines += f.read().splitlines()
+    except OSError:
+        pass
+    try:
+        with open(os.path.join(project_dir, 'foundry.toml'), 'r', encoding='utf-8') as f:
+            match = _TOML_REMAPPINGS.search(f.read())
+        if match:
+            lines += re.findall(r'["\']([^"\']+)["\']', match.group(1))
+    except OSError:
+        pass
+    lib_dir = os.path.join(project_dir, 'lib')
+    if os.path.isdir(lib_dir):
+        for name in sorted(os.listdir(lib_dir)):
+            if os.path.isdir(os.path.join(lib_dir, name, 'src')):
+                lines.append(f"{name}/=lib/{name}/src/")
+            elif os.path.isdir(os.path.join(lib_dir, name)):
+                lines.append(f"{name}/=lib/{name}/")
+
+    remappings = {}
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith('#') or '=' not in line:
+            continue
+        prefix, target = line.split('=', 1)
+        prefix = prefix.split(':', 1)[-1]
+        remappings.setdefault(prefix, target[2:] if target.startswith('./') else target)
+    return sorted(remappings.items(), key=lambda item: len(item[0]), reverse=True)
+
+def parse_imports(text):
+    """
+    Solidity 소스의 import 경로 목록을 반환합니다.
+    """
+    return _IMPORT.findall(_COMMENTS.sub('', text))
+
+def parse_declarations(text):
+    """
+    Solidity 소스에 선언된 (종류, 이름) 목록을 반환합니다. (종류: contract, abstract, library, interface)
+    """
+    return [(kind.split()[0], name) for kind, name in _DECLARATION.findall(_COMMENTS.sub('', text))]
+
+def resolve_import(project_dir, importer, path, remappings, files=None):
+    """
+    import 경로를 프로젝트 기준 상대 경로로 해석합니다. (상대 경로 -> remapping -> 프로젝트 루트 기준)
+    files(현재 파일 집합)를 지정하면 디스크 대신 그 집합에서 존재 여부를 확인합니다.
+
+    Returns:
+        존재하는 파일의 상대 경로(posix), 찾지 못하면 None
+    """
+    if path.startswith(('./', '../')):
+        candidates = [os.path.normpath(os.path.join(os.path.dirname(importer), path))]
+    else:
+        candidates = [target + path[len(prefix):] for prefix, target in remappings if path.startswith(prefix)]
+        candidates.append(path)
+    for candidate in candidates:
+        candidate = os.path.normpath(candidate).replace(os.sep, '/')
+        if candidate.startswith('../'):
+            continue
+        if candidate in files if files is not None else os.path.isfile(os.path.join(project_dir, candidate)):
+            return candidate
+    return None
+
+class ImportGraph:
+    """
+    Foundry 프로젝트의 Solidity import 의존성 그래프 (파일 -> import하는 파일, 역방향 인덱스 포함)
+    파일별 파싱 결과(import 문자열, 선언)는 (경로, 수정 시각, 크기) 기준으로 디스크에 캐시하여 바뀐 파일만 다시 읽고,
+    import 경로 해석은 파일이 새로 생기거나 지워질 수 있으므로 매번 현재 파일 목록과 remapping으로 다시 합니다.
+    """
+
+    def __init__(self, project_dir):
+        self.project_dir = os.path.abspath(project_dir)
+        self.imports = {}  # 파일 -> import하는 파일 집합
+        self.importers = {}  # 파일 -> 이 파일을 import하는 파일 집합
+        self.declarations = {}  # 파일 -> [(종류, 이름)]
+
+    def _stamps(self):
+        stamps = {}
+        for source_dir in IMPORT_GRAPH_CONFIG['dirs']:
+            root = os.path.join(self.project_dir, source_dir)
+            for current, dirnames, filenames in os.walk(root):
+                dirnames[:] = sorted(name for name in dirnames if not name.startswith('.'))
+                for filename in filenames:
+                    if filename.endswith('.sol'):
+                        path = os.path.join(current, filename)
+                        stat = os.stat(path)
+                        rel_path = os.path.relpath(path, self.project_dir).replace(os.sep, '/')
+                        stamps[rel_path] = (stat.st_mtime_ns, stat.st_size)
+        return stamps
+
+    def build(self):
+        """
+        그래프를 만듭니다.
+
+        Returns:
+            다시 파싱한 파일 수
+        """
+        remappings = load_remappings(self.project_dir)
+        stamps = self._stamps()
+        keys = {rel_path: sha256_text('imports-raw', self.project_dir, rel_path, *stamp)
+                for rel_path, stamp in stamps.items()}
+        parsed = 0
+        with DiskCache('imports', IMPORT_GRAPH_CONFIG['cache_max_bytes']) as cache:
+            cached = cache.get_many(keys.values())
+            fresh = {}
+            for rel_path, key in keys.items():
+                entry = cached.get(key)
+                if entry is None:
+                    try:
+                        with open(os.path.join(self.project_dir, rel_path), 'r', encoding='utf-8', errors='replace') as f:
+                            text = f.read()
+                    except OSError:
+                        continue
+                    entry = fresh[key] = {
+                        'imports': sorted(set(parse_imports(text))),
+                        'declarations': parse_declarations(text),
+                    }
+                    parsed += 1
+                resolved = (resolve_import(self.project_dir, rel_path, path, remappings, stamps)
+                            for path in entry['imports'])
+                self.imports[rel_path] = {path for path in resolved if path}
+                self.declarations[rel_path] = [tuple(item) for item in entry['declarations']]
+            if fresh:
+                cache.put_many(fresh)
+
+        for rel_path, imported in self.imports.items():
+            for target in imported:
+                self.importers.setdefault(target, set()).add(rel_path)
+        return parsed
+
+    def dependents(self, files):
+        """
+        주어진 파일들과 이들을 직접·간접적으로 import하는 모든 파일의 집합을 반환합니다.
+        """
+        affected = set(files)
+        stack = list(affected)
+        while stack:
+            for importer in self.importers.get(stack.pop(), ()):
+                if importer not in affected:
+                    affected.add(importer)
+                    stack.append(importer)
+        return affected
+
+    def contracts(self, files, kinds=None):
+        """
+        파일들에 선언된 컨트랙트 이름 집합 (kinds를 지정하면 해당 종류만)
+        """
+        return {name for rel_path in files for kind, name in self.declarations.get(rel_path, ())
+                if kinds is None or kind in kinds}
+
+def build_import_graph(project_dir):
+    """
+    프로젝트의 import 그래프를 만들어 반환합니다.
+    """
+    graph = ImportGraph(project_dir)
+    graph.build()
+    return graph
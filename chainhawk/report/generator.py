@@ -1,2 +1,164 @@
 # generator.py
-# 통합 분석 결과 보고서 생성 
\ No newline at end of file
+# 통합 분석 결과 보고서 생성: Finding 스트림을 받는 즉시 SARIF 2.1.0 / JSON Lines / 한글 텍스트로 파일이나 표준 출력에 기록
+
+import json
+import sys
+import threading
+from contextlib import ExitStack, contextmanager, redirect_stdout
+
+REPORT_FORMATS = ('text', 'jsonl', 'sarif')
+
+SARIF_SCHEMA = 'https://json.schemastore.org/sarif-2.1.0.json'
+# 공통 심각도 -> SARIF level
+_SARIF_LEVELS = {
+    'critical': 'error',
+    'high': 'error',
+    'medium': 'warning',
+    'low': 'note',
+    'info': 'note',
+}
+
+class ReportWriter:
+    """
+    Finding을 하나씩 받아 바로 출력하는 보고서 작성기 (결과를 모아두지 않으므로 메모리 사용량이 결과 수와 무관)
+    여러 엔진 단계가 동시에 기록할 수 있도록 write는 잠금으로 보호합니다.
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.count = 0
+        self.record = None  # 보고서에 쓴 결과를 함께 받을 기록기 (result.store.RunRecorder)
+        self._lock = threading.Lock()
+
+    def begin(self):
+        pass
+
+    def write(self, finding):
+        with self._lock:
+            self._write(finding)
+            self.count += 1
+            # 스캔이 끝나기 전에도 결과가 보이도록 즉시 내보냄
+            self.stream.flush()
+        if self.record is not None:
+            self.record.write(finding)
+
+    def _write(self, finding):
+        raise NotImplementedError
+
+    def end(self):
+        pass
+
+class TextReportWriter(ReportWriter):
+    """
+    기존 한글 보고서 형식
+    """
+
+    def _write(self, finding):
+        if self.count == 0:
+            self.stream.write("다음과 같은 취약점이 발견되었습니다:\n\n")
+        location = f"{finding.file}:{finding.start_line or '?'}" if finding.file else (finding.contract or '?')
+        self.stream.write(f"[취약점] {finding.rule}\n")
+        self.stream.write(f"위치: {location}\n")
+        self.stream.write(f"설명: {finding.message or '설명 없음'}\n")
+        self.stream.write("-" * 80 + "\n")
+
+    def end(self):
+        if self.count == 0:
+            self.stream.write("분석 완료: 취약점이 발견되지 않았습니다.\n")
+        self.stream.flush()
+
+class JsonLinesReportWriter(ReportWriter):
+    """
+    결과 하나당 JSON 객체 한 줄
+    """
+
+    def _write(self, finding):
+        self.stream.write(json.dumps(finding.to_dict(), ensure_ascii=False))
+        self.stream.write('\n')
+
+class SarifReportWriter(ReportWriter):
+    """
+    SARIF 2.1.0 로그 (run 하나, 결과 배열을 스트리밍으로 기록)
+    룰 메타데이터 없이 ruleId만 기록하며, 엔진·컨트랙트·함수는 result.properties에 넣습니다.
+    """
+
+    def __init__(self, stream, tool_version=None):
+        super().__init__(stream)
+        self.tool_version = tool_version
+
+    def begin(self):
+        driver = {'name': 'chainhawk'}
+        if self.tool_version:
+            driver['version'] = self.tool_version
+        header = json.dumps({'$schema': SARIF_SCHEMA, 'version': '2.1.0'}, ensure_ascii=False)[:-1]
+        self.stream.write(f'{header}, "runs": [{{"tool": {{"driver": {json.dumps(driver)}}}, "results": [\n')
+
+    def _write(self, finding):
+        if self.count:
+            self.stream.write(',\n')
+        self.stream.write(json.dumps(sarif_result(finding), ensure_ascii=False))
+
+    def end(self):
+        self.stream.write('\n]}]}\n')
+        self.stream.flush()
+
+def sarif_result(finding):
+    """
+    Finding을 SARIF result 객체로 변환합니다.
+    """
+    result = {
+        'ruleId': finding.rule,
+        'level': _SARIF_LEVELS.get(finding.severity, 'note'),
+        'message': {'text': finding.message or finding.rule},
+        'partialFingerprints': {'chainhawk/v1': finding.fingerprint_hex},
+        'properties': {'engine': finding.engine, 'severity': finding.severity},
+    }
+    if finding.file:
+        region = {}
+        if finding.start_line:
+            region = {'startLine': finding.start_line, 'endLine': finding.end_line or finding.start_line}
+        location = {'physicalLocation': {'artifactLocation': {'uri': finding.file}}}
+        if region:
+            location['physicalLocation']['region'] = region
+        result['locations'] = [location]
+    if finding.contract or finding.function:
+        name = '.'.join(part for part in (finding.contract, finding.function) if part)
+        result.setdefault('locations', [{}])[0]['logicalLocations'] = [{'fullyQualifiedName': name}]
+    if finding.contract:
+        result['properties']['contract'] = finding.contract
+    if finding.function:
+        result['properties']['function'] = finding.function
+    if finding.count > 1:
+        result['properties']['occurrences'] = finding.count
+    return result
+
+_WRITERS = {
+    'text': TextReportWriter,
+    'jsonl': JsonLinesReportWriter,
+    'sarif': SarifReportWriter,
+}
+
+@contextmanager
+def open_report(report_format='text', output=None, record=None):
+    """
+    보고서 작성기를 엽니다. output이 없거나 '-'이면 표준 출력에 기록합니다.
+    record(RunRecorder)를 지정하면 보고서에 쓴 결과를 실행 기록에도 함께 기록합니다.
+    기계 판독 형식(jsonl, sarif)이 표준 출력을 차지하면 블록 안의 print 출력(진행·디버그 메시지)은 표준 오류로 보냅니다.
+    엔진이 예외로 끝나도 end()를 호출하여 문서(SARIF 배열 등)를 닫습니다.
+    """
+    if report_format not in _WRITERS:
+        raise RuntimeError(f"지원하지 않는 보고서 형식입니다: {report_format}")
+    with ExitStack() as stack:
+        if output and output != '-':
+            stream = stack.enter_context(open(output, 'w', encoding='utf-8'))
+        else:
+            stream = sys.stdout
+            if report_format != 'text':
+                stack.enter_context(redirect_stdout(sys.stderr))
+        writer = _WRITERS[report_format](stream)
+        writer.record = record
+        writer.begin()
+        try:
+            yield writer
+        finally:
+            writer.end()
@@ -1,2 +1,254 @@
 # aggregator.py
-# 다중 도구 결과 집계 및 분석 
\ No newline at end of file
+# 다중 도구 결과 집계 및 분석: 엔진별 결과를 공통 Finding으로 정규화하고 지문(fingerprint) 인덱스로 중복 제거
+
+import hashlib
+import re
+import sys
+
+# 엔진별 심각도를 공통 등급으로 변환
+SEVERITY_LEVELS = ('critical', 'high', 'medium', 'low', 'info')
+_SEVERITY_ALIASES = {
+    'error': 'high',
+    'warning': 'medium',
+    'info': 'info',
+    'inventory': 'info',
+    'experiment': 'info',
+}
+# 지문 계산 시 지우는 실행마다 달라지는 값 (주소, 해시, 숫자)
+_VOLATILE = re.compile(r'0x[0-9a-fA-F]+|\d+')
+
+def _intern(value):
+    # 엔진/룰/파일/심각도처럼 반복되는 문자열은 한 번만 저장
+    return sys.intern(value) if isinstance(value, str) else value
+
+def normalize_severity(severity):
+    severity = (severity or 'info').lower()
+    return severity if severity in SEVERITY_LEVELS else _SEVERITY_ALIASES.get(severity, 'info')
+
+def normalize_rule(rule):
+    """
+    룰 id에서 룰셋 경로로부터 붙는 접두사(예: 'rules.reentrancy.')를 제거합니다. (룰셋 위치가 달라도 같은 지문)
+    """
+    return (rule or '').rsplit('.', 1)[-1]
+
+def normalize_source(source):
+    """
+    매칭된 소스의 공백·줄바꿈 차이를 없앱니다. (들여쓰기나 줄 나눔만 바뀐 코드는 같은 지문)
+    """
+    return ' '.join(source.split())
+
+def compute_fingerprint(rule, file, start_line=None, end_line=None, contract=None, function=None, source=None,
+                        occurrence=0):
+    """
+    결과 위치와 룰로 지문을 계산합니다. 엔진·실행과 무관하게 같은 문제는 같은 지문을 갖습니다.
+    source(매칭된 소스)가 주어지면 줄 번호 대신 정규화한 소스와 발생 순번으로 계산하므로,
+    위쪽 코드가 바뀌어 줄이 밀려도 같은 결과는 같은 지문을 유지합니다.
+
+    Returns:
+        16바이트 다이제스트 (hex 문자열보다 작게 저장)
+    """
+    if source is not None:
+        location = ('source', hashlib.blake2b(normalize_source(source).encode('utf-8'), digest_size=16).hexdigest(),
+                    occurrence)
+    else:
+        location = (start_line or 0, end_line or 0)
+    parts = (normalize_rule(rule), file or '', *location, contract or '', function or '')
+    return hashlib.blake2b('\0'.join(str(part) for part in parts).encode('utf-8'), digest_size=16).digest()
+
+class Finding:
+    """
+    엔진 공통 결과 레코드
+    원본 JSON을 보관하지 않고 필요한 필드만 __slots__로 저장하여 결과가 수십만 건이어도 메모리를 적게 씁니다.
+    """
+
+    __slots__ = ('engine', 'rule', 'file', 'start_line', 'end_line', 'contract', 'function', 'severity',
+                 'message', 'fingerprint', 'count')
+
+    def __init__(self, engine, rule, file=None, start_line=None, end_line=None, contract=None, function=None,
+                 severity='info', message='', fingerprint=None):
+        self.engine = _intern(engine)
+        self.rule = _intern(rule)
+        self.file = _intern(file)
+        self.start_line = start_line
+        self.end_line = end_line if end_line is not None else start_line
+        self.contract = _intern(contract)
+        self.function = function
+        self.severity = _intern(normalize_severity(severity))
+        self.message = message
+        self.fingerprint = fingerprint or compute_fingerprint(rule, file, start_line, self.end_line, contract, function)
+        self.count = 1  # 중복 제거 과정에서 합쳐진 원본 결과 수
+
+    @property
+    def fingerprint_hex(self):
+        return self.fingerprint.hex()
+
+    def sort_key(self):
+        return (self.file or '', self.start_line or 0, self.rule or '', self.engine)
+
+    def to_dict(self):
+        return {
+            'engine': self.engine,
+            'rule': self.rule,
+            'file': self.file,
+            'start_line': self.start_line,
+            'end_line': self.end_line,
+            'contract': self.contract,
+            'function': self.function,
+            'severity': self.severity,
+            'message': self.message,
+            'fingerprint': self.fingerprint_hex,
+            'count': self.count,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        to_dict 결과(이전 실행 기록 등)에서 Finding을 복원합니다.
+        """
+        finding = cls(data['engine'], data['rule'], data.get('file'), data.get('start_line'), data.get('end_line'),
+                      data.get('contract'), data.get('function'), data.get('severity'), data.get('message', ''),
+                      bytes.fromhex(data['fingerprint']))
+        finding.count = data.get('count', 1)
+        return finding
+
+    def __repr__(self):
+        return f'Finding({self.engine}, {self.rule}, {self.file}:{self.start_line})'
+
+def semgrep_finding(result, source=None, contract=None, function=None, occurrence=0):
+    """
+    Semgrep JSON 결과 하나를 Finding으로 변환합니다. (extra.lines 등 큰 필드는 버림)
+    source(매칭된 소스)가 주어지면 지문은 룰·파일·컨트랙트·함수·소스·발생 순번으로 계산하고
+    줄 번호는 위치 정보로만 남깁니다.
+    """
+    extra = result.get('extra') or {}
+    rule = result.get('check_id', 'Unknown')
+    path = result.get('path', '')
+    fingerprint = None
+    if source is not None:
+        fingerprint = compute_fingerprint(rule, path, contract=contract, function=function, source=source,
+                                          occurrence=occurrence)
+    return Finding(
+        'semgrep',
+        rule,
+        path,
+        (result.get('start') or {}).get('line'),
+        (result.get('end') or {}).get('line'),
+        contract,
+        function,
+        severity=extra.get('severity'),
+        message=extra.get('message', ''),
+        fingerprint=fingerprint,
+    )
+
+def _start_position(result):
+    start = result.get('start') or {}
+    offset = start.get('offset')
+    return (result.get('path', ''), offset if offset is not None else -1, start.get('line') or 0, start.get('col') or 0)
+
+def semgrep_findings(results, locate=None):
+    """
+    Semgrep 결과 목록을 Finding 목록으로 변환합니다.
+    같은 룰이 같은 컨트랙트·함수에서 같은 소스에 여러 번 매칭되면 위치 순서대로 발생 순번을 붙여 지문을 구분합니다.
+    (순번이 실행마다 같도록 results는 룰셋 하나가 파일 하나에서 낸 결과를 모두 포함해야 함)
+
+    Args:
+        locate: 결과 하나의 (매칭된 소스, 컨트랙트, 함수)를 반환하는 함수 (없으면 줄 번호 기반 지문)
+    """
+    ordinals = {}  # (룰, 파일, 컨트랙트, 함수, 소스) -> {시작 위치: 발생 순번}
+    findings = []
+    for result in sorted(results, key=_start_position):
+        source, contract, function = locate(result) if locate is not None else (None, None, None)
+        occurrence = 0
+        if source is not None:
+            key = (normalize_rule(result.get('check_id')), result.get('path', ''), contract, function,
+                   normalize_source(source))
+            positions = ordinals.setdefault(key, {})
+            occurrence = positions.setdefault(_start_position(result), len(positions))
+        findings.append(semgrep_finding(result, source, contract, function, occurrence))
+    return findings
+
+def ityfuzz_finding(bug, contract=None):
+    """
+    ITYfuzz 캠페인 버그 항목을 Finding으로 변환합니다.
+    버그 보고서의 지문은 주소·숫자를 지운 내용 기준이므로 실행이 달라도 같은 버그는 같은 지문을 갖습니다.
+    """
+    title = bug.get('title') or ''
+    oracle = _VOLATILE.sub('#', title).strip() or 'objective'
+    contract = bug.get('target') or contract
+    fingerprint = compute_fingerprint(oracle, bug.get('fingerprint') or '', contract=contract)
+    return Finding('ityfuzz', oracle, bug.get('path'), contract=contract, severity='high', message=title,
+                   fingerprint=fingerprint)
+
+def halmos_finding(bug):
+    """
+    Halmos 반례 항목을 Finding으로 변환합니다. (속성 함수 단위: 같은 함수의 반례는 값이 달라도 같은 지문)
+    """
+    counterexample = ', '.join(bug.get('counterexample') or [])
+    message = f"{bug['contract']}.{bug['signature']} 속성 위반" + (f" (반례: {counterexample})" if counterexample else "")
+    return Finding('halmos', bug['name'], bug.get('source'), contract=bug['contract'], function=bug['signature'],
+                   severity='high', message=message)
+
+class FindingAggregator:
+    """
+    여러 룰·엔진·실행의 Finding을 지문 해시 인덱스로 중복 제거하여 모으는 집계기
+    같은 지문이 다시 들어오면 새 레코드를 만들지 않고 count만 늘리며, 더 높은 심각도를 유지합니다.
+    """
+
+    def __init__(self):
+        self._index = {}  # 지문 -> Finding
+        self.total = 0  # 중복 포함 입력 수
+
+    def add(self, finding):
+        """
+        Returns:
+            처음 보는 결과이면 True
+        """
+        self.total += 1
+        existing = self._index.get(finding.fingerprint)
+        if existing is None:
+            self._index[finding.fingerprint] = finding
+            return True
+        existing.count += finding.count
+        if SEVERITY_LEVELS.index(finding.severity) < SEVERITY_LEVELS.index(existing.severity):
+            existing.severity = finding.severity
+        return False
+
+    def extend(self, findings):
+        """
+        Returns:
+            새로 추가된 결과 수
+        """
+        return sum(1 for finding in findings if self.add(finding))
+
+    def get(self, fingerprint):
+        if isinstance(fingerprint, str):
+            fingerprint = bytes.fromhex(fingerprint)
+        return self._index.get(fingerprint)
+
+    def __contains__(self, fingerprint):
+        return self.get(fingerprint) is not None
+
+    def __len__(self):
+        return len(self._index)
+
+    def __iter__(self):
+        return iter(self._index.values())
+
+    def sorted(self):
+        """
+        파일·줄 순서로 정렬한 결과 목록
+        """
+        return sorted(self._index.values(), key=Finding.sort_key)
+
+    def stats(self):
+        by_engine, by_severity = {}, {}
+        for finding in self._index.values():
+            by_engine[finding.engine] = by_engine.get(finding.engine, 0) + 1
+            by_severity[finding.severity] = by_severity.get(finding.severity, 0) + 1
+        return {
+            'total': self.total,
+            'unique': len(self._index),
+            'duplicates': self.total - len(self._index),
+            'by_engine': by_engine,
+            'by_severity': by_severity,
+        }
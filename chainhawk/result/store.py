@@ -0,0 +1,341 @@
+# store.py
+# 분석 실행 기록 저장소 (SQLite): 실행·대상·결과(지문 기준)·단계별 실행 시간을 보관하고 두 실행의 결과를 비교
+
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from ..config import STORE_CONFIG
+from .aggregator import Finding
+
+_SCHEMA = (
+    'CREATE TABLE IF NOT EXISTS runs ('
+    ' id INTEGER PRIMARY KEY, project TEXT NOT NULL, engines TEXT NOT NULL, since TEXT,'
+    ' status TEXT NOT NULL, started REAL NOT NULL, finished REAL)',
+    'CREATE INDEX IF NOT EXISTS runs_project ON runs(project, id)',
+    # 엔진별 완료 여부: 실패한 엔진의 결과는 비교·증분 분석 기준에서 제외
+    'CREATE TABLE IF NOT EXISTS run_engines ('
+    ' run_id INTEGER NOT NULL, engine TEXT NOT NULL, status TEXT NOT NULL,'
+    ' PRIMARY KEY (run_id, engine)) WITHOUT ROWID',
+    'CREATE TABLE IF NOT EXISTS targets ('
+    ' run_id INTEGER NOT NULL, engine TEXT NOT NULL, name TEXT NOT NULL, status TEXT,'
+    ' PRIMARY KEY (run_id, engine, name)) WITHOUT ROWID',
+    # 실행별 지문이 기본 키이므로 비교 쿼리는 인덱스 조회만으로 끝남 (결과가 수백만 건이어도 실행 크기에 비례)
+    'CREATE TABLE IF NOT EXISTS findings ('
+    ' run_id INTEGER NOT NULL, fingerprint BLOB NOT NULL, engine TEXT NOT NULL, rule TEXT NOT NULL,'
+    ' file TEXT, start_line INTEGER, end_line INTEGER, contract TEXT, function TEXT,'
+    ' severity TEXT NOT NULL, message TEXT, count INTEGER NOT NULL,'
+    ' PRIMARY KEY (run_id, fingerprint)) WITHOUT ROWID',
+    'CREATE TABLE IF NOT EXISTS stage_timings ('
+    ' run_id INTEGER NOT NULL, stage TEXT NOT NULL, seconds REAL NOT NULL,'
+    ' PRIMARY KEY (run_id, stage)) WITHOUT ROWID',
+)
+_FINDING_COLUMNS = ('engine', 'rule', 'file', 'start_line', 'end_line', 'contract', 'function', 'severity',
+                    'message', 'count', 'fingerprint')
+
+def store_path():
+    """
+    저장소 파일 경로를 반환합니다. 기본 위치는 $XDG_DATA_HOME/chainhawk 또는 ~/.local/share/chainhawk 입니다.
+    """
+    path = STORE_CONFIG['path'] or os.environ.get('CHAINHAWK_STORE')
+    if not path:
+        base = os.environ.get('XDG_DATA_HOME') or os.path.join(os.path.expanduser('~'), '.local', 'share')
+        path = os.path.join(base, 'chainhawk', 'history.sqlite3')
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    return path
+
+def _finding_row(run_id, finding):
+    return (run_id, finding.fingerprint, finding.engine, finding.rule, finding.file, finding.start_line,
+            finding.end_line, finding.contract, finding.function, finding.severity, finding.message, finding.count)
+
+def _row_finding(row):
+    data = dict(zip(_FINDING_COLUMNS, row))
+    finding = Finding(data['engine'], data['rule'], data['file'], data['start_line'], data['end_line'],
+                      data['contract'], data['function'], data['severity'], data['message'] or '',
+                      bytes(data['fingerprint']))
+    finding.count = data['count']
+    return finding
+
+class FindingStore:
+    """
+    실행 기록 저장소
+    쓰기는 여러 건을 하나의 트랜잭션으로 묶어 executemany로 기록합니다. (여러 단계 스레드가 공유할 수 있도록 잠금 사용)
+    """
+
+    def __init__(self, path=None):
+        self.path = path or store_path()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('PRAGMA synchronous=NORMAL')
+        self._lock = threading.Lock()
+        with self._conn:
+            for statement in _SCHEMA:
+                self._conn.execute(statement)
+
+    def begin_run(self, project, engines, since=None):
+        """
+        새 실행을 기록합니다.
+
+        Returns:
+            실행 id
+        """
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                'INSERT INTO runs (project, engines, since, status, started) VALUES (?, ?, ?, ?, ?)',
+                (os.path.abspath(project), ','.join(engines), since, 'running', time.time())
+            )
+            self._conn.executemany('INSERT INTO run_engines (run_id, engine, status) VALUES (?, ?, ?)',
+                                   [(cursor.lastrowid, engine, 'running') for engine in engines])
+            return cursor.lastrowid
+
+    def set_engine_status(self, run_id, engine, status):
+        """
+        엔진 하나의 실행 결과 상태를 기록합니다. (completed 또는 failed)
+        """
+        with self._lock, self._conn:
+            self._conn.execute('UPDATE run_engines SET status = ? WHERE run_id = ? AND engine = ?', (status, run_id, engine))
+
+    def finish_run(self, run_id, failed=False):
+        """
+        실행을 끝냅니다. 상태를 기록하지 않은 엔진은 실행이 정상 종료되었으면 completed, 아니면 failed로 표시하고,
+        실행 상태는 failed(예외로 중단), partial(일부 엔진 실패), completed 중 하나가 됩니다.
+        """
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE run_engines SET status = ? WHERE run_id = ? AND status = 'running'",
+                               ('failed' if failed else 'completed', run_id))
+            engine_failed = self._conn.execute(
+                "SELECT 1 FROM run_engines WHERE run_id = ? AND status = 'failed' LIMIT 1", (run_id,)
+            ).fetchone()
+            status = 'failed' if failed else 'partial' if engine_failed else 'completed'
+            self._conn.execute('UPDATE runs SET status = ?, finished = ? WHERE id = ?', (status, time.time(), run_id))
+
+    def add_findings(self, run_id, findings):
+        """
+        결과를 한 트랜잭션으로 기록합니다. 같은 실행에 같은 지문이 다시 들어오면 count를 합칩니다.
+        """
+        rows = [_finding_row(run_id, finding) for finding in findings]
+        if not rows:
+            return
+        with self._lock, self._conn:
+            self._conn.executemany(
+                'INSERT INTO findings (run_id, fingerprint, engine, rule, file, start_line, end_line, contract,'
+                ' function, severity, message, count) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)'
+                ' ON CONFLICT (run_id, fingerprint) DO UPDATE SET count = count + excluded.count', rows
+            )
+
+    def add_targets(self, run_id, targets):
+        """
+        Args:
+            targets: [(엔진, 대상 이름, 상태)]
+        """
+        with self._lock, self._conn:
+            self._conn.executemany('INSERT OR REPLACE INTO targets (run_id, engine, name, status) VALUES (?, ?, ?, ?)',
+                                   [(run_id,) + tuple(target) for target in targets])
+
+    def add_timings(self, run_id, timings):
+        """
+        Args:
+            timings: {단계 이름: 실행 시간(초)}
+        """
+        with self._lock, self._conn:
+            self._conn.executemany('INSERT OR REPLACE INTO stage_timings (run_id, stage, seconds) VALUES (?, ?, ?)',
+                                   [(run_id, stage, seconds) for stage, seconds in timings.items()])
+
+    def get_run(self, run_id):
+        row = self._conn.execute(
+            'SELECT id, project, engines, since, status, started, finished FROM runs WHERE id = ?', (run_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        keys = ('id', 'project', 'engines', 'since', 'status', 'started', 'finished')
+        run = dict(zip(keys, row))
+        run['engines'] = run['engines'].split(',') if run['engines'] else []
+        run['engine_status'] = dict(self._conn.execute('SELECT engine, status FROM run_engines WHERE run_id = ?', (run_id,)))
+        return run
+
+    def completed_engines(self, run_id):
+        return {engine for (engine,) in self._conn.execute(
+            "SELECT engine FROM run_engines WHERE run_id = ? AND status = 'completed'", (run_id,))}
+
+    def runs(self, project=None, limit=20):
+        """
+        최근 실행 목록 (결과 수 포함, 최신순)
+        """
+        where, params = ('WHERE project = ?', [os.path.abspath(project)]) if project else ('', [])
+        rows = self._conn.execute(f'SELECT id FROM runs {where} ORDER BY id DESC LIMIT ?', params + [limit]).fetchall()
+        runs = []
+        for (run_id,) in rows:
+            run = self.get_run(run_id)
+            run['findings'] = self.count(run_id)
+            runs.append(run)
+        return runs
+
+    def resolve_run(self, ref, project=None):
+        """
+        실행 참조를 실행 id로 바꿉니다.
+
+        Args:
+            ref: 실행 id, 'latest'(모든 엔진이 완료된 가장 최근 실행) 또는 'latest~N'(그보다 N번째 이전 실행)
+            project: 'latest' 참조를 찾을 프로젝트 (None이면 모든 프로젝트)
+        """
+        ref = str(ref).strip()
+        if ref.isdigit():
+            if self.get_run(int(ref)) is None:
+                raise RuntimeError(f"실행 기록을 찾을 수 없습니다: #{ref}")
+            return int(ref)
+        name, _, back = ref.partition('~')
+        if name != 'latest' or (back and not back.isdigit()):
+            raise RuntimeError(f"잘못된 실행 참조입니다: {ref} (실행 id, latest, latest~N)")
+        where, params = "WHERE status = 'completed'", []
+        if project:
+            where += ' AND project = ?'
+            params.append(os.path.abspath(project))
+        row = self._conn.execute(f'SELECT id FROM runs {where} ORDER BY id DESC LIMIT 1 OFFSET ?',
+                                 params + [int(back or 0)]).fetchone()
+        if row is None:
+            raise RuntimeError(f"실행 기록을 찾을 수 없습니다: {ref}")
+        return row[0]
+
+    def latest_findings(self, project, engines):
+        """
+        엔진별로 해당 엔진이 완료된 가장 최근 실행의 결과를 반환합니다. (증분 분석의 기준, 실패한 엔진의 실행은 건너뜀)
+        """
+        findings = []
+        for engine in engines:
+            row = self._conn.execute(
+                "SELECT r.id FROM runs r JOIN run_engines e ON e.run_id = r.id AND e.engine = ?"
+                " WHERE r.project = ? AND r.status IN ('completed', 'partial') AND e.status = 'completed'"
+                " ORDER BY r.id DESC LIMIT 1", (engine, os.path.abspath(project))
+            ).fetchone()
+            if row is not None:
+                findings += self.findings(row[0], engine)
+        return findings
+
+    def findings(self, run_id, engine=None):
+        sql = f'SELECT {", ".join(_FINDING_COLUMNS)} FROM findings WHERE run_id = ?'
+        params = [run_id]
+        if engine:
+            sql += ' AND engine = ?'
+            params.append(engine)
+        return [_row_finding(row) for row in self._conn.execute(sql, params)]
+
+    def count(self, run_id, engines=None):
+        sql, params = 'SELECT COUNT(*) FROM findings WHERE run_id = ?', [run_id]
+        if engines is not None:
+            sql += f" AND engine IN ({', '.join('?' * len(engines))})"
+            params += sorted(engines)
+        return self._conn.execute(sql, params).fetchone()[0]
+
+    def diff(self, run_a, run_b, limit=None):
+        """
+        두 실행의 결과를 지문으로 비교합니다. (기본 키 (run_id, fingerprint) 인덱스 조회)
+        두 실행 모두에서 완료된 엔진의 결과만 비교하므로, 한쪽에서 실패한 엔진의 결과가 해결된 결과로 보이지 않습니다.
+        변경 없음 수는 한 번의 인덱스 조인으로 세고, 새 결과·해결된 결과 수는 실행별 전체 수에서 뺍니다.
+
+        Returns:
+            {'new': [Finding], 'fixed': [Finding], 'counts': {'new', 'fixed', 'unchanged'},
+             'engines': 비교한 엔진 집합, 'excluded': 한쪽이라도 완료되지 않아 제외한 엔진 집합}
+            (new: b에만 있음, fixed: a에만 있음, limit를 지정하면 목록은 그 수까지만)
+        """
+        completed_a, completed_b = self.completed_engines(run_a), self.completed_engines(run_b)
+        engines = completed_a & completed_b
+        excluded = (completed_a | completed_b | set(self.get_run(run_a)['engines']) | set(self.get_run(run_b)['engines'])) - engines
+        # 모든 엔진을 비교하면 엔진 조건 없이 기본 키만으로 조회
+        engine_filter, engine_params = '', ()
+        if excluded:
+            engine_filter = f" AND x.engine IN ({', '.join('?' * len(engines))})"
+            engine_params = tuple(sorted(engines))
+        columns = ', '.join(f'x.{column}' for column in _FINDING_COLUMNS)
+
+        def listed(left, right):
+            # 정렬 없이 지문 순으로 읽다가 limit에서 멈춤 (표시 순서는 가져온 목록에서만 정렬)
+            sql = (f'SELECT {columns} FROM findings x WHERE x.run_id = ?{engine_filter} AND NOT EXISTS '
+                   '(SELECT 1 FROM findings y WHERE y.run_id = ? AND y.fingerprint = x.fingerprint)')
+            params = (left,) + engine_params + (right,)
+            if limit:
+                sql += ' LIMIT ?'
+                params += (limit,)
+            findings = [_row_finding(row) for row in self._conn.execute(sql, params)]
+            return sorted(findings, key=lambda finding: (finding.file or '', finding.start_line or 0, finding.rule))
+
+        if not engines:
+            counts = {'new': 0, 'fixed': 0, 'unchanged': 0}
+            return {'new': [], 'fixed': [], 'counts': counts, 'engines': engines, 'excluded': excluded}
+        unchanged = self._conn.execute(
+            'SELECT COUNT(*) FROM findings x JOIN findings y ON y.run_id = ? AND y.fingerprint = x.fingerprint'
+            f' WHERE x.run_id = ?{engine_filter}', (run_b, run_a) + engine_params
+        ).fetchone()[0]
+        totals = engines if excluded else None
+        return {
+            'new': listed(run_b, run_a),
+            'fixed': listed(run_a, run_b),
+            'counts': {'new': self.count(run_b, totals) - unchanged, 'fixed': self.count(run_a, totals) - unchanged,
+                       'unchanged': unchanged},
+            'engines': engines,
+            'excluded': excluded,
+        }
+
+    def close(self):
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class RunRecorder:
+    """
+    진행 중인 실행 하나의 기록기
+    보고서 작성기와 같은 write(finding) 인터페이스로 결과를 받아 batch_size건씩 모아 한 트랜잭션으로 기록합니다.
+    """
+
+    def __init__(self, store, run_id, batch_size=None):
+        self.store = store
+        self.run_id = run_id
+        self.batch_size = batch_size or STORE_CONFIG['batch_size']
+        self._pending = []
+        self._lock = threading.Lock()
+
+    def write(self, finding):
+        with self._lock:
+            self._pending.append(finding)
+            if len(self._pending) < self.batch_size:
+                return
+            pending, self._pending = self._pending, []
+        self.store.add_findings(self.run_id, pending)
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, []
+        self.store.add_findings(self.run_id, pending)
+
+    def add_targets(self, targets):
+        self.store.add_targets(self.run_id, targets)
+
+    def set_engine_status(self, engine, status):
+        self.store.set_engine_status(self.run_id, engine, status)
+
+    def add_timings(self, timings):
+        self.store.add_timings(self.run_id, timings)
+
+@contextmanager
+def open_run(project, engines, since=None, path=None):
+    """
+    실행 기록을 시작하고 RunRecorder를 반환합니다. 블록이 끝나면 남은 결과를 기록하고 실행 상태를 정합니다.
+    엔진이 실패하면 블록 안에서 recorder.set_engine_status(엔진, 'failed')로 알려야 합니다.
+    """
+    store = FindingStore(path)
+    try:
+        recorder = RunRecorder(store, store.begin_run(project, engines, since))
+        try:
+            yield recorder
+        except BaseException:
+            recorder.flush()
+            store.finish_run(recorder.run_id, failed=True)
+            raise
+        recorder.flush()
+        store.finish_run(recorder.run_id)
+    finally:
+        store.close()
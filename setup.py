@@ -11,6 +11,7 @@ setup(
         'click',
         'docker',
         'tqdm',
+        'pyyaml',
     ],
     entry_points={
         'console_scripts': [
@@ -0,0 +1,62 @@
+from chainhawk.result.aggregator import FindingAggregator, compute_fingerprint, semgrep_finding, semgrep_findings
+
+def _result(line, rule='rules.reentrancy', path='src/Vault.sol'):
+    return {
+        'check_id': rule,
+        'path': path,
+        'start': {'line': line, 'col': 9, 'offset': 10 * line},
+        'end': {'line': line + 1, 'col': 10, 'offset': 10 * line + 40},
+        'extra': {'severity': 'ERROR', 'message': '외부 호출 후 상태 변경'},
+    }
+
+CALL = '(bool ok,) = msg.sender.call{value: amount}("");'
+
+def test_semgrep_fingerprint_ignores_line_shift():
+    before = semgrep_finding(_result(12), CALL)
+    after = semgrep_finding(_result(40), '    ' + CALL.replace(' = ', ' =\n        '))
+    assert before.fingerprint == after.fingerprint
+    assert (before.start_line, after.start_line) == (12, 40)
+
+def test_semgrep_fingerprint_tracks_rule_file_and_source():
+    base = semgrep_finding(_result(12), CALL)
+    assert semgrep_finding(_result(12, rule='rules.other'), CALL).fingerprint != base.fingerprint
+    assert semgrep_finding(_result(12, path='src/Other.sol'), CALL).fingerprint != base.fingerprint
+    assert semgrep_finding(_result(12), CALL.replace('amount', 'balance')).fingerprint != base.fingerprint
+
+def test_semgrep_fingerprint_falls_back_to_lines_without_source():
+    assert semgrep_finding(_result(12)).fingerprint == compute_fingerprint('rules.reentrancy', 'src/Vault.sol', 12, 13)
+    assert semgrep_finding(_result(12)).fingerprint != semgrep_finding(_result(13)).fingerprint
+
+def test_ruleset_prefix_does_not_split_duplicates():
+    aggregator = FindingAggregator()
+    aggregator.add(semgrep_finding(_result(12, rule='rules.reentrancy'), CALL))
+    aggregator.add(semgrep_finding(_result(12, rule='extra.rules.reentrancy'), CALL))
+    assert len(aggregator) == 1
+
+def _at(offset, line, rule='rules.reentrancy'):
+    result = _result(line, rule)
+    result['start']['offset'], result['end']['offset'] = offset, offset + len(CALL)
+    return result
+
+def test_identical_snippets_in_one_file_keep_separate_fingerprints():
+    # 같은 함수 안에서 두 번, 다른 함수에서 한 번 같은 소스가 매칭
+    functions = {100: 'withdraw', 200: 'withdraw', 300: 'claim'}
+    located = lambda result: (CALL, 'Vault', functions[result['start']['offset']])
+    findings = semgrep_findings([_at(300, 30), _at(200, 20), _at(100, 10)], located)
+    assert len({finding.fingerprint for finding in findings}) == 3
+    aggregator = FindingAggregator()
+    aggregator.extend(findings)
+    assert len(aggregator) == 3
+
+def test_occurrence_ordinal_is_stable_under_line_shift():
+    located = lambda result: (CALL, 'Vault', 'withdraw')
+    before = semgrep_findings([_at(100, 10), _at(200, 20)], located)
+    after = semgrep_findings([_at(260, 26), _at(160, 16)], located)
+    assert [finding.fingerprint for finding in before] == [finding.fingerprint for finding in after]
+
+def test_same_match_from_two_rulesets_merges():
+    located = lambda result: (CALL, 'Vault', 'withdraw')
+    aggregator = FindingAggregator()
+    aggregator.extend(semgrep_findings([_at(100, 10, 'rules.reentrancy'), _at(200, 20, 'rules.reentrancy')], located))
+    aggregator.extend(semgrep_findings([_at(100, 10, 'extra.reentrancy'), _at(200, 20, 'extra.reentrancy')], located))
+    assert len(aggregator) == 2
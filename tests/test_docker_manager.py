@@ -0,0 +1,10 @@
+from chainhawk.infrastructure.docker_manager import iter_lines
+
+def test_multibyte_characters_split_across_chunks():
+    data = '[정보] 퍼징 중 ─┬─ objectives: 0\n╰─ 완료\n마지막'.encode('utf-8')
+    for size in (1, 2, 3, 5, 7, len(data)):
+        chunks = [data[i:i + size] for i in range(0, len(data), size)]
+        assert list(iter_lines(chunks)) == ['[정보] 퍼징 중 ─┬─ objectives: 0', '╰─ 완료', '마지막']
+
+def test_empty_lines_and_text_chunks():
+    assert list(iter_lines([b'a\n\nb', '', 'c\n'])) == ['a', '', 'bc']
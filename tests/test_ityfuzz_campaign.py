@@ -0,0 +1,35 @@
+import subprocess
+import threading
+import time
+
+import pytest
+
+pytest.importorskip('docker')
+
+from chainhawk.adapters.ityfuzz_campaign import create_campaign, run_campaign
+from chainhawk.infrastructure.docker_manager import TIMEOUT_RETURNCODE
+
+def test_workers_run_once_and_share_corpus_while_running(tmp_path):
+    _, workers = create_campaign(tmp_path, 2, seed=1)
+    launches = []
+    seen_merged = {}
+    lock = threading.Lock()
+
+    def run_worker(worker, timeout):
+        with lock:
+            launches.append(worker.index)
+        worker.corpus_dir.mkdir(parents=True, exist_ok=True)
+        (worker.corpus_dir / f'input-{worker.index}').write_bytes(f'input {worker.index}'.encode())
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            merged = [path.name for path in worker.corpus_dir.iterdir() if path.name.startswith('merged-')]
+            if merged:
+                seen_merged[worker.index] = merged
+            time.sleep(0.01)
+        return subprocess.CompletedProcess([], TIMEOUT_RETURNCODE, '', '')
+
+    summary = run_campaign(run_worker, workers, timeout=0.5, sync_interval=0.1)
+    assert sorted(launches) == [0, 1]
+    assert sorted(seen_merged) == [0, 1]
+    assert summary['syncs'] >= 1 and summary['shared'] == 2
+    assert summary['timed_out']
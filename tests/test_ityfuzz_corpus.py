@@ -0,0 +1,34 @@
+import pytest
+
+pytest.importorskip('docker')
+
+from chainhawk.adapters.ityfuzz_campaign import create_campaign
+from chainhawk.adapters.ityfuzz_corpus import CorpusStore
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setenv('CHAINHAWK_CACHE_DIR', str(tmp_path / 'cache'))
+    return CorpusStore(target_max_bytes=1 << 20)
+
+def _campaign(tmp_path, store, name, inputs):
+    _, workers = create_campaign(tmp_path / name, 1, seed=1)
+    store.seed('bytecode', 'abi', workers)
+    workers[0].corpus_dir.mkdir(parents=True, exist_ok=True)
+    for index, data in enumerate(inputs):
+        (workers[0].corpus_dir / f'id-{index}').write_bytes(data)
+    return workers
+
+def test_short_run_merges_into_stored_corpus(tmp_path, store):
+    assert store.save('bytecode', 'abi', 'Vault', _campaign(tmp_path, store, 'long', [b'a' * i for i in range(1, 51)])) == 50
+    # 짧은 실행이 새 항목 하나만 남겨도 기존 저장 코퍼스는 유지
+    assert store.save('bytecode', 'abi', 'Vault', _campaign(tmp_path, store, 'short', [b'new'])) == 51
+
+def test_seeds_are_not_stored_twice(tmp_path, store):
+    store.save('bytecode', 'abi', 'Vault', _campaign(tmp_path, store, 'first', [b'x', b'y']))
+    # ITYfuzz가 시드를 같은 내용으로 다시 추가해도 내용 해시로 한 번만 보관
+    assert store.save('bytecode', 'abi', 'Vault', _campaign(tmp_path, store, 'second', [b'x'])) == 2
+
+def test_target_budget_keeps_smallest_entries(tmp_path, monkeypatch):
+    monkeypatch.setenv('CHAINHAWK_CACHE_DIR', str(tmp_path / 'cache'))
+    small = CorpusStore(target_max_bytes=10)
+    assert small.save('bytecode', 'abi', 'Vault', _campaign(tmp_path, small, 'run', [b'1234', b'12345678', b'123'])) == 2
@@ -0,0 +1,55 @@
+import os
+
+import pytest
+
+from chainhawk.adapters.ityfuzz_output import CampaignMonitor, ItyfuzzOutputParser
+
+DATA = os.path.join(os.path.dirname(__file__), 'data')
+
+def _feed_log(name):
+    parser = ItyfuzzOutputParser()
+    events = []
+    with open(os.path.join(DATA, name), 'r', encoding='utf-8') as f:
+        for line in f:
+            events += parser.feed(line)
+    return parser, events
+
+def test_clean_log_has_no_bugs():
+    parser, events = _feed_log('ityfuzz_clean.log')
+    assert [value for kind, value in events if kind == 'bug'] == []
+    assert parser.progress.execs == 3500
+    assert parser.progress.corpus == 15
+    assert parser.progress.coverage == {'instruction': 50.0, 'branch': 25.0}
+
+def test_bug_log_reports_objective_and_markers():
+    parser, events = _feed_log('ityfuzz_bug.log')
+    bugs = [value for kind, value in events if kind == 'bug']
+    assert bugs[0].startswith('[Objective #0]')
+    assert any('Found violations' in line for line in bugs)
+    assert any('Vulnerability Found' in line for line in bugs)
+    assert not any('Sorted objective' in line for line in bugs)
+    assert parser.progress.objectives == 1
+
+@pytest.mark.parametrize('line', [
+    'Sorted objective 2 by priority',
+    'Loading objective #3 from corpus',
+    '[objective] replaying input',
+    'Checking for found bugs in the corpus',
+    'No violation found in this round',
+])
+def test_ordinary_log_lines_are_not_bugs(line):
+    assert ItyfuzzOutputParser().feed(line) == []
+
+def test_unchanged_objective_counter_is_not_a_bug():
+    parser = ItyfuzzOutputParser()
+    parser.feed('[Stats #0] corpus: 3, objectives: 1, executions: 10, exec/sec: 10')
+    events = parser.feed('[Stats #0] corpus: 4, objectives: 1, executions: 20, exec/sec: 10')
+    assert [kind for kind, _ in events] == ['stats']
+
+def test_stop_on_first_only_fires_on_real_bug():
+    monitor = CampaignMonitor(stop_on_first=True)
+    parser = monitor.parser(0)
+    assert not monitor.update(0, parser.feed('Sorted objective 2 by priority'))
+    assert monitor.first_bug is None
+    assert monitor.update(0, parser.feed('[Objective #0] corpus: 9, objectives: 1, executions: 1.2k, exec/sec: 600'))
+    assert monitor.first_bug['worker'] == 0
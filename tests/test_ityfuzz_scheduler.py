@@ -0,0 +1,22 @@
+from chainhawk.adapters.ityfuzz_scheduler import BudgetScheduler
+
+def _summary(branch):
+    return {'progress': {'coverage': {'branch': branch}, 'corpus': 0}, 'bugs': []}
+
+def test_gain_is_measured_against_best_coverage_so_far():
+    scheduler = BudgetScheduler(['Vault'], budget=100, plateau_slices=2, min_gain=0)
+    target = scheduler.targets[0]
+    scheduler._record(target, 10, _summary(40.0))
+    # 새로 시작한 구간이 낮게 시작했다가 이전 수준까지만 회복한 것은 증가가 아님
+    scheduler._record(target, 10, _summary(30.0))
+    scheduler._record(target, 10, _summary(40.0))
+    assert target.status == 'plateau'
+    assert target.score == 40.0
+
+def test_new_best_resets_stale_count():
+    scheduler = BudgetScheduler(['Vault'], budget=100, plateau_slices=2, min_gain=0)
+    target = scheduler.targets[0]
+    for branch in (40.0, 30.0, 45.0, 44.0):
+        scheduler._record(target, 10, _summary(branch))
+    assert target.status == 'active'
+    assert target.stale == 1 and target.score == 45.0
@@ -0,0 +1,14 @@
+import sys
+
+from chainhawk.infrastructure.process_runner import get_runner
+
+def test_long_lines_and_split_multibyte_output():
+    script = ("import sys; out = sys.stdout.buffer; "
+              "out.write(b'x' * 300000 + b'\\n'); out.flush(); "
+              "data = '한글 ─ 상자\\n끝'.encode(); out.write(data[:1]); out.flush(); out.write(data[1:]); out.flush()")
+    seen = []
+    result = get_runner().run_command([sys.executable, '-c', script], timeout=30,
+                                      on_line=lambda name, line: seen.append((name, line)))
+    assert result.returncode == 0
+    assert result.stdout == 'x' * 300000 + '\n한글 ─ 상자\n끝'
+    assert seen == [('stdout', 'x' * 300000), ('stdout', '한글 ─ 상자'), ('stdout', '끝')]
@@ -0,0 +1,85 @@
+import json
+
+import pytest
+
+from chainhawk.adapters.semgrep_output import SemgrepOutputParser, read_semgrep_output, slim_result
+
+def _result(i):
+    return {
+        'check_id': f'rules.reentrancy-{i}',
+        'path': f'src/Vault{i}.sol',
+        'start': {'line': i, 'col': 5, 'offset': 100 + i},
+        'end': {'line': i + 2, 'col': 6, 'offset': 180 + i},
+        'extra': {
+            'severity': 'ERROR',
+            'message': f'외부 호출 후 상태 변경 {{"}}[\\ "{i}"]',
+            'lines': 'function withdraw() { (bool ok,) = msg.sender.call{value: x}(""); }',
+            'metadata': {'refs': ['a', {'b': [1, 2, {'c': None}]}], 'confidence': 0.5, 'ok': True},
+        },
+    }
+
+def _document(results=3, scanned=50):
+    return {
+        'version': '1.50.0',
+        'results': [_result(i) for i in range(results)],
+        'errors': [{'code': 2, 'level': 'warn', 'message': 'Syntax error at line 3 }]'}],
+        'paths': {'scanned': [f'src/dir{i}/File{i}.sol' for i in range(scanned)], 'skipped': []},
+        'interfile_languages_used': [],
+        'skipped_rules': [],
+        'time': 1.25,
+    }
+
+def _chunks(data, size):
+    return [data[i:i + size] for i in range(0, len(data), size)]
+
+@pytest.mark.parametrize('size', [1, 2, 3, 7, 64, 4096, 10 ** 7])
+def test_chunk_splits_match_full_parse(size):
+    doc = _document()
+    data = json.dumps(doc, ensure_ascii=False, indent=1).encode('utf-8')
+    results, parser = read_semgrep_output(_chunks(data, size))
+    assert parser.complete
+    assert results == [slim_result(result) for result in doc['results']]
+    assert parser.errors == doc['errors']
+
+def test_results_after_skipped_values_and_leading_noise():
+    doc = _document()
+    ordered = {'paths': doc['paths'], 'time': doc['time'], 'version': doc['version'], 'results': doc['results']}
+    data = 'Running 12 rules...\n' + json.dumps(ordered)
+    results, parser = read_semgrep_output(_chunks(data, 5))
+    assert parser.complete
+    assert [result['check_id'] for result in results] == [result['check_id'] for result in doc['results']]
+
+def test_scalar_values_split_across_chunks():
+    data = '{"time": 12345.678, "ok": true, "results": [], "none": null}'
+    for cut in range(1, len(data)):
+        parser = SemgrepOutputParser()
+        assert parser.feed(data[:cut]) + parser.feed(data[cut:]) + parser.close() == []
+        assert parser.complete
+
+def test_results_streamed_as_soon_as_item_closes():
+    data = json.dumps(_document(results=2))
+    first_end = data.index('"check_id": "rules.reentrancy-1"')
+    parser = SemgrepOutputParser()
+    streamed = parser.feed(data[:first_end])
+    assert [result['check_id'] for result in streamed] == ['rules.reentrancy-0']
+
+@pytest.mark.parametrize('fraction', [0.05, 0.3, 0.5, 0.8, 0.99])
+def test_truncated_output_keeps_completed_items(fraction):
+    doc = _document(results=5)
+    data = json.dumps(doc)
+    cut = data[:int(len(data) * fraction)]
+    results, parser = read_semgrep_output(_chunks(cut, 97))
+    assert not parser.complete
+    expected = [slim_result(result) for result in doc['results']]
+    assert results == expected[:len(results)]
+
+def test_skipped_value_is_not_buffered():
+    parser = SemgrepOutputParser()
+    data = json.dumps(_document(results=1, scanned=20000))
+    largest = 0
+    for chunk in _chunks(data, 8192):
+        parser.feed(chunk)
+        largest = max(largest, len(parser._buffer))
+    parser.close()
+    assert parser.complete
+    assert largest <= 8192 * 2
@@ -0,0 +1,16 @@
+import pytest
+
+from chainhawk.adapters.semgrep_prefilter import pattern_tokens
+
+@pytest.mark.parametrize('pattern, expected', [
+    ('$X.call{value: $V}(...)', ['call', 'value']),
+    ('foo($...ARGS)', ['foo']),
+    ('$TOKEN.transferFrom($FROM, ..., $AMOUNT)', ['transferFrom']),
+    ('function $F(...) { ... selfdestruct($...ARGS); ... }', ['selfdestruct']),
+    ('$...BEFORE; $ORACLE.latestAnswer(); $...AFTER', ['latestAnswer']),
+])
+def test_metavariables_and_ellipsis_are_not_tokens(pattern, expected):
+    assert pattern_tokens(pattern) == expected
+
+def test_keywords_sized_types_and_short_names_are_skipped():
+    assert pattern_tokens('uint256 $X = tx.origin; require(msg.sender == owner);') == ['msg', 'origin', 'owner', 'require', 'sender']